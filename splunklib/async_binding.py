@@ -0,0 +1,719 @@
+# Copyright © 2011-2024 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""The **splunklib.async_binding** module is the :mod:`asyncio` counterpart of
+:mod:`splunklib.binding`.
+
+:class:`AsyncContext` offers the same ``get``, ``post``, ``delete``, and
+``request`` methods as :class:`splunklib.binding.Context`, with the same
+namespace, authentication, and autologin semantics, except that every method
+that talks to splunkd is a coroutine. Requests are sent over
+:mod:`asyncio` streams, so a single event loop can drive hundreds of
+concurrent REST calls without a thread per call. Connections are kept alive
+and reused, like they are by the default :func:`splunklib.binding.handler`.
+
+**Example**::
+
+    import asyncio
+    from splunklib import async_binding
+
+    async def main():
+        c = async_binding.AsyncContext(username="boris", password="natasha", ...)
+        await c.login()
+        response = await c.get("apps/local")
+        print(await response.body.read())
+
+    asyncio.run(main())
+"""
+
+import asyncio
+import logging
+import ssl
+import time
+from collections import deque
+from functools import wraps
+from io import BytesIO
+from xml.etree.ElementTree import XML
+
+from . import __version__
+from .binding import (
+    DEFAULT_POOL_IDLE_TIMEOUT,
+    DEFAULT_POOL_MAXSIZE,
+    AuthenticationError,
+    Context,
+    HTTPError,
+    HttpLib,
+    UrlEncoded,
+    _encode,
+    _handle_auth_error,
+    _NoAuthenticationToken,
+    _spliturl,
+    mask_sensitive_data,
+)
+from .data import record
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "AsyncContext",
+    "AsyncHttpLib",
+    "AsyncResponseReader",
+    "async_handler",
+    "connect",
+]
+
+# Size of the blocks read from the socket when the caller does not ask for a
+# specific amount.
+_READ_BLOCK_SIZE = 64 * 1024
+
+
+def _async_authentication(request_fun):
+    """Coroutine counterpart of :func:`splunklib.binding._authentication`.
+
+    Logs in before the request when the ``AsyncContext`` is not logged in and
+    ``autologin`` is set, and retries once after logging in again if the
+    request fails with a 401.
+    """
+
+    @wraps(request_fun)
+    async def wrapper(self, *args, **kwargs):
+        if self.token is _NoAuthenticationToken and not self.has_cookies():
+            # Not yet logged in.
+            if self.autologin and self.username and self.password:
+                # This will throw an uncaught
+                # AuthenticationError if it fails.
+                await self.login()
+            else:
+                # Try the request anyway without authentication.
+                # Most requests will fail. Some will succeed, such as
+                # 'GET server/info'.
+                with _handle_auth_error("Request aborted: not logged in."):
+                    return await request_fun(self, *args, **kwargs)
+        try:
+            # Issue the request
+            return await request_fun(self, *args, **kwargs)
+        except HTTPError as he:
+            if he.status == 401 and self.autologin:
+                # Authentication failed. Try logging in, and then
+                # rerunning the request. If either step fails, throw
+                # an AuthenticationError and give up.
+                with _handle_auth_error("Autologin failed."):
+                    await self.login()
+                with _handle_auth_error(
+                    "Authentication Failed! If session token is used, "
+                    "it seems to have been expired."
+                ):
+                    return await request_fun(self, *args, **kwargs)
+            elif he.status == 401 and not self.autologin:
+                raise AuthenticationError(
+                    "Request failed: Session is not logged in.", he
+                )
+            else:
+                raise
+
+    return wrapper
+
+
+class _AsyncConnection:
+    """A pair of asyncio streams to one host, plus when it was last used."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+
+    @property
+    def usable(self):
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    def close(self):
+        self.writer.close()
+
+
+class _AsyncConnectionPool:
+    """Idle keep-alive connections, kept per ``(scheme, host, port)``.
+
+    This is the :mod:`asyncio` counterpart of
+    :class:`splunklib.binding._ConnectionPool`. All access happens on the
+    event loop thread, and checking a connection in or out never awaits, so
+    no lock is needed.
+    """
+
+    def __init__(self, maxsize=DEFAULT_POOL_MAXSIZE, idle_timeout=None):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self._idle = {}
+
+    def _expired(self, connection, now):
+        return (
+            self.idle_timeout is not None
+            and now - connection.last_used > self.idle_timeout
+        )
+
+    def acquire(self, key):
+        """Returns an idle connection for *key*, or ``None`` if there is none."""
+        now = time.monotonic()
+        idle = self._idle.get(key)
+        while idle:
+            connection = idle.pop()
+            if connection.usable and not self._expired(connection, now):
+                return connection
+            connection.close()
+        return None
+
+    def release(self, key, connection):
+        """Returns *connection* to the pool once its response has been read."""
+        connection.last_used = time.monotonic()
+        idle = self._idle.setdefault(key, deque())
+        while idle and self._expired(idle[0], connection.last_used):
+            idle.popleft().close()
+        if len(idle) < self.maxsize and connection.usable:
+            idle.append(connection)
+        else:
+            connection.close()
+
+    def clear(self):
+        """Closes and forgets every idle connection in the pool."""
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def __len__(self):
+        return sum(len(connections) for connections in self._idle.values())
+
+
+class AsyncResponseReader:
+    """This class provides an awaitable, file-like interface to the body of
+    an HTTP response read by :func:`async_handler`.
+
+    It mirrors :class:`splunklib.binding.ResponseReader`, except that
+    :meth:`read` and :meth:`readline` are coroutines. Iterating over the
+    reader with ``async for`` yields the body line by line, which is
+    convenient for streams such as ``search/jobs/export`` with
+    ``output_mode=json``.
+
+    The connection goes back to the pool as soon as the body has been read to
+    the end. Closing the reader early closes the connection instead.
+    """
+
+    def __init__(self, connection, length=None, chunked=False, release=None):
+        self._connection = connection
+        self._length = length
+        self._chunked = chunked
+        self._chunk_left = 0
+        self._release = release
+        self._buffer = b""
+        self._done = length == 0
+        if self._done:
+            self._finish()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        line = await self.readline()
+        if not line:
+            raise StopAsyncIteration
+        return line
+
+    def _finish(self):
+        self._done = True
+        connection, self._connection = self._connection, None
+        release, self._release = self._release, None
+        if connection is None:
+            return
+        if release is not None:
+            release(connection)
+        else:
+            connection.close()
+
+    async def _read_raw(self, size):
+        """Reads at most *size* bytes of body, undoing the transfer framing."""
+        if self._done:
+            return b""
+        reader = self._connection.reader
+        if self._chunked:
+            if self._chunk_left == 0:
+                line = await reader.readline()
+                self._chunk_left = int(line.split(b";", 1)[0].strip() or b"0", 16)
+                if self._chunk_left == 0:
+                    # Skip any trailers up to the blank line ending the body.
+                    while line not in (b"\r\n", b"\n", b""):
+                        line = await reader.readline()
+                    self._finish()
+                    return b""
+            data = await reader.read(min(size, self._chunk_left))
+            if not data:
+                raise ConnectionResetError("Connection closed mid-chunk.")
+            self._chunk_left -= len(data)
+            if self._chunk_left == 0:
+                await reader.readline()
+            return data
+        if self._length is not None:
+            data = await reader.read(min(size, self._length))
+            if not data:
+                raise ConnectionResetError("Connection closed before end of body.")
+            self._length -= len(data)
+            if self._length == 0:
+                self._finish()
+            return data
+        # No framing: the body runs until the server closes the connection.
+        data = await reader.read(size)
+        if not data:
+            self._finish()
+        return data
+
+    @property
+    def empty(self):
+        """Indicates whether the body has been read to the end.
+
+        Unlike :attr:`splunklib.binding.ResponseReader.empty`, this does not
+        read ahead, so it only becomes ``True`` once a read hit the end.
+        """
+        return self._done and not self._buffer
+
+    async def read(self, size=None):
+        """Reads a given number of bytes from the response.
+
+        :param size: The number of bytes to read, or "None" to read the
+            entire response.
+        :type size: ``integer`` or "None"
+        """
+        chunks = [self._buffer]
+        have = len(self._buffer)
+        self._buffer = b""
+        while size is None or have < size:
+            want = _READ_BLOCK_SIZE if size is None else size - have
+            data = await self._read_raw(want)
+            if not data:
+                break
+            chunks.append(data)
+            have += len(data)
+        return b"".join(chunks)
+
+    async def readline(self):
+        """Reads one line, including its trailing newline, from the response."""
+        while b"\n" not in self._buffer:
+            data = await self._read_raw(_READ_BLOCK_SIZE)
+            if not data:
+                line, self._buffer = self._buffer, b""
+                return line
+            self._buffer += data
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        return line + b"\n"
+
+    def close(self):
+        """Closes this response, and its connection if the body is unread."""
+        if not self._done:
+            self._release = None
+            self._finish()
+        self._buffer = b""
+
+
+def async_handler(
+    key_file=None,
+    cert_file=None,
+    timeout=None,
+    verify=False,
+    context=None,
+    pool_maxsize=DEFAULT_POOL_MAXSIZE,
+    pool_idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT,
+):
+    """Returns the default coroutine HTTP request handler using the values you
+    provide.
+
+    The arguments are the same as those of :func:`splunklib.binding.handler`.
+    The returned coroutine function has the signature
+    ``request(url, message) -> response`` where the response ``body`` is an
+    :class:`AsyncResponseReader`. Its pool of idle connections is available as
+    its ``pool`` attribute.
+    """
+    ssl_context = None
+    if not verify:
+        ssl_context = ssl._create_unverified_context()  # nosemgrep
+    elif context:
+        ssl_context = context
+    else:
+        ssl_context = ssl.create_default_context()
+    if cert_file is not None:
+        ssl_context.load_cert_chain(cert_file, key_file)
+
+    pool = (
+        _AsyncConnectionPool(pool_maxsize, pool_idle_timeout) if pool_maxsize else None
+    )
+
+    async def connect(scheme, host, port):
+        if scheme not in ("http", "https"):
+            raise ValueError(f"unsupported scheme: {scheme}")
+        opening = asyncio.open_connection(
+            host,
+            port,
+            ssl=ssl_context if scheme == "https" else None,
+            server_hostname=host if scheme == "https" else None,
+        )
+        reader, writer = await asyncio.wait_for(opening, timeout)
+        return _AsyncConnection(reader, writer)
+
+    async def send(connection, method, path, head, body):
+        lines = [f"{method} {path} HTTP/1.1"]
+        lines.extend(f"{key}: {value}" for key, value in head.items())
+        connection.writer.write(
+            ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+        )
+        await connection.writer.drain()
+
+        status_line = await connection.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Remote end closed connection without response")
+        version, status, reason = [
+            *status_line.decode("latin-1").rstrip("\r\n").split(" ", 2),
+            "",
+        ][:3]
+        headers = []
+        while True:
+            line = await connection.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers.append((key.strip().lower(), value.strip()))
+        return version, int(status), reason, headers
+
+    async def request(url, message, **kwargs):
+        scheme, host, port, path = _spliturl(url)
+        body = message.get("body", b"") or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        head = {
+            "Content-Length": str(len(body)),
+            "Host": host,
+            "User-Agent": "splunk-sdk-python/%s" % __version__,
+            "Accept": "*/*",
+            "Connection": "Keep-Alive" if pool is not None else "Close",
+        }  # defaults
+        for key, value in message["headers"]:
+            head[key] = value
+        method = message.get("method", "GET")
+        key = (scheme, host, port)
+
+        while True:
+            connection = pool.acquire(key) if pool is not None else None
+            reused = connection is not None
+            if connection is None:
+                connection = await connect(scheme, host, port)
+            try:
+                version, status, reason, headers = await asyncio.wait_for(
+                    send(connection, method, path, head, body), timeout
+                )
+            except (ConnectionError, asyncio.IncompleteReadError):
+                connection.close()
+                if reused:
+                    # The server closed the idle connection under us; the
+                    # request never made it, so send it on a fresh one.
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            break
+
+        fields = dict(headers)
+        will_close = "close" in fields.get("connection", "").lower() or (
+            version == "HTTP/1.0"
+            and "keep-alive" not in fields.get("connection", "").lower()
+        )
+        chunked = "chunked" in fields.get("transfer-encoding", "").lower()
+        length = None
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            length = 0
+        elif not chunked and "content-length" in fields:
+            length = int(fields["content-length"])
+        elif not chunked:
+            will_close = True
+
+        release = None
+        if pool is not None and not will_close:
+
+            def release(conn):
+                pool.release(key, conn)
+
+        return {
+            "status": status,
+            "reason": reason,
+            "headers": headers,
+            "body": AsyncResponseReader(connection, length, chunked, release),
+        }
+
+    request.pool = pool
+    return request
+
+
+class AsyncHttpLib(HttpLib):
+    """The coroutine counterpart of :class:`splunklib.binding.HttpLib`.
+
+    :meth:`delete`, :meth:`get`, :meth:`post`, and :meth:`request` take the
+    same arguments as their :class:`~splunklib.binding.HttpLib`
+    counterparts, but return awaitables. A custom handler must be a coroutine
+    function with the signature ``handler(url, request_dict) -> response_dict``
+    whose response ``body`` supports ``await body.read()``.
+    """
+
+    def __init__(
+        self,
+        custom_handler=None,
+        verify=False,
+        key_file=None,
+        cert_file=None,
+        context=None,
+        retries=0,
+        retryDelay=10,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        pool_idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT,
+    ):
+        if custom_handler is None:
+            custom_handler = async_handler(
+                verify=verify,
+                key_file=key_file,
+                cert_file=cert_file,
+                context=context,
+                pool_maxsize=pool_maxsize,
+                pool_idle_timeout=pool_idle_timeout,
+            )
+        super().__init__(custom_handler, retries=retries, retryDelay=retryDelay)
+
+    async def request(self, url, message, **kwargs):
+        """Issues an HTTP request to a URL.
+
+        :param url: The URL.
+        :type url: ``string``
+        :param message: A dictionary with the format as described in
+            :class:`splunklib.binding.HttpLib`.
+        :type message: ``dict``
+        :param kwargs: Additional keyword arguments (optional). These arguments
+            are passed unchanged to the handler.
+        :type kwargs: ``dict``
+        :returns: A dictionary describing the response (see
+            :class:`splunklib.binding.HttpLib` for its structure).
+        :rtype: ``dict``
+        """
+        while True:
+            try:
+                response = await self.handler(url, message, **kwargs)
+                break
+            except Exception:
+                if self.retries <= 0:
+                    raise
+                else:
+                    await asyncio.sleep(self.retryDelay)
+                    self.retries -= 1
+        response = record(response)
+        if 400 <= response.status:
+            # HTTPError reads the body synchronously, so hand it a buffered one.
+            response.body = BytesIO(await response.body.read())
+            raise HTTPError(response)
+        self._update_cookies(response)
+        return response
+
+
+class AsyncContext(Context):
+    """The :mod:`asyncio` counterpart of :class:`splunklib.binding.Context`.
+
+    ``AsyncContext`` takes the same arguments as
+    :class:`~splunklib.binding.Context` (a custom *handler* must be a
+    coroutine function, see :class:`AsyncHttpLib`). :meth:`login`,
+    :meth:`get`, :meth:`post`, :meth:`delete`, and :meth:`request` are
+    coroutines; everything that does not talk to splunkd, such as
+    :meth:`logout` and namespace handling, is inherited unchanged.
+
+    **Example**::
+
+        from splunklib import async_binding
+        c = async_binding.AsyncContext(username="boris", password="natasha", ...)
+        await c.login()
+        # Or equivalently
+        c = await async_binding.connect(username="boris", password="natasha")
+    """
+
+    @staticmethod
+    def _make_http(handler, kwargs):
+        return AsyncHttpLib(
+            handler,
+            kwargs.get("verify", False),
+            key_file=kwargs.get("key_file"),
+            cert_file=kwargs.get("cert_file"),
+            context=kwargs.get("context"),
+            retries=kwargs.get("retries", 0),
+            retryDelay=kwargs.get("retryDelay", 10),
+            pool_maxsize=kwargs.get("pool_maxsize", DEFAULT_POOL_MAXSIZE),
+            pool_idle_timeout=kwargs.get(
+                "pool_idle_timeout", DEFAULT_POOL_IDLE_TIMEOUT
+            ),
+        )
+
+    @_async_authentication
+    async def delete(self, path_segment, owner=None, app=None, sharing=None, **query):
+        """Performs a DELETE operation at the REST path segment with the given
+        namespace and query.
+
+        See :meth:`splunklib.binding.Context.delete`.
+        """
+        path = self.authority + self._abspath(
+            path_segment, owner=owner, app=app, sharing=sharing
+        )
+        logger.debug(
+            "DELETE request to %s (body: %s)", path, mask_sensitive_data(query)
+        )
+        return await self.http.delete(path, self._auth_headers, **query)
+
+    @_async_authentication
+    async def get(
+        self, path_segment, owner=None, app=None, headers=None, sharing=None, **query
+    ):
+        """Performs a GET operation from the REST path segment with the given
+        namespace and query.
+
+        See :meth:`splunklib.binding.Context.get`.
+        """
+        if headers is None:
+            headers = []
+
+        path = self.authority + self._abspath(
+            path_segment, owner=owner, app=app, sharing=sharing
+        )
+        logger.debug("GET request to %s (body: %s)", path, mask_sensitive_data(query))
+        all_headers = list(headers) + self.additional_headers + self._auth_headers
+        return await self.http.get(path, all_headers, **query)
+
+    @_async_authentication
+    async def post(
+        self, path_segment, owner=None, app=None, sharing=None, headers=None, **query
+    ):
+        """Performs a POST operation from the REST path segment with the given
+        namespace and query.
+
+        See :meth:`splunklib.binding.Context.post`.
+        """
+        if headers is None:
+            headers = []
+
+        path = self.authority + self._abspath(
+            path_segment, owner=owner, app=app, sharing=sharing
+        )
+        logger.debug("POST request to %s (body: %s)", path, mask_sensitive_data(query))
+        all_headers = list(headers) + self.additional_headers + self._auth_headers
+        return await self.http.post(path, all_headers, **query)
+
+    @_async_authentication
+    async def request(
+        self,
+        path_segment,
+        method="GET",
+        headers=None,
+        body={},
+        owner=None,
+        app=None,
+        sharing=None,
+    ):
+        """Issues an arbitrary HTTP request to the REST path segment.
+
+        See :meth:`splunklib.binding.Context.request`.
+        """
+        if headers is None:
+            headers = []
+
+        path = self.authority + self._abspath(
+            path_segment, owner=owner, app=app, sharing=sharing
+        )
+
+        all_headers = list(headers) + self.additional_headers + self._auth_headers
+        logger.debug(
+            "%s request to %s (headers: %s, body: %s)",
+            method,
+            path,
+            str(mask_sensitive_data(dict(all_headers))),
+            mask_sensitive_data(body),
+        )
+        if body:
+            body = _encode(**body)
+
+            if method == "GET":
+                path = path + UrlEncoded("?" + body, skip_encode=True)
+                message = {"method": method, "headers": all_headers}
+            else:
+                message = {"method": method, "headers": all_headers, "body": body}
+        else:
+            message = {"method": method, "headers": all_headers}
+
+        return await self.http.request(path, message)
+
+    async def login(self):
+        """Logs into the Splunk instance referred to by the ``AsyncContext``.
+
+        See :meth:`splunklib.binding.Context.login`.
+
+        :raises AuthenticationError: Raised when login fails.
+        :returns: The ``AsyncContext`` object, so you can chain calls.
+        """
+        if self._login_is_nop():
+            return
+        try:
+            response = await self.http.post(
+                self.authority + self._abspath("/services/auth/login"),
+                username=self.username,
+                password=self.password,
+                headers=self.additional_headers,
+                cookie="1",
+            )  # In Splunk 6.2+, passing "cookie=1" will return the "set-cookie" header
+
+            body = await response.body.read()
+            session = XML(body).findtext("./sessionKey")
+            self.token = f"Splunk {session}"
+            return self
+        except HTTPError as he:
+            if he.status == 401:
+                raise AuthenticationError("Login failed.", he)
+            else:
+                raise
+
+    def close(self):
+        """Closes the idle connections kept by the default handler."""
+        pool = getattr(self.http.handler, "pool", None)
+        if pool is not None:
+            pool.clear()
+
+
+async def connect(**kwargs):
+    """This coroutine returns an authenticated :class:`AsyncContext` object.
+
+    See :func:`splunklib.binding.connect` for the arguments.
+
+    **Example**::
+
+        from splunklib import async_binding
+        c = await async_binding.connect(...)
+        response = await c.get("apps/local")
+    """
+    c = AsyncContext(**kwargs)
+    await c.login()
+    return c
+
+
+async def _buffered(response):
+    """Reads the whole body of *response* and returns a copy of the response
+    whose ``body`` is a ``BytesIO``, for use with the synchronous parsing
+    helpers of :mod:`splunklib.client`."""
+    body = await response.body.read()
+    buffered = record(response)
+    buffered.body = BytesIO(body)
+    return buffered
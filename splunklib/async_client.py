@@ -0,0 +1,492 @@
+# Copyright © 2011-2024 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""The **splunklib.async_client** module is the :mod:`asyncio` counterpart of
+the search job and KV Store parts of :mod:`splunklib.client`.
+
+:class:`AsyncService` is an :class:`splunklib.async_binding.AsyncContext`
+that adds coroutine versions of the calls that usually sit on a hot path:
+creating, polling, and reading search jobs, and reading and writing KV Store
+data. Response bodies are parsed with the same helpers that
+:mod:`splunklib.client` uses, so the returned records look the same.
+
+**Example**::
+
+    import asyncio
+    from splunklib import async_client, results
+
+    async def main():
+        service = await async_client.connect(username="boris", password="natasha")
+        jobs = [await service.jobs.create(q) for q in queries]
+        while not all(await asyncio.gather(*(job.is_done() for job in jobs))):
+            await asyncio.sleep(0.5)
+        for job in jobs:
+            stream = await job.results(output_mode="json")
+            print(await stream.read())
+
+    asyncio.run(main())
+"""
+
+import json
+
+from .async_binding import AsyncContext, _buffered
+from .binding import HTTPError, UrlEncoded
+from .client import (
+    MATCH_ENTRY_CONTENT,
+    PATH_JOBS,
+    PATH_JOBS_V2,
+    _filter_content,
+    _load_atom,
+    _load_atom_entries,
+    _load_sid,
+    _parse_atom_entry,
+)
+
+__all__ = [
+    "AsyncJob",
+    "AsyncJobs",
+    "AsyncKVStoreCollectionData",
+    "AsyncService",
+    "connect",
+]
+
+
+async def connect(**kwargs):
+    """This coroutine connects and logs in to a Splunk instance.
+
+    See :func:`splunklib.client.connect` for the arguments.
+
+    :return: An initialized :class:`AsyncService` connection.
+    """
+    s = AsyncService(**kwargs)
+    await s.login()
+    return s
+
+
+class AsyncService(AsyncContext):
+    """The :mod:`asyncio` counterpart of :class:`splunklib.client.Service`.
+
+    ``AsyncService`` takes the same arguments as
+    :class:`~splunklib.client.Service`. Properties of ``Service`` that need
+    a round trip to the server, such as ``info`` and ``splunk_version``,
+    are coroutine methods here.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._splunk_version = None
+        self._kvstore_owner = None
+        self._instance_type = None
+
+    async def info(self):
+        """Returns the information about this instance of Splunk.
+
+        :return: The system information, as key-value pairs.
+        :rtype: ``dict``
+        """
+        response = await _buffered(await self.get("/services/server/info"))
+        return _filter_content(_load_atom(response, MATCH_ENTRY_CONTENT))
+
+    async def splunk_version(self):
+        """Returns the version of the splunkd instance as a ``tuple`` of
+        ``integers``. The value is fetched once and then cached."""
+        if self._splunk_version is None:
+            info = await self.info()
+            self._splunk_version = tuple(int(p) for p in info["version"].split("."))
+            self._instance_type = info.get("instance_type", "")
+        return self._splunk_version
+
+    async def disable_v2_api(self):
+        """Indicates whether the search API v1 must be used with this
+        instance. See :attr:`splunklib.client.Service.disable_v2_api`."""
+        version = await self.splunk_version()
+        if self._instance_type.lower() == "cloud":
+            return version < (9, 0, 2209)
+        return version < (9, 0, 2)
+
+    @property
+    def kvstore_owner(self):
+        """Returns the KV Store owner for this instance of Splunk.
+
+        By default the KV Store owner is not set, and this returns "nobody".
+        """
+        if self._kvstore_owner is None:
+            self._kvstore_owner = "nobody"
+        return self._kvstore_owner
+
+    @kvstore_owner.setter
+    def kvstore_owner(self, value):
+        self._kvstore_owner = value
+
+    async def job(self, sid):
+        """Retrieves a search job by sid.
+
+        :return: An :class:`AsyncJob` object.
+        """
+        return await AsyncJob(self, sid, await self._jobs_path()).refresh()
+
+    @property
+    def jobs(self):
+        """Returns the collection of search jobs.
+
+        :return: An :class:`AsyncJobs` object.
+        """
+        return AsyncJobs(self)
+
+    def kvstore_data(self, collection, app=None, owner=None, sharing=None):
+        """Returns the data endpoint of a KV Store collection.
+
+        Unlike :attr:`splunklib.client.KVStoreCollection.data`, this does not
+        fetch the collection first; the namespace defaults to
+        :attr:`kvstore_owner` and the app of this service.
+
+        :param collection: The name of the KV Store collection.
+        :type collection: ``string``
+        :return: An :class:`AsyncKVStoreCollectionData` object.
+        """
+        if owner is None:
+            owner = self.kvstore_owner
+        if app is None:
+            app = self.namespace["app"]
+        return AsyncKVStoreCollectionData(self, collection, owner, app, sharing)
+
+    async def _jobs_path(self):
+        return PATH_JOBS if await self.disable_v2_api() else PATH_JOBS_V2
+
+
+class AsyncJob:
+    """The :mod:`asyncio` counterpart of :class:`splunklib.client.Job`.
+
+    The state of the job is loaded by :meth:`refresh`, :meth:`is_ready`, and
+    :meth:`is_done`, and can then be read with ``job["isDone"]`` or
+    :attr:`content`.
+    """
+
+    def __init__(self, service, sid, path=PATH_JOBS_V2):
+        self.service = service
+        self.sid = sid
+        self.path = path + sid + "/"
+        self._v1 = path == PATH_JOBS
+        self._state = None
+
+    def __getitem__(self, key):
+        return self.content[key]
+
+    @property
+    def content(self):
+        """Returns the contents of the job, as loaded by the last
+        :meth:`refresh`.
+
+        :return: The job attributes.
+        :rtype: ``dict``
+        """
+        return self._state.content if self._state is not None else {}
+
+    @property
+    def name(self):
+        """Returns the search ID (SID) of the job."""
+        return self.sid
+
+    def _stream(self, path_segment, **query):
+        # Search API v1(GET) and v2(POST)
+        query["segmentation"] = query.get("segmentation", "none")
+        if self._v1:
+            return self.service.get(self.path + path_segment, **query)
+        return self.service.post(self.path + path_segment, **query)
+
+    async def refresh(self):
+        """Reloads the state of the job.
+
+        :return: The :class:`AsyncJob`.
+        """
+        await self.is_ready()
+        return self
+
+    async def is_ready(self):
+        """Indicates whether this job is ready for querying.
+
+        :return: ``True`` if the job is ready, ``False`` if not.
+        :rtype: ``boolean``
+        """
+        response = await self.service.get(self.path)
+        if response.status == 204:
+            await response.body.read()
+            return False
+        response = await _buffered(response)
+        self._state = _parse_atom_entry(_load_atom(response).entry)
+        return self._state.content["dispatchState"] not in ["QUEUED", "PARSING"]
+
+    async def is_done(self):
+        """Indicates whether this job finished running.
+
+        :return: ``True`` if the job is done, ``False`` if not.
+        :rtype: ``boolean``
+        """
+        if not await self.is_ready():
+            return False
+        return self._state.content["isDone"] == "1"
+
+    async def cancel(self):
+        """Stops the current search and deletes the results cache.
+
+        :return: The :class:`AsyncJob`.
+        """
+        try:
+            response = await self.service.post(self.path + "control", action="cancel")
+            await response.body.read()
+        except HTTPError as he:
+            if he.status == 404:
+                # The job has already been cancelled, so
+                # cancelling it twice is a nop.
+                pass
+            else:
+                raise
+        return self
+
+    async def events(self, **kwargs):
+        """Returns a streaming handle to this job's events.
+
+        See :meth:`splunklib.client.Job.events`.
+
+        :return: An :class:`splunklib.async_binding.AsyncResponseReader`.
+        """
+        return (await self._stream("events", **kwargs)).body
+
+    async def results(self, **query_params):
+        """Returns a streaming handle to this job's search results.
+
+        See :meth:`splunklib.client.Job.results`.
+
+        :return: An :class:`splunklib.async_binding.AsyncResponseReader`.
+        """
+        return (await self._stream("results", **query_params)).body
+
+    async def preview(self, **query_params):
+        """Returns a streaming handle to this job's preview search results.
+
+        See :meth:`splunklib.client.Job.preview`.
+
+        :return: An :class:`splunklib.async_binding.AsyncResponseReader`.
+        """
+        return (await self._stream("results_preview", **query_params)).body
+
+
+class AsyncJobs:
+    """The :mod:`asyncio` counterpart of :class:`splunklib.client.Jobs`.
+    Retrieve it using :attr:`AsyncService.jobs`."""
+
+    def __init__(self, service):
+        self.service = service
+
+    async def list(self, **kwargs):
+        """Returns the current search jobs.
+
+        :return: A ``list`` of :class:`AsyncJob` objects.
+        """
+        path = await self.service._jobs_path()
+        kwargs.setdefault("count", 0)
+        response = await _buffered(await self.service.get(path, **kwargs))
+        jobs = []
+        for entry in _load_atom_entries(response) or []:
+            job = AsyncJob(self.service, entry["content"]["sid"], path)
+            job._state = _parse_atom_entry(entry)
+            jobs.append(job)
+        return jobs
+
+    async def create(self, query, **kwargs):
+        """Creates a search using a search query and any additional parameters
+        you provide.
+
+        See :meth:`splunklib.client.Jobs.create`.
+
+        :return: The :class:`AsyncJob`.
+        """
+        if kwargs.get("exec_mode", None) == "oneshot":
+            raise TypeError(
+                "Cannot specify exec_mode=oneshot; use the oneshot method instead."
+            )
+        path = await self.service._jobs_path()
+        response = await _buffered(
+            await self.service.post(path, search=query, **kwargs)
+        )
+        sid = _load_sid(response, kwargs.get("output_mode", None))
+        return AsyncJob(self.service, sid, path)
+
+    async def export(self, query, **params):
+        """Runs a search and immediately starts streaming preview events.
+
+        See :meth:`splunklib.client.Jobs.export`. With ``output_mode="json"``
+        the stream holds one JSON object per line, so it can be consumed with
+        ``async for line in stream``.
+
+        :return: An :class:`splunklib.async_binding.AsyncResponseReader`.
+        """
+        if "exec_mode" in params:
+            raise TypeError("Cannot specify an exec_mode to export.")
+        params["segmentation"] = params.get("segmentation", "none")
+        path = await self.service._jobs_path()
+        return (await self.service.post(path + "export", search=query, **params)).body
+
+    async def oneshot(self, query, **params):
+        """Runs a oneshot search and returns a streaming handle to the results.
+
+        See :meth:`splunklib.client.Jobs.oneshot`.
+
+        :return: An :class:`splunklib.async_binding.AsyncResponseReader`.
+        """
+        if "exec_mode" in params:
+            raise TypeError("Cannot specify an exec_mode to oneshot.")
+        params["segmentation"] = params.get("segmentation", "none")
+        path = await self.service._jobs_path()
+        response = await self.service.post(
+            path, search=query, exec_mode="oneshot", **params
+        )
+        return response.body
+
+
+class AsyncKVStoreCollectionData:
+    """The :mod:`asyncio` counterpart of
+    :class:`splunklib.client.KVStoreCollectionData`.
+
+    Retrieve it using :meth:`AsyncService.kvstore_data`.
+    """
+
+    JSON_HEADER = (("Content-Type", "application/json"),)
+
+    def __init__(self, service, collection, owner=None, app=None, sharing=None):
+        self.service = service
+        self.owner, self.app, self.sharing = owner, app, sharing
+        self.path = (
+            "storage/collections/data/"
+            + UrlEncoded(collection, encode_slash=True)
+            + "/"
+        )
+
+    async def _json(self, method, url, **kwargs):
+        response = await method(
+            self.path + url,
+            owner=self.owner,
+            app=self.app,
+            sharing=self.sharing,
+            **kwargs,
+        )
+        return json.loads((await response.body.read()).decode("utf-8"))
+
+    async def query(self, **query):
+        """Gets the results of query, with optional parameters sort, limit,
+        skip, and fields.
+
+        :return: Array of documents retrieved by query.
+        :rtype: ``array``
+        """
+        for key, value in query.items():
+            if isinstance(query[key], dict):
+                query[key] = json.dumps(value)
+
+        return await self._json(self.service.get, "", **query)
+
+    async def query_by_id(self, id):
+        """Returns object with _id = id.
+
+        :return: Document with id
+        :rtype: ``dict``
+        """
+        return await self._json(
+            self.service.get, UrlEncoded(str(id), encode_slash=True)
+        )
+
+    async def insert(self, data):
+        """Inserts item into this collection.
+
+        :return: _id of inserted object
+        :rtype: ``dict``
+        """
+        if isinstance(data, dict):
+            data = json.dumps(data)
+        return await self._json(
+            self.service.post, "", headers=self.JSON_HEADER, body=data
+        )
+
+    async def update(self, id, data):
+        """Replaces document with _id = id with data.
+
+        :return: id of replaced document
+        :rtype: ``dict``
+        """
+        if isinstance(data, dict):
+            data = json.dumps(data)
+        return await self._json(
+            self.service.post,
+            UrlEncoded(str(id), encode_slash=True),
+            headers=self.JSON_HEADER,
+            body=data,
+        )
+
+    async def delete(self, query=None):
+        """Deletes all data in collection if query is absent. Otherwise,
+        deletes all data matched by query.
+
+        :return: Result of DELETE request
+        """
+        response = await self.service.delete(
+            self.path,
+            owner=self.owner,
+            app=self.app,
+            sharing=self.sharing,
+            **({"query": query} if query else {}),
+        )
+        await response.body.read()
+        return response
+
+    async def delete_by_id(self, id):
+        """Deletes document that has _id = id.
+
+        :return: Result of DELETE request
+        """
+        response = await self.service.delete(
+            self.path + UrlEncoded(str(id), encode_slash=True),
+            owner=self.owner,
+            app=self.app,
+            sharing=self.sharing,
+        )
+        await response.body.read()
+        return response
+
+    async def batch_find(self, *dbqueries):
+        """Returns array of results from queries dbqueries.
+
+        :rtype: ``array`` of ``array``
+        """
+        if len(dbqueries) < 1:
+            raise Exception("Must have at least one query.")
+        return await self._json(
+            self.service.post,
+            "batch_find",
+            headers=self.JSON_HEADER,
+            body=json.dumps(dbqueries),
+        )
+
+    async def batch_save(self, *documents):
+        """Inserts or updates every document specified in documents.
+
+        :rtype: ``array``
+        """
+        if len(documents) < 1:
+            raise Exception("Must have at least one document.")
+        return await self._json(
+            self.service.post,
+            "batch_save",
+            headers=self.JSON_HEADER,
+            body=json.dumps(documents),
+        )
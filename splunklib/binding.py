@@ -24,13 +24,21 @@ If you want a friendlier interface to the Splunk REST API, use the
 :mod:`splunklib.client` module.
 """
 
+import gzip
 import io
 import json
 import logging
+import os
+import select
 import socket
 import ssl
+import stat
+import threading
 import time
+import zlib
 from base64 import b64encode
+from collections import deque
+from collections.abc import Iterator
 from contextlib import contextmanager
 from datetime import datetime
 from functools import wraps
@@ -82,6 +90,19 @@ DEFAULT_HOST = "localhost"
 DEFAULT_PORT = "8089"
 DEFAULT_SCHEME = "https"
 
+# Idle keep-alive connections kept per (scheme, host, port) by the default
+# handler, and how long (in seconds) an idle connection may sit in the pool
+# before it is discarded. splunkd drops idle keep-alive connections on its
+# own after a while, so keep the idle timeout conservative.
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_POOL_IDLE_TIMEOUT = 10
+
+# Request bodies smaller than this are not worth compressing
+DEFAULT_COMPRESSION_THRESHOLD = 8192
+
+# The content codings HttpLib can send and ResponseReader can decode
+_CONTENT_CODINGS = ("gzip", "deflate")
+
 
 def _log_duration(f):
     @wraps(f)
@@ -294,7 +315,9 @@ def _authentication(request_fun):
     ``AuthenticationError`` if an ``HTTPError`` of status 401 is
     raised in *request_fun*. If it's ``True``, then
     ``_authentication`` will try at all sensible places to
-    log in before issuing the request.
+    log in before issuing the request. A request sent again after
+    logging in has its seekable file body rewound; one whose body is
+    another stream raises an ``AuthenticationError`` instead.
 
     If ``autologin`` is ``False``, ``_authentication`` makes
     one roundtrip to the server if the ``Context`` is logged in,
@@ -318,6 +341,8 @@ def _authentication(request_fun):
 
     @wraps(request_fun)
     def wrapper(self, *args, **kwargs):
+        # Note where a streamed body starts, in case the request is sent again
+        rewind = _rewinder(kwargs.get("body")) if self.autologin else None
         if self.token is _NoAuthenticationToken and not self.has_cookies():
             # Not yet logged in.
             if self.autologin and self.username and self.password:
@@ -340,6 +365,13 @@ def _authentication(request_fun):
                 # an AuthenticationError and give up.
                 with _handle_auth_error("Autologin failed."):
                     self.login()
+                if rewind is None:
+                    raise AuthenticationError(
+                        "Request failed: the session expired, and the streamed "
+                        "body cannot be sent again after logging in.",
+                        he,
+                    )
+                rewind()
                 with _handle_auth_error(
                     "Authentication Failed! If session token is used, it seems to have been expired."
                 ):
@@ -510,6 +542,24 @@ class Context:
     :type retries: ``int``
     :param retryDelay: How long to wait between connection attempts if `retries` > 0 (optional, defaults to 10s).
     :type retryDelay: ``int`` (in seconds)
+    :param pool_maxsize: The number of idle keep-alive connections the default
+        handler keeps per host (optional, the default is 10). Use 0 to open a
+        new connection for every request.
+    :type pool_maxsize: ``int``
+    :param pool_idle_timeout: How long an idle pooled connection is kept before
+        it is discarded (optional, the default is 10s).
+    :type pool_idle_timeout: ``int`` (in seconds)
+    :param compression: The content coding of request bodies, "gzip" or
+        "deflate" (optional, the default is "None", which sends them as they
+        are).
+    :type compression: ``string``
+    :param compression_threshold: The smallest request body that is
+        compressed, in bytes (optional, the default is 8192).
+    :type compression_threshold: ``int``
+    :param accept_compressed: Whether to ask splunkd for compressed responses,
+        which the default handler decompresses as they are read (optional, the
+        default is False).
+    :type accept_compressed: ``Boolean``
     :param handler: The HTTP request handler (optional).
     :returns: A ``Context`` instance.
 
@@ -527,16 +577,7 @@ class Context:
     """
 
     def __init__(self, handler=None, **kwargs):
-        self.http = HttpLib(
-            handler,
-            kwargs.get("verify", False),
-            key_file=kwargs.get("key_file"),
-            cert_file=kwargs.get("cert_file"),
-            context=kwargs.get("context"),
-            # Default to False for backward compat
-            retries=kwargs.get("retries", 0),
-            retryDelay=kwargs.get("retryDelay", 10),
-        )
+        self.http = self._make_http(handler, kwargs)
         self.token = kwargs.get("token", _NoAuthenticationToken)
         if self.token is None:  # In case someone explicitly passes token=None
             self.token = _NoAuthenticationToken
@@ -560,6 +601,29 @@ class Context:
         ]:
             _parse_cookies(kwargs["cookie"], self.http._cookies)
 
+    @staticmethod
+    def _make_http(handler, kwargs):
+        # Builds the HttpLib that carries the requests of this context
+        return HttpLib(
+            handler,
+            kwargs.get("verify", False),
+            key_file=kwargs.get("key_file"),
+            cert_file=kwargs.get("cert_file"),
+            context=kwargs.get("context"),
+            # Default to False for backward compat
+            retries=kwargs.get("retries", 0),
+            retryDelay=kwargs.get("retryDelay", 10),
+            pool_maxsize=kwargs.get("pool_maxsize", DEFAULT_POOL_MAXSIZE),
+            pool_idle_timeout=kwargs.get(
+                "pool_idle_timeout", DEFAULT_POOL_IDLE_TIMEOUT
+            ),
+            compression=kwargs.get("compression"),
+            compression_threshold=kwargs.get(
+                "compression_threshold", DEFAULT_COMPRESSION_THRESHOLD
+            ),
+            accept_compressed=kwargs.get("accept_compressed", False),
+        )
+
     def get_cookies(self):
         """Gets the dictionary of cookies from the ``HttpLib`` member of this instance.
 
@@ -966,29 +1030,7 @@ class Context:
             c = binding.Context(...).login()
             # Then issue requests...
         """
-
-        if self.has_cookies() and (not self.username and not self.password):
-            # If we were passed session cookie(s), but no username or
-            # password, then login is a nop, since we're automatically
-            # logged in.
-            return
-
-        if self.token is not _NoAuthenticationToken and (
-            not self.username and not self.password
-        ):
-            # If we were passed a session token, but no username or
-            # password, then login is a nop, since we're automatically
-            # logged in.
-            return
-
-        if self.basic and (self.username and self.password):
-            # Basic auth mode requested, so this method is a nop as long
-            # as credentials were passed in.
-            return
-
-        if self.bearerToken:
-            # Bearer auth mode requested, so this method is a nop as long
-            # as authentication token was passed in.
+        if self._login_is_nop():
             return
         # Only try to get a token and updated cookie if username & password are specified
         try:
@@ -1010,6 +1052,34 @@ class Context:
             else:
                 raise
 
+    def _login_is_nop(self):
+        """Indicates whether :meth:`login` has nothing to do, because the
+        ``Context`` already carries the credentials it authenticates with."""
+        if self.has_cookies() and (not self.username and not self.password):
+            # If we were passed session cookie(s), but no username or
+            # password, then login is a nop, since we're automatically
+            # logged in.
+            return True
+
+        if self.token is not _NoAuthenticationToken and (
+            not self.username and not self.password
+        ):
+            # If we were passed a session token, but no username or
+            # password, then login is a nop, since we're automatically
+            # logged in.
+            return True
+
+        if self.basic and (self.username and self.password):
+            # Basic auth mode requested, so this method is a nop as long
+            # as credentials were passed in.
+            return True
+
+        if self.bearerToken:
+            # Bearer auth mode requested, so this method is a nop as long
+            # as authentication token was passed in.
+            return True
+        return False
+
     def logout(self):
         """Forgets the current session token, and cookies."""
         self.token = _NoAuthenticationToken
@@ -1245,7 +1315,13 @@ class HttpLib:
         - headers: A list of pairs specifying the HTTP headers (for example: ``[('key': value), ...]``).
 
         - body: A string containing the body to send with the request (this string
-          should default to '').
+          should default to ''). The default handler also accepts a
+          ``memoryview`` or other buffer, which is sent without a copy, a file
+          object, which is sent with ``sendfile`` when it is a regular file
+          opened in binary mode, and an iterable of ``bytes`` or ``str``
+          chunks. Text read from a file opened in text mode, like ``str``
+          chunks, is encoded as UTF-8. Streams of unknown length are sent
+          with chunked transfer encoding.
 
     and ``response_dict`` is a dictionary with the following keys:
 
@@ -1263,6 +1339,15 @@ class HttpLib:
     to get a handler function.
 
     If using the default handler, SSL verification can be disabled by passing verify=False.
+    The default handler keeps up to *pool_maxsize* idle keep-alive connections
+    per host for *pool_idle_timeout* seconds, so consecutive requests reuse
+    the same socket instead of paying a new TCP and TLS handshake.
+
+    With a *compression* of "gzip" or "deflate", request bodies of at least
+    *compression_threshold* bytes are compressed and sent with a
+    ``Content-Encoding`` header. With *accept_compressed*, requests carry an
+    ``Accept-Encoding`` header, and the default handler decompresses the
+    responses as they are read.
     """
 
     def __init__(
@@ -1274,16 +1359,31 @@ class HttpLib:
         context=None,
         retries=0,
         retryDelay=10,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        pool_idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT,
+        compression=None,
+        compression_threshold=DEFAULT_COMPRESSION_THRESHOLD,
+        accept_compressed=False,
     ):
+        if compression is not None and compression not in _CONTENT_CODINGS:
+            raise ValueError(f"Unsupported compression: {compression}")
         if custom_handler is None:
             self.handler = handler(
-                verify=verify, key_file=key_file, cert_file=cert_file, context=context
+                verify=verify,
+                key_file=key_file,
+                cert_file=cert_file,
+                context=context,
+                pool_maxsize=pool_maxsize,
+                pool_idle_timeout=pool_idle_timeout,
             )
         else:
             self.handler = custom_handler
         self._cookies = {}
         self.retries = retries
         self.retryDelay = retryDelay
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.accept_compressed = accept_compressed
 
     def delete(self, url, headers=None, **kwargs):
         """Sends a DELETE request to a URL.
@@ -1354,6 +1454,8 @@ class HttpLib:
             keywords and their arguments will be URL encoded. If there is no
             ``body`` keyword argument, all the keyword arguments are encoded
             into the body of the request in the format ``x-www-form-urlencoded``.
+            The ``body`` can be streamed, as described in :class:`HttpLib`; a
+            request with a streamed body is not retried.
         :type kwargs: ``dict``
         :returns: A dictionary describing the response (see :class:`HttpLib` for
             its structure).
@@ -1396,12 +1498,18 @@ class HttpLib:
             its structure).
         :rtype: ``dict``
         """
+        message = self._encode_message(message)
+        body = message.get("body")
+        # A streamed body is consumed by the first attempt
+        streamed = body is not None and not isinstance(
+            body, (bytes, bytearray, memoryview, str)
+        )
         while True:
             try:
                 response = self.handler(url, message, **kwargs)
                 break
             except Exception:
-                if self.retries <= 0:
+                if self.retries <= 0 or streamed:
                     raise
                 else:
                     time.sleep(self.retryDelay)
@@ -1409,7 +1517,34 @@ class HttpLib:
         response = record(response)
         if 400 <= response.status:
             raise HTTPError(response)
+        self._update_cookies(response)
+        return response
 
+    def _encode_message(self, message):
+        names = {name.lower() for name, _ in message["headers"]}
+        headers = list(message["headers"])
+        if self.accept_compressed and "accept-encoding" not in names:
+            headers.append(("Accept-Encoding", ", ".join(_CONTENT_CODINGS)))
+        body = message.get("body")
+        if (
+            self.compression is not None
+            and isinstance(body, (bytes, str))
+            and len(body) >= self.compression_threshold
+            and "content-encoding" not in names
+        ):
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            if self.compression == "gzip":
+                body = gzip.compress(body)
+            else:
+                body = zlib.compress(body)
+            headers.append(("Content-Encoding", self.compression))
+            return dict(message, headers=headers, body=body)
+        if len(headers) == len(message["headers"]):
+            return message
+        return dict(message, headers=headers)
+
+    def _update_cookies(self, response):
         # Update the cookie with any HTTP request
         # Initially, assume list of 2-tuples
         key_value_tuples = response.headers
@@ -1421,8 +1556,6 @@ class HttpLib:
             if key.lower() == "set-cookie":
                 _parse_cookies(value, self._cookies)
 
-        return response
-
 
 # Converts an httplib response into a file-like object.
 class ResponseReader(io.RawIOBase):
@@ -1431,15 +1564,32 @@ class ResponseReader(io.RawIOBase):
     The ``ResponseReader`` class is intended to be a layer to unify the different
     types of HTTP libraries used with this SDK. This class also provides a
     preview of the stream and a few useful predicates.
+
+    When the response came from a pooled keep-alive connection, *release* is
+    called once the body has been read to the end, which hands the connection
+    back to the pool. A response closed before it was fully read closes its
+    connection instead, since the unread remainder would corrupt the next
+    request on that socket.
+
+    A response with an *encoding* of "gzip" or "deflate" is decompressed a
+    block at a time as it is read.
     """
 
+    # The number of compressed bytes read from the response at a time
+    _BLOCK_SIZE = 64 * 1024
+
     # For testing, you can use a StringIO as the argument to
     # ``ResponseReader`` instead of an ``httplib.HTTPResponse``. It
     # will work equally well.
-    def __init__(self, response, connection=None):
+    def __init__(self, response, connection=None, release=None, encoding=None):
         self._response = response
         self._connection = connection
+        self._release = release
         self._buffer = b""
+        self._decompressor = None
+        if encoding is not None and encoding.lower() in _CONTENT_CODINGS:
+            # Detects the gzip or zlib header by itself
+            self._decompressor = zlib.decompressobj(32 + zlib.MAX_WBITS)
 
     def __str__(self):
         return str(self.read(), "UTF-8")
@@ -1466,6 +1616,8 @@ class ResponseReader(io.RawIOBase):
         """Closes this response."""
         if self._connection:
             self._connection.close()
+            self._connection = None
+        self._release = None
         self._response.close()
 
     def read(self, size=None):
@@ -1480,9 +1632,43 @@ class ResponseReader(io.RawIOBase):
         self._buffer = b""
         if size is not None:
             size -= len(r)
-        r = r + self._response.read(size)
+        if self._decompressor is None:
+            r = r + self._response.read(size)
+        else:
+            r = r + self._decompress(size)
+        if self._release is not None and self._response.isclosed():
+            self._release_connection()
         return r
 
+    def _decompress(self, size):
+        decompressor = self._decompressor
+        if size is None:
+            data = decompressor.unconsumed_tail + self._response.read()
+            return decompressor.decompress(data) + decompressor.flush()
+        chunks = []
+        while size > 0 and not decompressor.eof:
+            data = decompressor.unconsumed_tail
+            if not data:
+                data = self._response.read(self._BLOCK_SIZE)
+                if not data:
+                    chunks.append(decompressor.flush())
+                    break
+            chunk = decompressor.decompress(data, size)
+            size -= len(chunk)
+            chunks.append(chunk)
+        if decompressor.eof:
+            # Lets the response notice its end, so the connection is released
+            self._response.read()
+        return b"".join(chunks)
+
+    def _release_connection(self):
+        # The body has been consumed, so the connection can carry another
+        # request. From here on it belongs to the pool, not to this reader.
+        release = self._release
+        self._release = None
+        self._connection = None
+        release()
+
     def readable(self):
         """Indicates that the response reader is readable."""
         return True
@@ -1501,10 +1687,199 @@ class ResponseReader(io.RawIOBase):
         return bytes_read
 
 
-def handler(key_file=None, cert_file=None, timeout=None, verify=False, context=None):
+class _ConnectionPool:
+    """A thread-safe pool of idle keep-alive connections.
+
+    Idle connections are kept per ``(scheme, host, port)``, at most *maxsize*
+    of them per key, and are discarded once they have been idle for longer
+    than *idle_timeout* seconds. A connection that is checked out with
+    :meth:`acquire` is owned exclusively by the caller until it is handed back
+    with :meth:`release`.
+
+    :param connect: A function ``connect(scheme, host, port)`` returning a new
+        ``HTTPConnection``.
+    :param maxsize: The maximum number of idle connections kept per key.
+    :type maxsize: ``integer``
+    :param idle_timeout: The number of seconds an idle connection is kept, or
+        ``None`` to keep idle connections indefinitely.
+    :type idle_timeout: ``integer`` or ``None``
+    """
+
+    def __init__(self, connect, maxsize=DEFAULT_POOL_MAXSIZE, idle_timeout=None):
+        self._connect = connect
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _expired(self, last_used, now):
+        return self.idle_timeout is not None and now - last_used > self.idle_timeout
+
+    @staticmethod
+    def _dropped(connection):
+        # An idle connection has nothing to read unless the server hung up
+        sock = connection.sock
+        if sock is None:
+            return False
+        try:
+            return bool(select.select([sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+
+    def acquire(self, scheme, host, port):
+        """Checks out a connection, reusing an idle one when possible.
+
+        :return: A 2-tuple of the connection and whether it was reused.
+        """
+        key = (scheme, host, port)
+        now = time.monotonic()
+        stale = []
+        connection = None
+        with self._lock:
+            idle = self._idle.get(key)
+            # Most recently used first: it is the least likely to have been
+            # dropped by the server.
+            while idle:
+                candidate, last_used = idle.pop()
+                if self._expired(last_used, now) or self._dropped(candidate):
+                    stale.append(candidate)
+                else:
+                    connection = candidate
+                    break
+        for candidate in stale:
+            candidate.close()
+        if connection is None:
+            return self._connect(scheme, host, port), False
+        return connection, True
+
+    def release(self, scheme, host, port, connection):
+        """Returns a connection to the pool once its response has been read."""
+        key = (scheme, host, port)
+        now = time.monotonic()
+        discard = []
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            while idle and self._expired(idle[0][1], now):
+                discard.append(idle.popleft()[0])
+            if len(idle) < self.maxsize:
+                idle.append((connection, now))
+            else:
+                discard.append(connection)
+        for candidate in discard:
+            candidate.close()
+
+    def clear(self):
+        """Closes and forgets every idle connection in the pool."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection, _ in connections:
+                connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(connections) for connections in self._idle.values())
+
+
+# Errors raised when a request is sent on a keep-alive connection that the
+# server has already closed. A request that failed while it was sent never
+# reached the server, so it is safe to send it again on a fresh connection.
+_STALE_CONNECTION_ERRORS = (ConnectionError, client.BadStatusLine)
+
+# Requests that can be sent again after the response was lost
+_IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+
+def _regular_file_size(body):
+    """Returns the number of bytes left in *body* if it is a regular file
+    opened in binary mode, which can be sent with ``sendfile``, or ``None``."""
+    if "b" not in getattr(body, "mode", ""):
+        return None
+    try:
+        status = os.fstat(body.fileno())
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+    if not stat.S_ISREG(status.st_mode):
+        return None
+    return max(status.st_size - body.tell(), 0)
+
+
+def _content_length(body):
+    """Returns the ``Content-Length`` of a request *body*, or ``None`` when it
+    is streamed with chunked transfer encoding."""
+    if body is None:
+        return 0
+    if isinstance(body, memoryview):
+        return body.nbytes
+    if isinstance(body, (bytes, bytearray, str)):
+        return len(body)
+    if hasattr(body, "read"):
+        return _regular_file_size(body)
+    return None
+
+
+def _rewinder(body):
+    """Returns a function that makes *body* ready to be sent again, or
+    ``None`` when *body* is a stream that is consumed by sending it."""
+    if hasattr(body, "read"):
+        if not getattr(body, "seekable", lambda: False)():
+            return None
+        start = body.tell()
+        return lambda: body.seek(start)
+    if isinstance(body, Iterator):
+        return None
+    return lambda: None
+
+
+def _text_chunks(body):
+    """Yields the rest of the text stream *body* in blocks encoded as UTF-8."""
+    for block in iter(lambda: body.read(8192), ""):
+        yield block.encode("utf-8")
+
+
+def _encode_chunks(body):
+    for chunk in body:
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+def _send_request(connection, method, path, body, head):
+    """Sends a request on *connection*, with ``sendfile`` when *body* is a
+    regular file, and as :meth:`http.client.HTTPConnection.request` does
+    otherwise: in one piece for a string or buffer, and with chunked transfer
+    encoding for an iterable or other stream of unknown length."""
+    size = _regular_file_size(body)
+    if size is None:
+        connection.request(method, path, body, head)
+        return
+    names = {name.lower() for name in head}
+    connection.putrequest(
+        method,
+        path,
+        skip_host="host" in names,
+        skip_accept_encoding="accept-encoding" in names,
+    )
+    for name, value in head.items():
+        connection.putheader(name, value)
+    connection.endheaders()
+    connection.sock.sendfile(body, body.tell(), size)
+
+
+def handler(
+    key_file=None,
+    cert_file=None,
+    timeout=None,
+    verify=False,
+    context=None,
+    pool_maxsize=DEFAULT_POOL_MAXSIZE,
+    pool_idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT,
+):
     """This class returns an instance of the default HTTP request handler using
     the values you provide.
 
+    The handler keeps connections alive and reuses them across requests to the
+    same scheme, host, and port. The pool is available as the ``pool``
+    attribute of the returned function.
+
     :param `key_file`: A path to a PEM (Privacy Enhanced Mail) formatted file containing your private key (optional).
     :type key_file: ``string``
     :param `cert_file`: A path to a PEM (Privacy Enhanced Mail) formatted file containing a certificate chain file (optional).
@@ -1515,6 +1890,11 @@ def handler(key_file=None, cert_file=None, timeout=None, verify=False, context=N
     :type verify: ``Boolean``
     :param `context`: The SSLContext that can is used with the HTTPSConnection when verify=True is enabled and context is specified
     :type context: ``SSLContext`
+    :param `pool_maxsize`: The number of idle connections kept per host (optional, the default is 10).
+        Use 0 or "None" to disable keep-alive and open a new connection for every request.
+    :type pool_maxsize: ``integer`` or "None"
+    :param `pool_idle_timeout`: The number of seconds an idle connection is kept in the pool (optional, the default is 10).
+    :type pool_idle_timeout: ``integer`` or "None"
     """
 
     def connect(scheme, host, port):
@@ -1538,40 +1918,110 @@ def handler(key_file=None, cert_file=None, timeout=None, verify=False, context=N
             return client.HTTPSConnection(host, port, **kwargs)
         raise ValueError(f"unsupported scheme: {scheme}")
 
+    pool = (
+        _ConnectionPool(connect, pool_maxsize, pool_idle_timeout)
+        if pool_maxsize
+        else None
+    )
+
     def request(url, message, **kwargs):
         scheme, host, port, path = _spliturl(url)
         body = message.get("body", "")
         head = {
-            "Content-Length": str(len(body)),
             "Host": host,
             "User-Agent": "splunk-sdk-python/%s" % __version__,
             "Accept": "*/*",
-            "Connection": "Close",
+            "Connection": "Keep-Alive" if pool is not None else "Close",
         }  # defaults
+        length = _content_length(body)
+        if length is not None:
+            head["Content-Length"] = str(length)
         for key, value in message["headers"]:
             head[key] = value
         method = message.get("method", "GET")
 
-        connection = connect(scheme, host, port)
-        is_keepalive = False
-        try:
-            connection.request(method, path, body, head)
-            if timeout is not None:
-                connection.sock.settimeout(timeout)
-            response = connection.getresponse()
+        # A body read from a stream can only be sent again if the stream can
+        # be rewound to where it started.
+        replayable = body is None or isinstance(
+            body, (bytes, bytearray, memoryview, str)
+        )
+        start = None
+        if hasattr(body, "read"):
+            if getattr(body, "seekable", lambda: False)():
+                start = body.tell()
+                replayable = True
+        elif not replayable:
+            # An iterable of chunks, sent with chunked transfer encoding
+            body = _encode_chunks(body)
+
+        while True:
+            if pool is not None:
+                connection, reused = pool.acquire(scheme, host, port)
+            else:
+                connection, reused = connect(scheme, host, port), False
+            sent = False
+            try:
+                payload = body
+                if isinstance(body, io.TextIOBase):
+                    # http.client would encode the text as Latin-1
+                    payload = _text_chunks(body)
+                _send_request(connection, method, path, payload, head)
+                sent = True
+                if timeout is not None:
+                    connection.sock.settimeout(timeout)
+                response = connection.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                connection.close()
+                # The server closed the idle connection under us. If it went
+                # away while the request was sent, it never made it; once it
+                # was sent, only an idempotent request may be sent again.
+                if (
+                    reused
+                    and replayable
+                    and (not sent or method.upper() in _IDEMPOTENT_METHODS)
+                ):
+                    if start is not None:
+                        body.seek(start)
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            break
+
+        release = None
+        if pool is not None and not response.will_close:
+
+            def release():
+                pool.release(scheme, host, port, connection)
+
+            if response.length == 0:
+                # Nothing to read (e.g. 204 No Content), so the connection
+                # can go straight back to the pool.
+                response.read()
+                release()
+                release = None
+                connection = None
+        else:
             is_keepalive = (
                 "keep-alive"
                 in response.getheader("connection", default="close").lower()
             )
-        finally:
             if not is_keepalive:
                 connection.close()
+                connection = None
 
         return {
             "status": response.status,
             "reason": response.reason,
             "headers": response.getheaders(),
-            "body": ResponseReader(response, connection if is_keepalive else None),
+            "body": ResponseReader(
+                response,
+                connection,
+                release,
+                encoding=response.getheader("Content-Encoding"),
+            ),
         }
 
+    request.pool = pool
     return request
@@ -62,18 +62,28 @@ import contextlib
 import datetime
 import json
 import logging
+import queue
 import re
 import socket
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from time import sleep
+from io import BytesIO
+from itertools import islice
+from time import monotonic, sleep
 from urllib import parse
 
 from . import data
 from .data import record
+from .results import JSONResultsReader
+from .spool import SpoolFullError
 from .binding import (
     AuthenticationError,
     Context,
     HTTPError,
+    ResponseReader,
     UrlEncoded,
     _encode,
     _make_cookie_header,
@@ -88,6 +98,7 @@ __all__ = [
     "NotSupportedError",
     "OperationError",
     "IncomparableException",
+    "ResponseCache",
     "Service",
     "namespace",
     "AuthenticationError",
@@ -122,6 +133,7 @@ PATH_STORAGE_PASSWORDS = "storage/passwords"
 XNAMEF_ATOM = "{http://www.w3.org/2005/Atom}%s"
 XNAME_ENTRY = XNAMEF_ATOM % "entry"
 XNAME_CONTENT = XNAMEF_ATOM % "content"
+XNAME_TOTAL_RESULTS = "{http://a9.com/-/spec/opensearch/1.1/}totalResults"
 
 MATCH_ENTRY_CONTENT = f"{XNAME_ENTRY}/{XNAME_CONTENT}/*"
 
@@ -197,6 +209,57 @@ def _filter_content(content, *args):
     )
 
 
+def _chunks(iterable, size):
+    """Yield lists of up to *size* consecutive items of *iterable*."""
+    items = iter(iterable)
+    chunk = list(islice(items, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(items, size))
+
+
+def _bounded_map(fn, iterable, max_workers, ordered=True):
+    """Yield ``fn(item)`` for each item of *iterable*, running up to
+    *max_workers* calls at once on a thread pool.
+
+    At most *max_workers* results are pending at any time, so a slow consumer
+    holds back the producers instead of letting results pile up. Results come
+    in the order of *iterable* when *ordered* is ``True``, and in completion
+    order otherwise. With *max_workers* of 1 or less, everything runs on the
+    calling thread.
+    """
+    if max_workers <= 1:
+        for item in iterable:
+            yield fn(item)
+        return
+    items = iter(iterable)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(executor.submit(fn, item))
+                if len(pending) < max_workers:
+                    continue
+                if ordered:
+                    yield pending.popleft().result()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        yield future.result()
+            while pending:
+                if ordered:
+                    yield pending.popleft().result()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
 # Construct a resource path from the given base path + resource name
 def _path(base, name):
     if not base.endswith("/"):
@@ -211,8 +274,84 @@ def _load_atom(response, match=None):
     return data.load(response.body.read().decode("utf-8", "xmlcharrefreplace"), match)
 
 
+# Whether the body of the given response is JSON rather than Atom XML
+def _is_json(response):
+    for key, value in response.headers:
+        if key.lower() == "content-type":
+            return "json" in value.lower()
+    return False
+
+
+# Convert a decoded JSON value to what data.load makes of its XML counterpart:
+# scalars become strings, booleans "1" or "0", and blank strings None. Numbers
+# are already strings holding their text in the response (see
+# _load_json_entries), as they are in Atom.
+def _json_value(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, str):
+        return value if value.strip() else None
+    if isinstance(value, dict):
+        return record((k, _json_value(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_json_value(v) for v in value]
+    return value
+
+
+# Convert an entry of an output_mode=json response to the shape of an Atom
+# entry record, so that _parse_atom_entry applies to both
+def _json_entry(entry):
+    content = _json_value(entry.get("content") or {})
+    if "type" in content:
+        # In Atom, a "type" key is merged with the type="text/xml" attribute
+        # of <content>, which _parse_atom_entry strips again.
+        content["type"] = ["text/xml", content["type"]]
+    if entry.get("acl"):
+        content["eai:acl"] = _json_value(entry["acl"])
+    fields = entry.get("fields") or {}
+    content["eai:attributes"] = record(
+        {
+            "requiredFields": fields.get("required", []),
+            "optionalFields": fields.get("optional", []),
+            "wildcardFields": fields.get("wildcard", []),
+        }
+    )
+    links = [
+        record({"rel": rel, "href": href})
+        for rel, href in (entry.get("links") or {}).items()
+    ]
+    return record(
+        {
+            "title": entry.get("name"),
+            "id": entry.get("id"),
+            "author": entry.get("author"),
+            "updated": entry.get("updated"),
+            "link": links,
+            "content": content,
+        }
+    )
+
+
+# Load the entries of an output_mode=json response as Atom entry records
+def _load_json_entries(response):
+    body = json.loads(
+        response.body.read().decode("utf-8"), parse_int=str, parse_float=str
+    )
+    return [_json_entry(entry) for entry in body.get("entry", [])]
+
+
+# Load the content record of the first entry of the given response
+def _load_content(response):
+    if _is_json(response):
+        entries = _load_json_entries(response)
+        return entries[0].content if entries else record()
+    return _load_atom(response, MATCH_ENTRY_CONTENT)
+
+
 # Load an array of atom entries from the body of the given response
 def _load_atom_entries(response):
+    if _is_json(response):
+        return _load_json_entries(response)
     r = _load_atom(response)
     if "feed" in r:
         # Need this to handle a random case in the REST API
@@ -232,6 +371,33 @@ def _load_atom_entries(response):
     return entries if isinstance(entries, list) else [entries]
 
 
+# Iterate over the atom entries in the body of the given response, parsing
+# them one at a time instead of loading the whole feed first
+def _iter_atom_entries(response):
+    if _is_json(response):
+        yield from _load_json_entries(response)
+        return
+    empty = False
+    for name, value in data.iterload(response.body, (XNAME_ENTRY, XNAME_TOTAL_RESULTS)):
+        # Same random case in the REST API as in _load_atom_entries
+        if name == "totalResults":
+            empty = value in [0, "0"]
+        elif not empty:
+            yield value
+
+
+_ATOM_TOTAL_RESULTS = re.compile(rb"<(?:\w+:)?totalResults[^>]*>\s*(\d+)")
+_JSON_PAGING_TOTAL = re.compile(rb'"paging"\s*:\s*\{[^}]*"total"\s*:\s*(\d+)')
+
+
+# Find the total number of entries of a collection in the body of a response
+# listing one page of it, or None
+def _total_results(response, body):
+    pattern = _JSON_PAGING_TOTAL if _is_json(response) else _ATOM_TOTAL_RESULTS
+    match = pattern.search(body)
+    return int(match.group(1)) if match else None
+
+
 # Load the sid from the body of the given response
 def _load_sid(response, output_mode):
     if output_mode == "json":
@@ -244,9 +410,7 @@ def _load_sid(response, output_mode):
 def _parse_atom_entry(entry):
     title = entry.get("title", None)
 
-    elink = entry.get("link", [])
-    elink = elink if isinstance(elink, list) else [elink]
-    links = record((link.rel, link.href) for link in elink)
+    links = _parse_atom_links(entry)
 
     # Retrieve entity content values
     content = entry.get("content", {})
@@ -260,16 +424,11 @@ def _parse_atom_entry(entry):
     )
 
     if "type" in content:
-        if isinstance(content["type"], list):
-            content["type"] = [t for t in content["type"] if t != "text/xml"]
-            # Unset type if it was only 'text/xml'
-            if len(content["type"]) == 0:
-                content.pop("type", None)
-            # Flatten 1 element list
-            if len(content["type"]) == 1:
-                content["type"] = content["type"][0]
-        else:
+        content_type = _parse_content_type(content["type"])
+        if content_type is None:
             content.pop("type", None)
+        else:
+            content["type"] = content_type
 
     return record(
         {
@@ -283,6 +442,26 @@ def _parse_atom_entry(entry):
     )
 
 
+# Parse the "type" field of an atom entry content record, which data.load
+# merges with the type="text/xml" attribute of <content>
+def _parse_content_type(value):
+    if not isinstance(value, list):
+        # Unset type if it was only 'text/xml'
+        return None
+    types = [t for t in value if t != "text/xml"]
+    if len(types) == 0:
+        return None
+    # Flatten 1 element list
+    return types[0] if len(types) == 1 else types
+
+
+# Parse the links of the given atom entry record into a rel -> href record
+def _parse_atom_links(entry):
+    elink = entry.get("link", [])
+    elink = elink if isinstance(elink, list) else [elink]
+    return record((link.rel, link.href) for link in elink)
+
+
 # Parse the metadata fields out of the given atom entry content record
 def _parse_atom_metadata(content):
     # Hoist access metadata
@@ -358,6 +537,167 @@ def connect(**kwargs):
     return s
 
 
+# Strip the namespace prefix off an absolute REST path: the endpoint of
+# /servicesNS/nobody/search/saved/searches/foo is saved/searches/foo
+def _endpoint(path):
+    path = path.split("?", 1)[0].strip("/")
+    if path.startswith("servicesNS/"):
+        return "/".join(path.split("/")[3:])
+    if path.startswith("services/"):
+        return path[len("services/") :]
+    return path
+
+
+# Whether endpoint *b* is *a*, or below or above it
+def _endpoints_overlap(a, b):
+    return a == b or a.startswith(b + "/") or b.startswith(a + "/")
+
+
+class _CachedResponse:
+    """A GET response held by a :class:`ResponseCache`."""
+
+    def __init__(self, endpoint, response, body, expires):
+        self.endpoint = endpoint
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.body = body
+        self.expires = expires
+
+    def header(self, name):
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    def response(self):
+        return record(
+            {
+                "status": self.status,
+                "reason": self.reason,
+                "headers": self.headers,
+                "body": ResponseReader(BytesIO(self.body)),
+            }
+        )
+
+
+class ResponseCache:
+    """A size-bounded cache of GET responses, which a :class:`Service` given
+    one with its ``cache`` argument uses for all its GET requests.
+
+    Responses are kept for *ttl* seconds, or for as long as *ttls* sets for
+    the endpoint requested. Once more than *maxsize* responses are kept, the
+    least recently used is dropped. A POST or DELETE request through the
+    service drops the cached responses of its endpoint, and of the endpoints
+    above and below it, in any namespace. When a cached response carried an
+    ``ETag`` or ``Last-Modified`` header, it is revalidated with a conditional
+    request once it expires, and kept if splunkd answers 304 Not Modified.
+
+    Search jobs and KV Store data change too often to be cached, so their
+    endpoints have a TTL of 0 unless *ttls* sets another. Responses are
+    cached without regard to who requested them: only share a cache between
+    services that log in as the same user.
+
+    :param maxsize: The maximum number of responses to keep (the default is
+        256).
+    :type maxsize: ``integer``
+    :param ttl: The number of seconds to keep a response for (the default is
+        30).
+    :type ttl: ``integer`` or ``float``
+    :param ttls: The number of seconds to keep responses for, by endpoint,
+        such as ``{"server/info": 300, "configs/conf-props": 5}``. An endpoint
+        applies to the paths below it too, the longest match winning, and a
+        TTL of 0 disables caching.
+    :type ttls: ``dict``
+
+    **Example**::
+
+        import splunklib.client as client
+        s = client.connect(..., cache=client.ResponseCache(ttls={"apps": 300}))
+        s.apps["search"]  # Round trip
+        s.apps["search"]  # Cached
+    """
+
+    #: The TTLs of endpoints that must not be cached by default.
+    DEFAULT_TTLS = {
+        PATH_JOBS: 0,
+        PATH_JOBS_V2: 0,
+        "storage/collections/data": 0,
+    }
+
+    def __init__(self, maxsize=256, ttl=30, ttls=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttls = {}
+        for endpoint, seconds in dict(self.DEFAULT_TTLS, **(ttls or {})).items():
+            self.ttls[endpoint.strip("/")] = seconds
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._responses)
+
+    def ttl_for(self, path):
+        """Returns the TTL of the endpoint of *path*, in seconds.
+
+        :param path: An absolute REST path, or an endpoint.
+        :type path: ``string``
+        """
+        endpoint = _endpoint(path)
+        best = None
+        for prefix in self.ttls:
+            if endpoint == prefix or endpoint.startswith(prefix + "/"):
+                if best is None or len(prefix) > len(best):
+                    best = prefix
+        return self.ttl if best is None else self.ttls[best]
+
+    def lookup(self, key):
+        """Returns the response cached under *key*, expired or not, or
+        ``None``."""
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None:
+                self._responses.move_to_end(key)
+            return cached
+
+    def store(self, key, path, response, body):
+        """Caches *response*, whose body has been read as *body*, under *key*
+        for the TTL of *path*, and returns the cached response."""
+        expires = monotonic() + self.ttl_for(path)
+        cached = _CachedResponse(_endpoint(path), response, body, expires)
+        with self._lock:
+            self._responses[key] = cached
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.maxsize:
+                self._responses.popitem(last=False)
+        return cached
+
+    def invalidate(self, path=None):
+        """Drops the cached responses of the endpoint of *path*, and of the
+        endpoints above and below it, or all cached responses if *path* is
+        ``None``.
+
+        :param path: An absolute REST path, or an endpoint (optional).
+        :type path: ``string``
+        """
+        with self._lock:
+            if path is None:
+                self._responses.clear()
+                return
+            endpoint = _endpoint(path)
+            stale = [
+                key
+                for key, cached in self._responses.items()
+                if _endpoints_overlap(cached.endpoint, endpoint)
+            ]
+            for key in stale:
+                del self._responses[key]
+
+    def clear(self):
+        """Drops all cached responses."""
+        self.invalidate()
+
+
 # In preparation for adding Storm support, we added an
 # intermediary class between Service and Context. Storm's
 # API is not going to be the same as enterprise Splunk's
@@ -415,6 +755,15 @@ class Service(_BaseService):
     :type retries: ``int``
     :param retryDelay: How long to wait between connection attempts if `retries` > 0 (optional, defaults to 10s).
     :type retryDelay: ``int`` (in seconds)
+    :param output_mode: The format in which entities and collections are read
+        (optional). Use "json" to have them read as JSON, which is much faster
+        to parse than the default Atom XML. Entity state is the same in both
+        modes.
+    :type output_mode: "json" or "xml"
+    :param cache: A cache of GET responses (optional), or ``True`` for a
+        :class:`ResponseCache` with its default settings. Without one, every
+        read makes at least one round trip.
+    :type cache: :class:`ResponseCache` or ``boolean``
     :return: A :class:`Service` instance.
 
     **Example**::
@@ -432,9 +781,95 @@ class Service(_BaseService):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.output_mode = kwargs.get("output_mode")
+        cache = kwargs.get("cache")
+        self.cache = ResponseCache() if cache is True else cache or None
         self._splunk_version = None
         self._kvstore_owner = None
         self._instance_type = None
+        self._input_kinds = None
+
+    def get(
+        self, path_segment, owner=None, app=None, headers=None, sharing=None, **query
+    ):
+        """Performs a GET operation, as :meth:`splunklib.binding.Context.get`
+        does, answering from :attr:`cache` when the service has one and it
+        holds a fresh response.
+        """
+        cache = self.cache
+        path = self._abspath(path_segment, owner=owner, app=app, sharing=sharing)
+        if cache is None or cache.ttl_for(path) <= 0:
+            return super().get(path_segment, owner, app, headers, sharing, **query)
+        key = path + "?" + _encode(**dict(sorted(query.items())))
+        cached = cache.lookup(key)
+        if cached is not None and cached.expires > monotonic():
+            return cached.response()
+
+        headers = list(headers or [])
+        if cached is not None:
+            if cached.header("etag"):
+                headers.append(("If-None-Match", cached.header("etag")))
+            if cached.header("last-modified"):
+                headers.append(("If-Modified-Since", cached.header("last-modified")))
+        response = super().get(path_segment, owner, app, headers, sharing, **query)
+        body = response.body.read()
+        if response.status == 304 and cached is not None:
+            return cache.store(key, path, cached, cached.body).response()
+        if response.status != 200:
+            response.body = ResponseReader(BytesIO(body))
+            return response
+        return cache.store(key, path, response, body).response()
+
+    def post(
+        self, path_segment, owner=None, app=None, sharing=None, headers=None, **query
+    ):
+        """Performs a POST operation, as :meth:`splunklib.binding.Context.post`
+        does, dropping the responses to the endpoint from :attr:`cache`.
+        """
+        try:
+            return super().post(path_segment, owner, app, sharing, headers, **query)
+        finally:
+            self._invalidate(path_segment, owner, app, sharing)
+
+    def delete(self, path_segment, owner=None, app=None, sharing=None, **query):
+        """Performs a DELETE operation, as
+        :meth:`splunklib.binding.Context.delete` does, dropping the responses
+        to the endpoint from :attr:`cache`.
+        """
+        try:
+            return super().delete(path_segment, owner, app, sharing, **query)
+        finally:
+            self._invalidate(path_segment, owner, app, sharing)
+
+    def request(self, path_segment, method="GET", headers=None, body={}, **namespace):
+        """Issues an arbitrary HTTP request, as
+        :meth:`splunklib.binding.Context.request` does. Any request but a GET
+        drops the responses to the endpoint from :attr:`cache`.
+        """
+        try:
+            return super().request(path_segment, method, headers, body, **namespace)
+        finally:
+            if method != "GET":
+                self._invalidate(path_segment, **namespace)
+
+    def logout(self):
+        """Forgets the current session token, and cookies, and clears
+        :attr:`cache`."""
+        if self.cache is not None:
+            self.cache.clear()
+        return super().logout()
+
+    def _invalidate(self, path_segment, owner=None, app=None, sharing=None):
+        if self.cache is not None:
+            self.cache.invalidate(
+                self._abspath(path_segment, owner=owner, app=app, sharing=sharing)
+            )
+
+    def _read_query(self, **query):
+        """Returns *query*, plus the ``output_mode`` used to read entities."""
+        if self.output_mode == "json":
+            query.setdefault("output_mode", "json")
+        return query
 
     @property
     def apps(self):
@@ -459,8 +894,8 @@ class Service(_BaseService):
 
         :return: A ``list`` of capabilities.
         """
-        response = self.get(PATH_CAPABILITIES)
-        return _load_atom(response, MATCH_ENTRY_CONTENT).capabilities
+        response = self.get(PATH_CAPABILITIES, **self._read_query())
+        return _load_content(response).capabilities
 
     @property
     def event_types(self):
@@ -494,8 +929,8 @@ class Service(_BaseService):
         :return: The system information, as key-value pairs.
         :rtype: ``dict``
         """
-        response = self.get("/services/server/info")
-        return _filter_content(_load_atom(response, MATCH_ENTRY_CONTENT))
+        response = self.get("/services/server/info", **self._read_query())
+        return _filter_content(_load_content(response))
 
     def input(self, path, kind=None):
         """Retrieves an input by path, and optionally kind.
@@ -1045,9 +1480,26 @@ class Entity(Endpoint):
     def __init__(self, service, path, **kwargs):
         Endpoint.__init__(self, service, path)
         self._state = None
-        if not kwargs.get("skip_refresh", False):
+        if kwargs.get("entry") is not None:
+            self._entry = kwargs["entry"]
+        elif not kwargs.get("skip_refresh", False):
             self.refresh(kwargs.get("state", None))  # "Prefresh"
 
+    # An entity listed by a collection is given its raw Atom entry record,
+    # which is only parsed into the state record when the state is first
+    # used: many callers of list() never look past a few entities or names.
+    @property
+    def _state(self):
+        if self._entry is not None:
+            self._parsed_state = _parse_atom_entry(self._entry)
+            self._entry = None
+        return self._parsed_state
+
+    @_state.setter
+    def _state(self, state):
+        self._entry = None
+        self._parsed_state = state
+
     def __contains__(self, item):
         try:
             self[item]
@@ -1098,6 +1550,14 @@ class Entity(Endpoint):
     # because the "entry" record varies slightly by entity and this allows
     # for a subclass to override and handle any special cases.
     def _load_atom_entry(self, response):
+        if _is_json(response):
+            entries = _load_json_entries(response)
+            if len(entries) > 1:
+                apps = [entry.content.get("eai:appName") for entry in entries]
+                raise AmbiguousReferenceException(
+                    f"Fetch from server returned multiple entries for name '{entries[0].title}' in apps {apps}."
+                )
+            return entries[0]
         elem = _load_atom(response, XNAME_ENTRY)
         if isinstance(elem, list):
             apps = [ele.entry.content.get("eai:appName") for ele in elem]
@@ -1190,7 +1650,7 @@ class Entity(Endpoint):
         if state is not None:
             self._state = state
         else:
-            self._state = self.read(self.get())
+            self._state = self.read(self.get(**self.service._read_query()))
         return self
 
     @property
@@ -1244,6 +1704,8 @@ class Entity(Endpoint):
         :return: The entity name.
         :rtype: ``string``
         """
+        if self._entry is not None:
+            return self._entry.get("title", None)
         return self.state.title
 
     def read(self, response):
@@ -1421,10 +1883,12 @@ class ReadOnlyCollection(Endpoint):
                 # have to extract values out.
                 key, ns = key
                 key = UrlEncoded(key, encode_slash=True)
-                response = self.get(key, owner=ns.owner, app=ns.app)
+                response = self.get(
+                    key, owner=ns.owner, app=ns.app, **self.service._read_query()
+                )
             else:
                 key = UrlEncoded(key, encode_slash=True)
-                response = self.get(key)
+                response = self.get(key, **self.service._read_query())
             entries = self._load_list(response)
             if len(entries) > 1:
                 raise AmbiguousReferenceException(
@@ -1526,19 +1990,28 @@ class ReadOnlyCollection(Endpoint):
         that is, an XML document with a toplevel element ``<feed>``,
         and within that element one or more ``<entry>`` elements.
         """
+        return list(self._iter_list(response))
+
+    def _iter_list(self, response):
+        """Converts *response* to entities one at a time, as :meth:`_load_list`
+        does, constructing each entity as soon as its ``<entry>`` element has
+        been parsed from the response body.
+        """
         # Some subclasses of Collection have to override this because
         # splunkd returns something that doesn't match
         # <feed><entry></entry><feed>.
-        entries = _load_atom_entries(response)
-        if entries is None:
-            return []
-        entities = []
-        for entry in entries:
-            state = _parse_atom_entry(entry)
-            entity = self.item(self.service, self._entity_path(state), state=state)
-            entities.append(entity)
-
-        return entities
+        lazy = isinstance(self.item, type) and issubclass(self.item, Entity)
+        for entry in _iter_atom_entries(response):
+            if not lazy:
+                state = _parse_atom_entry(entry)
+                yield self.item(self.service, self._entity_path(state), state=state)
+                continue
+            # Entities parse their entry when first used; the path only
+            # needs the title and links.
+            state = record(
+                {"title": entry.get("title", None), "links": _parse_atom_links(entry)}
+            )
+            yield self.item(self.service, self._entity_path(state), entry=entry)
 
     def itemmeta(self):
         """Returns metadata for members of the collection.
@@ -1575,11 +2048,11 @@ class ReadOnlyCollection(Endpoint):
                                         'visible'],
                                         'required': ['name'], 'wildcard': []}}
         """
-        response = self.get("_new")
-        content = _load_atom(response, MATCH_ENTRY_CONTENT)
+        response = self.get("_new", **self.service._read_query())
+        content = _load_content(response)
         return _parse_atom_metadata(content)
 
-    def iter(self, offset=0, count=None, pagesize=None, **kwargs):
+    def iter(self, offset=0, count=None, pagesize=None, prefetch=None, **kwargs):
         """Iterates over the collection.
 
         This method is equivalent to the :meth:`list` method, but
@@ -1592,6 +2065,12 @@ class ReadOnlyCollection(Endpoint):
         :type count: ``integer``
         :param pagesize: The number of entities to load (optional).
         :type pagesize: ``integer``
+        :param prefetch: The number of pages to fetch and parse in the
+            background while the entities of the current page are returned
+            (optional). Requires *pagesize*. Once the first page has told how
+            many entities there are, up to *prefetch* of the following pages
+            are requested at once, each on its own connection.
+        :type prefetch: ``integer``
         :param kwargs: Additional arguments (optional):
 
             - "search" (``string``): The search query to filter responses.
@@ -1614,18 +2093,77 @@ class ReadOnlyCollection(Endpoint):
                 # Loads 10 saved searches at a time from the
                 # server.
                 ...
+            for user in s.users.iter(pagesize=1000, prefetch=4):
+                # Loads the next 4 pages while these users are handled.
+                ...
         """
+        if prefetch and pagesize:
+            yield from self._prefetch(offset, count, pagesize, prefetch, **kwargs)
+        else:
+            yield from self._paginate(
+                self._iter_list, offset, count, pagesize, **kwargs
+            )
+
+    # Like _paginate over _iter_list, but keeping up to *prefetch* pages in
+    # flight, which takes the total number of entities from the first page
+    def _prefetch(self, offset, count, pagesize, prefetch, **kwargs):
+        assert pagesize > 0
+        if count is None:
+            count = self.null_count
+
+        def fetch(page_offset, page_count):
+            response = self.get(
+                count=page_count,
+                offset=page_offset,
+                **self.service._read_query(**kwargs),
+            )
+            body = response.body.read()
+            response.body = ResponseReader(BytesIO(body))
+            return _total_results(response, body), list(self._iter_list(response))
+
+        first = pagesize if count == self.null_count else min(pagesize, count)
+        total, items = fetch(offset, first)
+        yield from items
+        if len(items) < first:
+            return
+        if total is None:
+            # Without a total to plan by, page through the rest in turn.
+            rest = None if count == self.null_count else count - len(items)
+            yield from self._paginate(
+                self._iter_list, offset + len(items), rest, pagesize, **kwargs
+            )
+            return
+        end = total if count == self.null_count else min(total, offset + count)
+        pages = [
+            (page_offset, min(pagesize, end - page_offset))
+            for page_offset in range(offset + len(items), end, pagesize)
+        ]
+        # One more worker than pages to prefetch: one page is being handed out.
+        fetched = _bounded_map(lambda page: fetch(*page), pages, prefetch + 1)
+        for _, items in fetched:
+            yield from items
+
+    # Load the pages of this collection with *load*, a function converting a
+    # response into an iterator of items, and yield their items
+    def _paginate(self, load, offset=0, count=None, pagesize=None, **kwargs):
         assert pagesize is None or pagesize > 0
         if count is None:
             count = self.null_count
         fetched = 0
         while count == self.null_count or fetched < count:
-            response = self.get(count=pagesize or count, offset=offset, **kwargs)
-            items = self._load_list(response)
-            N = len(items)
+            response = self.get(
+                count=pagesize or count,
+                offset=offset,
+                **self.service._read_query(**kwargs),
+            )
+            N = 0
+            # Items are yielded while the response is still being parsed;
+            # if iteration stops early, drop the rest of the response.
+            with contextlib.closing(response.body):
+                for item in load(response):
+                    N += 1
+                    yield item
             fetched += N
-            for item in items:
-                yield item
             if pagesize is None or N < pagesize:
                 break
             offset += N
@@ -1638,6 +2176,66 @@ class ReadOnlyCollection(Endpoint):
                 kwargs,
             )
 
+    # The content fields that _entry_name needs from an Atom entry
+    _name_fields = ()
+
+    # Return the name of the entity that the given Atom entry record describes
+    def _entry_name(self, entry):
+        return entry.get("title", None)
+
+    def names(self, count=None, **kwargs):
+        """Retrieves the names of the entities in this collection.
+
+        This is a fast path for ``[entity.name for entity in collection.list()]``:
+        the server is asked to leave the content of the entities out of its
+        response, and no entities are constructed.
+
+        :param count: The maximum number of names to return (optional).
+        :type count: ``integer``
+        :param kwargs: Additional arguments (optional), as for :meth:`list`.
+        :type kwargs: ``dict``
+        :return: A ``list`` of entity names.
+        """
+        # With only fields that do not exist (or, for jobs, the sid) in f,
+        # splunkd returns the entries without their content.
+        fields = list(self._name_fields) or ["title"]
+        entries = self._paginate(_iter_atom_entries, count=count, f=fields, **kwargs)
+        return [self._entry_name(entry) for entry in entries]
+
+    def iter_fields(self, *fields, **kwargs):
+        """Iterates over the names and selected content fields of the entities
+        in this collection.
+
+        This is a fast path for reading a few fields of many entities: only
+        *fields* are requested from the server, and no entities are
+        constructed.
+
+        :param fields: The names of the content fields to return.
+        :type fields: ``string``
+        :param kwargs: Additional arguments (optional), as for :meth:`iter`,
+            including "offset", "count" and "pagesize".
+        :type kwargs: ``dict``
+        :return: An iterator of :class:`splunklib.data.Record` objects, each
+            with a ``name`` key and a key for each of *fields*, which is
+            ``None`` where the entity has no such field.
+
+        **Example**::
+
+            import splunklib.client as client
+            s = client.connect(...)
+            for saved_search in s.saved_searches.iter_fields("search", "disabled"):
+                print(saved_search.name, saved_search.search)
+        """
+        requested = list(fields) + [f for f in self._name_fields if f not in fields]
+        for entry in self._paginate(_iter_atom_entries, f=requested, **kwargs):
+            content = entry.get("content") or {}
+            item = record({"name": self._entry_name(entry)})
+            for field in fields:
+                item[field] = content.get(field)
+            if "type" in fields:
+                item["type"] = _parse_content_type(content.get("type"))
+            yield item
+
     # kwargs: count, offset, search, sort_dir, sort_key, sort_mode
     def list(self, count=None, **kwargs):
         """Retrieves a list of entities in this collection.
@@ -1984,7 +2582,8 @@ class StoragePassword(Entity):
         state = kwargs.get("state", None)
         kwargs["skip_refresh"] = kwargs.get("skip_refresh", state is not None)
         super().__init__(service, path, **kwargs)
-        self._state = state
+        if state is not None:
+            self._state = state
 
     @property
     def clear_password(self):
@@ -2197,8 +2796,7 @@ class Index(Entity):
             b"\r\n",
         ]
 
-        for h in headers:
-            sock.write(h)
+        sock.sendall(b"".join(headers))
         return sock
 
     @contextlib.contextmanager
@@ -2235,6 +2833,18 @@ class Index(Entity):
             sock.shutdown(socket.SHUT_RDWR)
             sock.close()
 
+    def batch_writer(self, **kwargs):
+        """Returns an :class:`IndexWriter` that sends events to this index in
+        batches.
+
+        :param kwargs: Arguments for :class:`IndexWriter`, such as the default
+            ``host``, ``source`` and ``sourcetype`` of the events.
+        :type kwargs: ``dict``
+
+        :rtype: :class:`IndexWriter`
+        """
+        return IndexWriter(self, **kwargs)
+
     def clean(self, timeout=60):
         """Deletes the contents of the index.
 
@@ -2288,11 +2898,25 @@ class Index(Entity):
         self.post("roll-hot-buckets")
         return self
 
+    def stream_writer(self, **kwargs):
+        """Returns a :class:`StreamingIndexWriter` that writes events to this
+        index over attached sockets.
+
+        :param kwargs: Arguments for :class:`StreamingIndexWriter`, such as the
+            ``host``, ``source`` and ``sourcetype`` of the events.
+        :type kwargs: ``dict``
+
+        :rtype: :class:`StreamingIndexWriter`
+        """
+        return StreamingIndexWriter(self, **kwargs)
+
     def submit(self, event, host=None, source=None, sourcetype=None):
         """Submits a single event to the index using ``HTTP POST``.
 
-        :param event: The event to submit.
-        :type event: ``string``
+        :param event: The event to submit. Newline-separated events can be
+            streamed from a file object or an iterable of chunks, as
+            :meth:`splunklib.binding.HttpLib.post` allows.
+        :type event: ``string``, file or iterable
         :param `host`: The host value of the event.
         :type host: ``string``
         :param `source`: The source value of the event.
@@ -2334,6 +2958,524 @@ class Index(Entity):
         return self
 
 
+class IndexWriter:
+    """This class buffers events for an index and sends them to
+    ``receivers/simple`` in batches, one request per batch instead of one per
+    event as :meth:`Index.submit` does.
+
+    Events are grouped by their host, source and sourcetype, and each group is
+    sent as the newline-joined events. A group is sent once it holds
+    *batch_size* events or *max_bytes* bytes, all groups are sent once the
+    oldest buffered event has waited *flush_interval* seconds, and everything
+    is sent when the writer is closed, which leaving a ``with`` block does. A
+    failed batch does not stop the others: it is reported in
+    :attr:`failures`.
+
+    With a *spool*, batches are appended to the :class:`splunklib.spool.Spool`
+    instead, and a background thread sends them from there in order. A batch
+    that fails because splunkd cannot be reached or answers with a server
+    error stays in the spool and is sent again after *retry_delay* seconds,
+    doubling up to *max_retry_delay*, so producers carry on while splunkd
+    restarts. Other failed batches are reported in :attr:`failures`. Batches
+    still in the spool when the writer is closed are sent by the next writer
+    using the same spool directory.
+
+    **Example**::
+
+        import splunklib.client as client
+        s = client.connect(...)
+        with s.indexes["main"].batch_writer(sourcetype="app_log") as writer:
+            for line in log:
+                writer.write(line, host=line.host)
+        print(writer.stats())
+
+    :param index: The index to write to.
+    :type index: :class:`Index`
+    :param batch_size: The number of events per batch (the default is 1000).
+    :type batch_size: ``integer``
+    :param max_bytes: The maximum size of a batch, in bytes (the default is
+        1 MiB). A single larger event is sent alone.
+    :type max_bytes: ``integer``
+    :param flush_interval: The longest an event is buffered, in seconds, or
+        ``None`` to send on size and on close only (the default is 5).
+    :type flush_interval: ``float``
+    :param host: The default host value of the events.
+    :type host: ``string``
+    :param source: The default source value of the events.
+    :type source: ``string``
+    :param sourcetype: The default sourcetype value of the events.
+    :type sourcetype: ``string``
+    :param spool: The spool to send the batches through, which is closed with
+        the writer (optional).
+    :type spool: :class:`splunklib.spool.Spool`
+    :param retry_delay: The delay before a spooled batch is sent again, in
+        seconds (the default is 1).
+    :type retry_delay: ``float``
+    :param max_retry_delay: The longest delay before a spooled batch is sent
+        again, in seconds (the default is 60).
+    :type max_retry_delay: ``float``
+    """
+
+    def __init__(
+        self,
+        index,
+        batch_size=1000,
+        max_bytes=1024 * 1024,
+        flush_interval=5,
+        host=None,
+        source=None,
+        sourcetype=None,
+        spool=None,
+        retry_delay=1,
+        max_retry_delay=60,
+    ):
+        self.index = index
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self._defaults = (host, source, sourcetype)
+        self.spool = spool
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        #: The batches that failed, as records with the ``host``, ``source``
+        #: and ``sourcetype`` of the batch, its ``events``, and the ``error``.
+        self.failures = []
+        self._groups = OrderedDict()
+        self._count = 0
+        self._oldest = None
+        self._closed = False
+        self._batches = 0
+        self._events = 0
+        self._bytes = 0
+        self._seconds = 0.0
+        self._last_latency = None
+        self._max_latency = None
+        self._lock = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        if flush_interval is not None:
+            self._thread = threading.Thread(target=self._flush_periodically)
+            self._thread.daemon = True
+            self._thread.start()
+        self._stopping = threading.Event()
+        self._drainer = None
+        if spool is not None:
+            self._drainer = threading.Thread(target=self._drain)
+            self._drainer.daemon = True
+            self._drainer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._count
+
+    def write(self, event, host=None, source=None, sourcetype=None):
+        """Buffers an event.
+
+        :param event: The event to write. A trailing line break is removed.
+        :type event: ``string`` or ``bytes``
+        :param `host`: The host value of the event, if not the default.
+        :type host: ``string``
+        :param `source`: The source value of the event, if not the default.
+        :type source: ``string``
+        :param `sourcetype`: The sourcetype value of the event, if not the
+            default.
+        :type sourcetype: ``string``
+        """
+        if isinstance(event, str):
+            event = event.encode("utf-8")
+        event = event.rstrip(b"\r\n")
+        group = tuple(
+            given if given is not None else default
+            for given, default in zip((host, source, sourcetype), self._defaults)
+        )
+        with self._lock:
+            self._check_open()
+            events, size = self._groups.get(group, ([], 0))
+            if events and size + len(event) + 1 > self.max_bytes:
+                self._send_group(group)
+                # Other threads may have buffered events for the group while
+                # the lock was released.
+                events, size = self._groups.get(group, ([], 0))
+            events.append(event)
+            size += len(event) + 1
+            self._groups[group] = (events, size)
+            self._count += 1
+            if self._oldest is None:
+                self._oldest = monotonic()
+            if len(events) >= self.batch_size or size >= self.max_bytes:
+                self._send_group(group)
+
+    def flush(self):
+        """Sends all buffered events now."""
+        with self._flush_lock:
+            with self._lock:
+                groups = self._groups
+                self._groups = OrderedDict()
+                self._count = 0
+                self._oldest = None
+            for group, (events, _) in groups.items():
+                self._send(group, events)
+
+    def close(self, timeout=None):
+        """Sends the buffered events and stops the writer.
+
+        :param timeout: With a spool, the longest to wait for the spooled
+            batches to be sent, in seconds, or ``None`` to wait as long as it
+            takes (the default).
+        :type timeout: ``float``
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._lock.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        if self._drainer is not None:
+            self.spool.wait_empty(timeout)
+            self._stopping.set()
+            self.spool.close()
+            self._drainer.join()
+
+    def stats(self):
+        """Returns the counters of the batches sent so far.
+
+        The record holds the number of ``batches``, ``events`` and ``bytes``
+        sent, the ``seconds`` spent sending them, the ``last_latency`` and
+        ``max_latency`` of a batch in seconds, and the resulting
+        ``events_per_second`` and ``bytes_per_second``. Failed batches count
+        towards the latencies only.
+
+        :rtype: ``record``
+        """
+        with self._lock:
+            seconds = self._seconds
+            return record(
+                {
+                    "batches": self._batches,
+                    "events": self._events,
+                    "bytes": self._bytes,
+                    "seconds": seconds,
+                    "last_latency": self._last_latency,
+                    "max_latency": self._max_latency,
+                    "events_per_second": self._events / seconds if seconds else 0.0,
+                    "bytes_per_second": self._bytes / seconds if seconds else 0.0,
+                }
+            )
+
+    def _check_open(self):
+        if self._closed:
+            raise IllegalOperationException("The IndexWriter is closed.")
+
+    # Called with the lock held: sends one group without holding it
+    def _send_group(self, group):
+        events, _ = self._groups.pop(group)
+        self._count -= len(events)
+        if not self._groups:
+            self._oldest = None
+        self._lock.release()
+        try:
+            with self._flush_lock:
+                self._send(group, events)
+        finally:
+            self._lock.acquire()
+
+    def _flush_periodically(self):
+        with self._lock:
+            while not self._closed:
+                if self._oldest is None:
+                    self._lock.wait(self.flush_interval)
+                    continue
+                delay = self._oldest + self.flush_interval - monotonic()
+                if delay > 0:
+                    self._lock.wait(delay)
+                    continue
+                self._lock.release()
+                try:
+                    self.flush()
+                finally:
+                    self._lock.acquire()
+
+    def _send(self, group, events):
+        if self.spool is None:
+            error = self._post(group, events)
+        else:
+            header = json.dumps(list(group) + [[len(e) for e in events]])
+            try:
+                self.spool.put(header.encode("utf-8") + b"\n" + b"\n".join(events))
+                return
+            except SpoolFullError as e:
+                error = e
+        if error is not None:
+            self._failed(group, events, error)
+
+    def _drain(self):
+        delay = self.retry_delay
+        while not self._stopping.is_set():
+            data = self.spool.peek()
+            if data is None:
+                return
+            header, _, body = data.partition(b"\n")
+            *group, lengths = json.loads(header)
+            events = []
+            start = 0
+            for length in lengths:
+                events.append(body[start : start + length])
+                start += length + 1
+            error = self._post(group, events)
+            retry = isinstance(error, OSError) or (
+                isinstance(error, HTTPError) and error.status >= 500
+            )
+            if not retry:
+                if error is not None:
+                    self._failed(group, events, error)
+                self.spool.pop()
+                delay = self.retry_delay
+                continue
+            self._stopping.wait(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+    def _post(self, group, events):
+        host, source, sourcetype = group
+        args = {"index": self.index.name}
+        if host is not None:
+            args["host"] = host
+        if source is not None:
+            args["source"] = source
+        if sourcetype is not None:
+            args["sourcetype"] = sourcetype
+        body = b"\n".join(events) + b"\n"
+        start = monotonic()
+        try:
+            # Read the response so that its connection goes back to the pool
+            self.index.service.post(
+                PATH_RECEIVERS_SIMPLE, body=body, **args
+            ).body.read()
+        except (HTTPError, OSError) as e:
+            error = e
+        else:
+            error = None
+        latency = monotonic() - start
+        with self._lock:
+            self._seconds += latency
+            self._last_latency = latency
+            self._max_latency = max(latency, self._max_latency or 0.0)
+            if error is None:
+                self._batches += 1
+                self._events += len(events)
+                self._bytes += len(body)
+        return error
+
+    def _failed(self, group, events, error):
+        host, source, sourcetype = group
+        failure = record(
+            {
+                "host": host,
+                "source": source,
+                "sourcetype": sourcetype,
+                "events": events,
+                "error": error,
+            }
+        )
+        self.failures.append(failure)
+
+
+class StreamingIndexWriter:
+    """This class writes events to an index over one or more sockets opened
+    with :meth:`Index.attach`, for sustained ingestion at high rates.
+
+    Events are collected in a buffer of *buffer_size* bytes, and a full buffer
+    is handed to the next connection in turn, which sends it with
+    ``sendall`` on its own thread while the buffer fills again. Each
+    connection holds at most two buffers waiting to be sent: past that,
+    :meth:`write` blocks until the connection catches up, so a slow server
+    slows the producer down instead of exhausting memory.
+
+    When a send fails, the connection is opened again and the whole buffer is
+    sent again, after *retry_delay* seconds, doubling for each of the
+    *retries* attempts. A send that fails part way may already have delivered
+    the start of the buffer, so the events before the point of failure can
+    be received twice, and the event at that point once cut short and once
+    whole. A buffer that still fails, for instance because the connection
+    could not be opened, is reported in :attr:`failures`, and the following
+    buffers are still sent.
+
+    **Example**::
+
+        import splunklib.client as client
+        s = client.connect(...)
+        index = s.indexes["main"]
+        with index.stream_writer(connections=4, sourcetype="app_log") as writer:
+            for line in log:
+                writer.write(line)
+
+    :param index: The index to write to.
+    :type index: :class:`Index`
+    :param connections: The number of sockets to write on (the default is 1).
+    :type connections: ``integer``
+    :param buffer_size: The size of the buffer sent at a time, in bytes (the
+        default is 1 MiB).
+    :type buffer_size: ``integer``
+    :param retries: The number of times a failed send is attempted again (the
+        default is 3).
+    :type retries: ``integer``
+    :param retry_delay: The delay before the first retry, in seconds (the
+        default is 0.5).
+    :type retry_delay: ``float``
+    :param host: The host value for events written to the stream.
+    :type host: ``string``
+    :param source: The source value for events written to the stream.
+    :type source: ``string``
+    :param sourcetype: The sourcetype value for events written to the stream.
+    :type sourcetype: ``string``
+    """
+
+    def __init__(
+        self,
+        index,
+        connections=1,
+        buffer_size=1024 * 1024,
+        retries=3,
+        retry_delay=0.5,
+        host=None,
+        source=None,
+        sourcetype=None,
+    ):
+        if connections < 1:
+            raise ValueError("connections must be at least 1.")
+        self.index = index
+        self.buffer_size = buffer_size
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._args = {"host": host, "source": source, "sourcetype": sourcetype}
+        #: The buffers that could not be sent, as records with the ``data``
+        #: and the last ``error``.
+        self.failures = []
+        #: The number of bytes sent.
+        self.bytes_sent = 0
+        #: The number of connections dropped after an error.
+        self.reconnects = 0
+        self._buffer = bytearray()
+        self._closed = False
+        self._next = 0
+        self._lock = threading.Lock()
+        self._queues = [queue.Queue(maxsize=2) for _ in range(connections)]
+        self._threads = []
+        for pending in self._queues:
+            thread = threading.Thread(target=self._send_all, args=(pending,))
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, event):
+        """Writes an event, followed by a line break if it does not end with
+        one.
+
+        :param event: The event to write.
+        :type event: ``string`` or ``bytes``
+        """
+        if isinstance(event, str):
+            event = event.encode("utf-8")
+        with self._lock:
+            self._check_open()
+            self._buffer += event
+            if not event.endswith(b"\n"):
+                self._buffer += b"\n"
+            if len(self._buffer) < self.buffer_size:
+                return
+            chunk, pending = self._take()
+        pending.put(chunk)
+
+    def flush(self):
+        """Hands the buffered events to the next connection now."""
+        with self._lock:
+            if not self._buffer:
+                return
+            chunk, pending = self._take()
+        pending.put(chunk)
+
+    def close(self):
+        """Sends the buffered events, waits for all connections to finish
+        sending, and closes them."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            chunk, pending = self._take() if self._buffer else (None, None)
+        if chunk is not None:
+            pending.put(chunk)
+        for pending in self._queues:
+            pending.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _check_open(self):
+        if self._closed:
+            raise IllegalOperationException("The StreamingIndexWriter is closed.")
+
+    # Called with the lock held
+    def _take(self):
+        chunk = bytes(self._buffer)
+        self._buffer = bytearray()
+        pending = self._queues[self._next]
+        self._next = (self._next + 1) % len(self._queues)
+        return chunk, pending
+
+    def _send_all(self, pending):
+        sock = None
+        try:
+            for chunk in iter(pending.get, None):
+                sock = self._send(sock, chunk)
+        finally:
+            if sock is not None:
+                self._disconnect(sock)
+
+    def _send(self, sock, chunk):
+        for attempt in range(self.retries + 1):
+            if attempt:
+                sleep(self.retry_delay * 2 ** (attempt - 1))
+            try:
+                if sock is None:
+                    sock = self.index.attach(**self._args)
+                sock.sendall(chunk)
+            except Exception as e:
+                # Anything, such as an AuthenticationError from attach, fails
+                # this buffer only; the thread goes on with the next ones.
+                error = e
+                if sock is not None:
+                    self._disconnect(sock)
+                    sock = None
+                    with self._lock:
+                        self.reconnects += 1
+                continue
+            with self._lock:
+                self.bytes_sent += len(chunk)
+            return sock
+        self.failures.append(record({"data": chunk, "error": error}))
+        return sock
+
+    @staticmethod
+    def _disconnect(sock):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+
+
 class Input(Entity):
     """This class represents a Splunk input. This class is the base for all
     typed input classes and is also used when the client does not recognize an
@@ -2410,7 +3552,15 @@ class Inputs(Collection):
     """This class represents a collection of inputs. The collection is
     heterogeneous and each member of the collection contains a *kind* property
     that indicates the specific type of input.
-    Retrieve this collection using :meth:`Service.inputs`."""
+    Retrieve this collection using :meth:`Service.inputs`.
+
+    Discovering the input kinds and listing the inputs of several kinds take
+    one request per kind, which are made up to :attr:`parallelism` at a time.
+    """
+
+    #: The maximum number of requests :attr:`kinds` and :meth:`list` make at
+    #: once.
+    parallelism = 8
 
     def __init__(self, service, kindmap=None):
         Collection.__init__(self, service, PATH_INPUTS, item=Input)
@@ -2424,7 +3574,9 @@ class Inputs(Collection):
             key, kind = key
             key = UrlEncoded(key, encode_slash=True)
             try:
-                response = self.get(self.kindpath(kind) + "/" + key)
+                response = self.get(
+                    self.kindpath(kind) + "/" + key, **self.service._read_query()
+                )
                 entries = self._load_list(response)
                 if len(entries) > 1:
                     raise AmbiguousReferenceException(
@@ -2445,7 +3597,7 @@ class Inputs(Collection):
             key = UrlEncoded(key, encode_slash=True)
             for kind in self.kinds:
                 try:
-                    response = self.get(kind + "/" + key)
+                    response = self.get(kind + "/" + key, **self.service._read_query())
                     entries = self._load_list(response)
                     if len(entries) > 1:
                         raise AmbiguousReferenceException(
@@ -2484,7 +3636,9 @@ class Inputs(Collection):
             # on the first hit.
             for kind in self.kinds:
                 try:
-                    response = self.get(self.kindpath(kind) + "/" + key)
+                    response = self.get(
+                        self.kindpath(kind) + "/" + key, **self.service._read_query()
+                    )
                     entries = self._load_list(response)
                     if len(entries) > 0:
                         return True
@@ -2615,39 +3769,58 @@ class Inputs(Collection):
         :return: The metadata.
         :rtype: class:``splunklib.data.Record``
         """
-        response = self.get(f"{self._kindmap[kind]}/_new")
-        content = _load_atom(response, MATCH_ENTRY_CONTENT)
+        response = self.get(f"{self._kindmap[kind]}/_new", **self.service._read_query())
+        content = _load_content(response)
         return _parse_atom_metadata(content)
 
     def _get_kind_list(self, subpath=None):
         if subpath is None:
             subpath = []
 
-        kinds = []
-        response = self.get("/".join(subpath))
+        response = self.get("/".join(subpath), **self.service._read_query())
         content = _load_atom_entries(response)
-        for entry in content:
+
+        def kinds_of(entry):
             this_subpath = subpath + [entry.title]
             # The "all" endpoint doesn't work yet.
             # The "tcp/ssl" endpoint is not a real input collection.
             if entry.title == "all" or this_subpath == ["tcp", "ssl"]:
-                continue
-            if "create" in [x.rel for x in entry.link]:
-                path = "/".join(subpath + [entry.title])
-                kinds.append(path)
-            else:
-                subkinds = self._get_kind_list(subpath + [entry.title])
-                kinds.extend(subkinds)
+                return []
+            links = entry.link if isinstance(entry.link, list) else [entry.link]
+            if "create" in [x.rel for x in links]:
+                return ["/".join(this_subpath)]
+            return self._get_kind_list(this_subpath)
+
+        # The sub-kinds of each level are discovered concurrently.
+        kinds = []
+        for subkinds in _bounded_map(kinds_of, content or [], self.parallelism):
+            kinds.extend(subkinds)
         return kinds
 
     @property
     def kinds(self):
         """Returns the input kinds on this Splunk instance.
 
+        The kinds are discovered once per :class:`Service`, with a request for
+        each group of kinds, such as ``tcp``. Use :meth:`refresh_kinds` to
+        discover them again, for instance after installing an app that adds a
+        modular input.
+
+        :return: The list of input kinds.
+        :rtype: ``list``
+        """
+        if self.service._input_kinds is None:
+            self.service._input_kinds = self._get_kind_list()
+        return list(self.service._input_kinds)
+
+    def refresh_kinds(self):
+        """Discovers the input kinds on this Splunk instance again.
+
         :return: The list of input kinds.
         :rtype: ``list``
         """
-        return self._get_kind_list()
+        self.service._input_kinds = None
+        return self.kinds
 
     def kindpath(self, kind):
         """Returns a path to the resources for a given input kind.
@@ -2743,55 +3916,18 @@ class Inputs(Collection):
         if len(kinds) == 0:
             kinds = self.kinds
         if len(kinds) == 1:
-            kind = kinds[0]
             logger.debug("Inputs.list taking short circuit branch for single kind.")
-            path = self.kindpath(kind)
-            logger.debug("Path for inputs: %s", path)
-            try:
-                path = UrlEncoded(path, skip_encode=True)
-                response = self.get(path, **kwargs)
-            except HTTPError as he:
-                if he.status == 404:  # No inputs of this kind
-                    return []
-            entities = []
-            entries = _load_atom_entries(response)
-            if entries is None:
-                return []  # No inputs in a collection comes back with no feed or entry in the XML
-            for entry in entries:
-                state = _parse_atom_entry(entry)
-                # Unquote the URL, since all URL encoded in the SDK
-                # should be of type UrlEncoded, and all str should not
-                # be URL encoded.
-                path = parse.unquote(state.links.alternate)
-                entity = Input(self.service, path, kind, state=state)
-                entities.append(entity)
-            return entities
+            return self._list_kind(kinds[0], **kwargs)
 
         search = kwargs.get("search", "*")
 
+        # One request per kind, made concurrently; the inputs stay grouped by
+        # kind, in the order of the kinds.
         entities = []
-        for kind in kinds:
-            response = None
-            try:
-                kind = UrlEncoded(kind, skip_encode=True)
-                response = self.get(self.kindpath(kind), search=search)
-            except HTTPError as e:
-                if e.status == 404:
-                    continue  # No inputs of this kind
-                else:
-                    raise
-
-            entries = _load_atom_entries(response)
-            if entries is None:
-                continue  # No inputs to process
-            for entry in entries:
-                state = _parse_atom_entry(entry)
-                # Unquote the URL, since all URL encoded in the SDK
-                # should be of type UrlEncoded, and all str should not
-                # be URL encoded.
-                path = parse.unquote(state.links.alternate)
-                entity = Input(self.service, path, kind, state=state)
-                entities.append(entity)
+        for inputs in _bounded_map(
+            lambda kind: self._list_kind(kind, search=search), kinds, self.parallelism
+        ):
+            entities.extend(inputs)
         if "offset" in kwargs:
             entities = entities[kwargs["offset"] :]
         if "count" in kwargs:
@@ -2814,6 +3950,31 @@ class Inputs(Collection):
             entities = list(reversed(entities))
         return entities
 
+    def _list_kind(self, kind, **kwargs):
+        # Returns the inputs of the given kind, or [] if there are none
+        kind = UrlEncoded(kind, skip_encode=True)
+        path = self.kindpath(kind)
+        logger.debug("Path for inputs: %s", path)
+        try:
+            response = self.get(path, **self.service._read_query(**kwargs))
+        except HTTPError as he:
+            if he.status == 404:  # No inputs of this kind
+                return []
+            raise
+        entries = _load_atom_entries(response)
+        if entries is None:
+            return []  # No inputs in a collection comes back with no feed or entry in the XML
+        entities = []
+        for entry in entries:
+            state = _parse_atom_entry(entry)
+            # Unquote the URL, since all URL encoded in the SDK
+            # should be of type UrlEncoded, and all str should not
+            # be URL encoded.
+            path = parse.unquote(state.links.alternate)
+            entity = Input(self.service, path, kind, state=state)
+            entities.append(entity)
+        return entities
+
     def __iter__(self, **kwargs):
         for item in self.iter(**kwargs):
             yield item
@@ -2870,8 +4031,22 @@ class Job(Entity):
         Entity.__init__(self, service, path, skip_refresh=True, **kwargs)
         self.sid = sid
 
+    #: The fields that :meth:`status` returns by default.
+    STATUS_FIELDS = (
+        "dispatchState",
+        "isDone",
+        "isFailed",
+        "isPaused",
+        "doneProgress",
+        "eventCount",
+        "resultCount",
+        "runDuration",
+    )
+
     # The Job entry record is returned at the root of the response
     def _load_atom_entry(self, response):
+        if _is_json(response):
+            return _load_json_entries(response)[0]
         return _load_atom(response).entry
 
     def cancel(self):
@@ -2952,14 +4127,99 @@ class Job(Entity):
         :rtype: ``boolean``
 
         """
-        response = self.get()
+        response = self.get(**self.service._read_query())
         if response.status == 204:
             return False
         self._state = self.read(response)
         ready = self._state.content["dispatchState"] not in ["QUEUED", "PARSING"]
         return ready
 
-    @property
+    def status(self, *fields):
+        """Returns the current status of this job with a lightweight request.
+
+        Unlike :meth:`refresh`, this asks the server for the listed fields of
+        the job only, as JSON, and does not update the state of the
+        :class:`Job`. Values keep their JSON types (for example, ``isDone`` is
+        a ``boolean`` and ``doneProgress`` a ``float``).
+
+        :param fields: The job fields to return (optional). The default is
+            ``dispatchState``, ``isDone``, ``isFailed``, ``isPaused``,
+            ``doneProgress``, ``eventCount``, ``resultCount``, and
+            ``runDuration``.
+        :type fields: ``string``
+
+        :return: The requested fields, or an empty ``dict`` if the job is not
+            ready for querying yet.
+        :rtype: ``dict``
+        """
+        response = self.get(output_mode="json", f=list(fields or Job.STATUS_FIELDS))
+        if response.status == 204:
+            return {}
+        entries = json.loads(response.body.read().decode("utf-8")).get("entry", [])
+        return entries[0].get("content", {}) if entries else {}
+
+    def wait(
+        self,
+        timeout=None,
+        poll_interval=0.2,
+        max_poll_interval=5,
+        backoff=1.5,
+        callback=None,
+    ):
+        """Blocks until this job is done, then refreshes its state.
+
+        The job is polled with :meth:`status`. The first poll is made right
+        away, the second one *poll_interval* seconds later, and each following
+        one waits *backoff* times longer, up to *max_poll_interval*, so
+        long-running jobs cost few requests while short ones still return
+        quickly.
+
+        **Example**::
+
+            job = service.jobs.create("search index=_internal | head 10")
+            job.wait(timeout=60, callback=lambda job, status: print(status["doneProgress"]))
+            print(job["resultCount"])
+
+        :param timeout: The longest time to wait, in seconds (optional, the
+            default is to wait indefinitely).
+        :type timeout: ``integer`` or ``float``
+        :param poll_interval: The initial time between polls, in seconds (the
+            default is 0.2).
+        :type poll_interval: ``float``
+        :param max_poll_interval: The longest time between polls, in seconds
+            (the default is 5).
+        :type max_poll_interval: ``float``
+        :param backoff: The factor by which the time between polls grows (the
+            default is 1.5).
+        :type backoff: ``float``
+        :param callback: A function called with the :class:`Job` and its
+            :meth:`status` ``dict`` after every poll (optional).
+        :type callback: ``function``
+
+        :raises OperationError: Raised when the job is not done within
+            *timeout* seconds.
+        :return: The :class:`Job`.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        interval = poll_interval
+        while True:
+            status = self.status()
+            if callback is not None:
+                callback(self, status)
+            if status.get("isDone") in (True, 1, "1", "true"):
+                return self.refresh()
+            delay = interval
+            if deadline is not None:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    raise OperationError(
+                        f"Search job {self.sid} did not finish within {timeout} seconds; timing out."
+                    )
+                delay = min(delay, remaining)
+            sleep(delay)
+            interval = min(interval * backoff, max_poll_interval)
+
+    @property
     def name(self):
         """Returns the name of the search job, which is the search ID (SID).
 
@@ -2982,11 +4242,9 @@ class Job(Entity):
 
             import splunklib.client as client
             import splunklib.results as results
-            from time import sleep
             service = client.connect(...)
             job = service.jobs.create("search * | head 5")
-            while not job.is_done():
-                sleep(.2)
+            job.wait()
             rr = results.JSONResultsReader(job.results(output_mode='json'))
             for result in rr:
                 if isinstance(result, results.Message):
@@ -3018,6 +4276,63 @@ class Job(Entity):
             return self.get("results", **query_params).body
         return self.post("results", **query_params).body
 
+    def iter_results(
+        self, parallelism=4, page_size=50000, ordered=True, **query_params
+    ):
+        """Returns an iterator over this job's results, fetched page by page
+        over several connections at once.
+
+        The job must be done. Its ``resultCount`` is used to plan pages of
+        *page_size* results, and up to *parallelism* pages are requested and
+        parsed concurrently. Results are dictionaries, and diagnostic messages
+        are :class:`splunklib.results.Message` objects, as returned by
+        :class:`splunklib.results.JSONResultsReader`.
+
+        **Example**::
+
+            import splunklib.client as client
+            service = client.connect(...)
+            job = service.jobs.create("search index=_internal | head 1000000")
+            job.wait()
+            for result in job.iter_results(parallelism=8, page_size=100000):
+                print(result)
+
+        :param parallelism: The number of pages in flight at once (the
+            default is 4).
+        :type parallelism: ``integer``
+        :param page_size: The number of results per request (the default is
+            50000).
+        :type page_size: ``integer``
+        :param ordered: Whether pages are yielded in result order (the
+            default), or as soon as each one arrives.
+        :type ordered: ``boolean``
+        :param query_params: Additional parameters (optional), as for
+            :meth:`results`. ``offset`` and ``count`` are set per page.
+        :type query_params: ``dict``
+
+        :raises IllegalOperationException: Raised when the job is not done.
+        :return: An iterator of ``dict`` and :class:`splunklib.results.Message`.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1.")
+        if not self.is_done():
+            raise IllegalOperationException(
+                f"Search job {self.sid} is not done; its results are incomplete."
+            )
+        total = int(self._state.content["resultCount"])
+        query_params["output_mode"] = "json"
+        for key in ("offset", "count"):
+            query_params.pop(key, None)
+
+        def fetch(offset):
+            stream = self.results(offset=offset, count=page_size, **query_params)
+            return list(JSONResultsReader(stream))
+
+        pages = _bounded_map(
+            fetch, range(0, total, page_size), max(1, parallelism), ordered
+        )
+        return (result for page in pages for result in page)
+
     def preview(self, **query_params):
         """Returns a streaming handle to this job's preview search results.
 
@@ -3161,17 +4476,17 @@ class Jobs(Collection):
         # Collection is 0, not -1 as it is on most.
         self.null_count = 0
 
-    def _load_list(self, response):
+    # Overridden because a job is named by its sid rather than its title.
+    _name_fields = ("sid",)
+
+    def _entry_name(self, entry):
+        return entry["content"]["sid"]
+
+    def _iter_list(self, response):
         # Overridden because Job takes a sid instead of a path.
-        entries = _load_atom_entries(response)
-        if entries is None:
-            return []
-        entities = []
-        for entry in entries:
+        for entry in _iter_atom_entries(response):
             state = _parse_atom_entry(entry)
-            entity = self.item(self.service, entry["content"]["sid"], state=state)
-            entities.append(entity)
-        return entities
+            yield self.item(self.service, entry["content"]["sid"], state=state)
 
     def create(self, query, **kwargs):
         """Creates a search using a search query and any additional parameters
@@ -3301,6 +4616,179 @@ class Jobs(Collection):
         return self.post(search=query, exec_mode="oneshot", **params).body
 
 
+class JobPool:
+    """This class runs many searches while keeping at most a given number of
+    search jobs running at once.
+
+    Queue searches with :meth:`submit` and saved searches with
+    :meth:`submit_saved_search`, then iterate over :meth:`as_completed` (or
+    :meth:`iter_results`) to start the jobs and collect them as they finish.
+    All running jobs are polled together with a single ``GET search/jobs``
+    request that asks for a few status fields only, instead of one refresh
+    per job.
+
+    When *max_running* is ``None``, the limit is the search job quota of the
+    roles of the current user (``srchJobsQuota``). A job that the server
+    refuses because a concurrency quota is reached (HTTP 503) is queued again
+    and retried once a running job finishes.
+
+    **Example**::
+
+        import splunklib.client as client
+        service = client.connect(...)
+        pool = client.JobPool(service, max_running=8)
+        for query in queries:
+            pool.submit(query, earliest_time="-1h")
+        for key, job in pool.as_completed():
+            print(key, job["resultCount"])
+
+    :param service: The :class:`Service` to run the searches on.
+    :type service: :class:`Service`
+    :param max_running: The most jobs to run at once (optional).
+    :type max_running: ``integer``
+    :param poll_interval: The time between polls of the running jobs, in
+        seconds (the default is 1).
+    :type poll_interval: ``float``
+    """
+
+    #: The number of jobs run at once when no limit is given or found.
+    DEFAULT_MAX_RUNNING = 10
+
+    def __init__(self, service, max_running=None, poll_interval=1):
+        self.service = service
+        self.max_running = max_running
+        self.poll_interval = poll_interval
+        self._queued = deque()
+        self._running = {}
+
+    def __len__(self):
+        return len(self._queued) + len(self._running)
+
+    def submit(self, query, key=None, **kwargs):
+        """Queues a search to run.
+
+        :param query: The search query.
+        :type query: ``string``
+        :param key: The key to report the job under (optional, the default is
+            the query).
+        :param kwargs: Additional parameters for :meth:`Jobs.create`.
+        :type kwargs: ``dict``
+        :return: The key.
+        """
+        key = query if key is None else key
+        self._queued.append((key, lambda: self.service.jobs.create(query, **kwargs)))
+        return key
+
+    def submit_saved_search(self, saved_search, key=None, **kwargs):
+        """Queues a saved search to dispatch.
+
+        :param saved_search: The saved search, or its name.
+        :type saved_search: :class:`SavedSearch` or ``string``
+        :param key: The key to report the job under (optional, the default is
+            the name of the saved search).
+        :param kwargs: Additional parameters for :meth:`SavedSearch.dispatch`.
+        :type kwargs: ``dict``
+        :return: The key.
+        """
+        if not isinstance(saved_search, SavedSearch):
+            saved_search = self.service.saved_searches[saved_search]
+        key = saved_search.name if key is None else key
+        self._queued.append((key, lambda: saved_search.dispatch(**kwargs)))
+        return key
+
+    def _limit(self):
+        if self.max_running is None:
+            self.max_running = self._search_quota() or self.DEFAULT_MAX_RUNNING
+        return self.max_running
+
+    def _search_quota(self):
+        """Returns the search job quota of the current user, or ``None``."""
+        try:
+            response = self.service.get("authentication/current-context")
+            roles = _load_atom(response, MATCH_ENTRY_CONTENT).get("roles", [])
+            roles = roles if isinstance(roles, list) else [roles]
+            quotas = [int(self.service.roles[role]["srchJobsQuota"]) for role in roles]
+        except (HTTPError, KeyError, ValueError):
+            return None
+        # A quota of 0 means that there is no limit.
+        return max(quotas) if quotas and min(quotas) > 0 else None
+
+    def _start_jobs(self):
+        while self._queued and len(self._running) < self._limit():
+            key, start = self._queued.popleft()
+            try:
+                job = start()
+            except HTTPError as he:
+                if he.status != 503:
+                    raise
+                # A concurrency quota is full; try again after the next poll.
+                self._queued.appendleft((key, start))
+                return
+            self._running[job.sid] = (key, job)
+
+    def _poll(self):
+        """Returns the sids of the running jobs that are done."""
+        if not self._running:
+            return []
+        response = self.service.jobs.get(
+            output_mode="json", count=0, f=["sid", "isDone", "dispatchState"]
+        )
+        listing = json.loads(response.body.read().decode("utf-8"))
+        # The entry name is the search string, not the sid.
+        states = {
+            entry["content"]["sid"]: entry["content"]
+            for entry in listing.get("entry", [])
+            if "sid" in entry.get("content", {})
+        }
+        done = []
+        for sid in self._running:
+            # A job missing from the listing was cancelled or has expired.
+            content = states.get(sid, {"isDone": True})
+            if content.get("isDone") in (True, 1, "1", "true"):
+                done.append(sid)
+        return done
+
+    def as_completed(self, timeout=None):
+        """Starts the queued jobs, and yields each one once it is done.
+
+        :param timeout: The longest time to wait for all the jobs, in seconds
+            (optional, the default is to wait indefinitely).
+        :type timeout: ``integer`` or ``float``
+        :raises OperationError: Raised when the jobs are not all done within
+            *timeout* seconds.
+        :return: An iterator of ``(key, job)`` pairs, where *job* is a
+            :class:`Job`.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        self._start_jobs()
+        while self._running or self._queued:
+            if deadline is not None and monotonic() >= deadline:
+                raise OperationError(
+                    f"{len(self)} search jobs did not finish within {timeout} seconds; timing out."
+                )
+            sleep(self.poll_interval)
+            finished = [self._running.pop(sid) for sid in self._poll()]
+            # Fill the freed slots before handing the finished jobs over.
+            self._start_jobs()
+            yield from finished
+
+    def iter_results(self, timeout=None, **query_params):
+        """Starts the queued jobs, and yields the results of each one once it
+        is done.
+
+        :param timeout: As for :meth:`as_completed`.
+        :param query_params: Additional parameters for :meth:`Job.results`.
+            ``output_mode`` is always "json".
+        :type query_params: ``dict``
+        :return: An iterator of ``(key, result)`` pairs, where *result* is a
+            ``dict`` or a :class:`splunklib.results.Message`.
+        """
+        query_params["output_mode"] = "json"
+        for key, job in self.as_completed(timeout):
+            for result in JSONResultsReader(job.results(**query_params)):
+                yield key, result
+
+
 class Loggers(Collection):
     """This class represents a collection of service logging categories.
     Retrieve this collection using :meth:`Service.loggers`."""
@@ -4035,6 +5523,121 @@ class KVStoreCollectionData:
 
         return json.loads(self._get("", **query).body.read().decode("utf-8"))
 
+    def iter_query(self, page_size=1000, prefetch=True, **query):
+        """
+        Iterates over the results of query, fetching them page by page, so
+        that collections of any size can be read with constant memory and
+        without reaching the server's ``max_rows_per_query`` limit.
+
+        Without a sort, pages are read in ``_key`` order, each one starting
+        after the last ``_key`` of the previous one, which stays correct while
+        documents are added or removed. With a sort, pages are read with
+        ``skip`` and ``limit``.
+
+        **Example**::
+
+            import splunklib.client as client
+            s = client.connect(...)
+            data = s.kvstore["lookup"].data
+            for document in data.iter_query(query={"status": "open"}, page_size=5000):
+                print(document["_key"])
+
+        :param page_size: The number of documents to request at a time
+        :type page_size: ``integer``
+        :param prefetch: Whether the next page is requested while the documents
+            of the current one are being returned
+        :type prefetch: ``boolean``
+        :param query: Optional parameters, as for :meth:`query`. ``skip`` and
+            ``limit`` apply to the whole iteration, and a ``limit`` of 0 means
+            no limit. Without a sort, ``fields`` must not exclude ``_key``.
+        :type query: ``dict``
+
+        :return: Iterator of the documents retrieved by query.
+        :rtype: ``iterator``
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1.")
+        return self._iter_query(page_size, prefetch, query)
+
+    def _iter_query(self, page_size, prefetch, query):
+        # A limit of 0 means no limit, as it does for the server
+        remaining = int(query.pop("limit", 0) or 0) or None
+        condition = query.pop("query", None)
+        if isinstance(condition, str):
+            condition = json.loads(condition)
+        keyset = "sort" not in query
+        if keyset:
+            query["sort"] = "_key"
+
+        def page_query(after, skip):
+            limit = page_size if remaining is None else min(page_size, remaining)
+            params = dict(query, limit=limit)
+            if skip:
+                params["skip"] = skip
+            if after is not None:
+                after = {"_key": {"$gt": after}}
+                params["query"] = {"$and": [condition, after]} if condition else after
+            elif condition:
+                params["query"] = condition
+            return params
+
+        skip = int(query.pop("skip", 0) or 0)
+        params = page_query(None, skip)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = self.query(**params)
+            while page:
+                if remaining is not None:
+                    remaining -= len(page)
+                done = len(page) < params["limit"] or remaining == 0
+                if not done:
+                    if keyset:
+                        params = page_query(page[-1]["_key"], 0)
+                    else:
+                        skip += len(page)
+                        params = page_query(None, skip)
+                    if prefetch:
+                        future = executor.submit(self.query, **params)
+                yield from page
+                if done:
+                    return
+                page = future.result() if prefetch else self.query(**params)
+
+    def writer(self, **kwargs):
+        """
+        Returns a :class:`KVStoreWriter` that buffers writes to this collection.
+
+        :param kwargs: Arguments for :class:`KVStoreWriter`
+        :type kwargs: ``dict``
+
+        :rtype: :class:`KVStoreWriter`
+        """
+        return KVStoreWriter(self, **kwargs)
+
+    def cached(self, **kwargs):
+        """
+        Returns a :class:`KVStoreCache` that caches reads of this collection.
+
+        :param kwargs: Arguments for :class:`KVStoreCache`
+        :type kwargs: ``dict``
+
+        :rtype: :class:`KVStoreCache`
+        """
+        return KVStoreCache(self, **kwargs)
+
+    def mirror(self, path=":memory:", **kwargs):
+        """
+        Returns a :class:`KVStoreMirror` that keeps a local copy of this
+        collection.
+
+        :param path: The path of the SQLite database file.
+        :type path: ``string``
+        :param kwargs: Other arguments for :class:`KVStoreMirror`
+        :type kwargs: ``dict``
+
+        :rtype: :class:`KVStoreMirror`
+        """
+        return KVStoreMirror(self, path, **kwargs)
+
     def query_by_id(self, id):
         """
         Returns object with _id = id.
@@ -4160,3 +5763,776 @@ class KVStoreCollectionData:
             .body.read()
             .decode("utf-8")
         )
+
+    def bulk_save(
+        self, documents, batch_size=1000, max_bytes=50 * 1024 * 1024, parallelism=4
+    ):
+        """
+        Inserts or updates every document of an iterable, such as a generator,
+        in batches that are posted to ``batch_save`` concurrently.
+
+        Documents are read from *documents* as batches are needed, so at most
+        about *parallelism* batches are held in memory at once. A batch is cut
+        when it has *batch_size* documents, or when another document would
+        take its JSON body past *max_bytes*. The defaults match splunkd's
+        default ``max_documents_per_batch_save`` and
+        ``max_size_per_batch_save_mb`` limits. A failed batch does not stop the
+        others.
+
+        **Example**::
+
+            import splunklib.client as client
+            s = client.connect(...)
+            rows = ({"_key": str(i), "value": i} for i in range(1000000))
+            result = s.kvstore["lookup"].data.bulk_save(rows, parallelism=8)
+            for error in result.errors:
+                print(error.offset, error.count, error.error)
+
+        :param documents: The documents to save, as dictionaries or JSON strings
+        :type documents: ``iterable``
+        :param batch_size: The maximum number of documents per batch
+        :type batch_size: ``integer``
+        :param max_bytes: The maximum size of the body of a batch, in bytes
+        :type max_bytes: ``integer``
+        :param parallelism: The number of batches posted at once
+        :type parallelism: ``integer``
+
+        :return: A record with ``ids``, the _id of each document in document
+            order (``None`` for the documents of a failed batch), and
+            ``errors``, a record with the ``offset`` of its first document,
+            the ``count`` of documents and the ``error`` raised for each failed
+            batch
+        :rtype: ``dict``
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+
+        def batches():
+            offset = 0
+            batch = []
+            size = 2
+            for document in documents:
+                if not isinstance(document, str):
+                    document = json.dumps(document)
+                length = len(document.encode("utf-8")) + 1
+                if batch and (len(batch) == batch_size or size + length > max_bytes):
+                    yield offset, batch
+                    offset += len(batch)
+                    batch = []
+                    size = 2
+                batch.append(document)
+                size += length
+            if batch:
+                yield offset, batch
+
+        def save(batch):
+            offset, documents = batch
+            body = "[" + ",".join(documents) + "]"
+            try:
+                response = self._post(
+                    "batch_save", headers=KVStoreCollectionData.JSON_HEADER, body=body
+                )
+            except HTTPError as he:
+                error = record({"offset": offset, "count": len(documents), "error": he})
+                return [None] * len(documents), error
+            return json.loads(response.body.read().decode("utf-8")), None
+
+        ids = []
+        errors = []
+        for saved, error in _bounded_map(save, batches(), parallelism):
+            ids.extend(saved)
+            if error is not None:
+                errors.append(error)
+        return record({"ids": ids, "errors": errors})
+
+
+class KVStoreCache:
+    """This class answers :meth:`query_by_id` and :meth:`query` from a local
+    least-recently-used cache of KV Store responses, and writes through to the
+    collection.
+
+    Responses are kept for *ttl* seconds, *maxsize* of them at most. A write
+    through this object drops the cached document it writes and all cached
+    query results; writes made elsewhere are seen once the TTL expires. With
+    *negative_ttl*, a ``query_by_id`` for a document that does not exist is
+    remembered too, and raises a :class:`splunklib.binding.HTTPError` with the
+    same status and body until then.
+
+    **Example**::
+
+        import splunklib.client as client
+        s = client.connect(...)
+        assets = s.kvstore["assets"].data.cached(ttl=300, negative_ttl=60)
+        for event in events:
+            try:
+                owner = assets.query_by_id(event["host"])["owner"]
+            except client.HTTPError:
+                owner = None
+        print(assets.hits, assets.misses)
+
+    :param data: The collection data to read.
+    :type data: :class:`KVStoreCollectionData`
+    :param maxsize: The maximum number of responses kept (the default is
+        1024).
+    :type maxsize: ``integer``
+    :param ttl: The number of seconds a response is kept (the default is 60).
+    :type ttl: ``float``
+    :param negative_ttl: The number of seconds a missing document is
+        remembered, or ``None`` not to remember missing documents (the
+        default).
+    :type negative_ttl: ``float``
+    """
+
+    def __init__(self, data, maxsize=1024, ttl=60, negative_ttl=None):
+        self.data = data
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        #: The number of reads answered from the cache.
+        self.hits = 0
+        #: The number of reads sent to the server.
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def query_by_id(self, id):
+        """
+        Returns object with _id = id, from the cache when possible.
+
+        :param id: Value for ID. If not a string will be coerced to string.
+        :type id: ``string``
+
+        :return: Document with id
+        :rtype: ``dict``
+        """
+        key = ("id", str(id))
+        cached = self._lookup(key)
+        if cached is not None:
+            if isinstance(cached, tuple):
+                # A new error each time: re-raising one instance would grow
+                # its traceback on every hit.
+                status, reason, headers, body = cached
+                response = {
+                    "status": status,
+                    "reason": reason,
+                    "headers": headers,
+                    "body": BytesIO(body),
+                }
+                raise HTTPError(record(response))
+            return json.loads(cached)
+        try:
+            document = self.data.query_by_id(id)
+        except HTTPError as he:
+            if he.status == 404 and self.negative_ttl is not None:
+                missing = (he.status, he.reason, he.headers, he.body)
+                self._store(key, missing, self.negative_ttl)
+            raise
+        self._store(key, json.dumps(document), self.ttl)
+        return document
+
+    def query(self, **query):
+        """
+        Gets the results of query, from the cache when the same query was made
+        recently, with optional parameters sort, limit, skip, and fields.
+
+        :param query: Optional parameters, as for
+            :meth:`KVStoreCollectionData.query`.
+        :type query: ``dict``
+
+        :return: Array of documents retrieved by query.
+        :rtype: ``array``
+        """
+        key = ("query", json.dumps(query, sort_keys=True))
+        cached = self._lookup(key)
+        if cached is not None:
+            return json.loads(cached)
+        documents = self.data.query(**query)
+        self._store(key, json.dumps(documents), self.ttl)
+        return documents
+
+    def insert(self, data):
+        """Inserts item into the collection, as
+        :meth:`KVStoreCollectionData.insert` does, and invalidates it."""
+        if isinstance(data, str):
+            data = json.loads(data)
+        try:
+            return self.data.insert(data)
+        finally:
+            self.invalidate(data.get("_key"))
+
+    def update(self, id, data):
+        """Replaces document with _id = id with data, as
+        :meth:`KVStoreCollectionData.update` does, and invalidates it."""
+        try:
+            return self.data.update(id, data)
+        finally:
+            self.invalidate(id)
+
+    def delete_by_id(self, id):
+        """Deletes document that has _id = id, as
+        :meth:`KVStoreCollectionData.delete_by_id` does, and invalidates it."""
+        try:
+            return self.data.delete_by_id(id)
+        finally:
+            self.invalidate(id)
+
+    def delete(self, query=None):
+        """Deletes the documents matched by query, or all of them, as
+        :meth:`KVStoreCollectionData.delete` does, and clears the cache."""
+        try:
+            return self.data.delete(query)
+        finally:
+            self.clear()
+
+    def batch_save(self, *documents):
+        """Inserts or updates every document specified in documents, as
+        :meth:`KVStoreCollectionData.batch_save` does, and invalidates them."""
+        try:
+            return self.data.batch_save(*documents)
+        finally:
+            with self._lock:
+                for document in documents:
+                    if isinstance(document, str):
+                        document = json.loads(document)
+                    if isinstance(document, dict) and "_key" in document:
+                        self._entries.pop(("id", str(document["_key"])), None)
+                self._drop_queries()
+
+    def invalidate(self, id=None):
+        """Drops the cached document with _id = id, if any, and all cached
+        query results. Without an id, only the query results are dropped.
+
+        :param id: The _id of a document (optional).
+        :type id: ``string``
+        """
+        with self._lock:
+            if id is not None:
+                self._entries.pop(("id", str(id)), None)
+            self._drop_queries()
+
+    def clear(self):
+        """Drops everything cached."""
+        with self._lock:
+            self._entries.clear()
+
+    # Called with the lock held
+    def _drop_queries(self):
+        for key in [key for key in self._entries if key[0] == "query"]:
+            del self._entries[key]
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def _store(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class KVStoreMirror:
+    """This class keeps a copy of a KV Store collection in a local SQLite
+    database, and answers :meth:`get` and :meth:`find` from it without
+    contacting the server.
+
+    :meth:`sync` brings the copy up to date. The first call reads the whole
+    collection. With a *modified_field*, a field that every write to the
+    collection sets to a larger value (for example an epoch time), later calls
+    only read the documents whose value is at least the largest one seen so
+    far, plus the ``_key`` of every document to find the deleted ones. Without
+    it, every call reads the whole collection again.
+
+    Equality lookups on the fields listed in *indexes* use SQLite indexes;
+    other fields are compared after the documents are loaded. The database
+    file remembers the collection, the indexes and the *modified_field* it was
+    built with, and starts over when one of them changes.
+
+    **Example**::
+
+        import splunklib.client as client
+        s = client.connect(...)
+        assets = s.kvstore["assets"].data.mirror(
+            "assets.db", indexes=["ip", "owner"], modified_field="updated"
+        )
+        assets.sync()
+        for event in events:
+            asset = assets.get(event["host"])
+            shared = assets.find(ip=event["src_ip"])
+
+    :param data: The collection data to copy.
+    :type data: :class:`KVStoreCollectionData`
+    :param path: The path of the SQLite database file (the default is
+        ``":memory:"``, which keeps the copy in memory only).
+    :type path: ``string``
+    :param indexes: The top-level fields to index.
+    :type indexes: ``list``
+    :param modified_field: The field used to read only changed documents, or
+        ``None`` to read the whole collection on every sync (the default).
+    :type modified_field: ``string``
+    :param page_size: The number of documents to request at a time (the
+        default is 1000).
+    :type page_size: ``integer``
+    """
+
+    def __init__(
+        self, data, path=":memory:", indexes=(), modified_field=None, page_size=1000
+    ):
+        self.data = data
+        self.path = path
+        self.indexes = list(indexes)
+        self.modified_field = modified_field
+        self.page_size = page_size
+        self._columns = {field: f"i{i}" for i, field in enumerate(self.indexes)}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            # Lets other connections read the file while a sync writes to it
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._open()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM documents"
+            ).fetchone()[0]
+
+    def __contains__(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM documents WHERE _key = ?", (str(key),)
+            ).fetchone()
+        return row is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get(self, key, default=None):
+        """
+        Returns the document with _key = key from the local copy.
+
+        :param key: The _key of the document.
+        :type key: ``string``
+        :param default: The value to return when there is no such document.
+
+        :return: The document, or *default*.
+        :rtype: ``dict``
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT document FROM documents WHERE _key = ?", (str(key),)
+            ).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def find(self, **fields):
+        """
+        Returns the documents of the local copy whose top-level fields are
+        equal to the given values, in ``_key`` order.
+
+        **Example**::
+
+            mirror.find(owner="alice", status="active")
+
+        :param fields: The field values to match.
+        :type fields: ``dict``
+
+        :return: The matching documents.
+        :rtype: ``list``
+        """
+        where, params, others = [], [], {}
+        for field, value in fields.items():
+            column = self._columns.get(field)
+            if column is None:
+                others[field] = value
+            elif value is None:
+                where.append(f"{column} IS NULL")
+            else:
+                where.append(f"{column} = ?")
+                params.append(self._column_value(value))
+        sql = "SELECT document FROM documents"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            rows = self._connection.execute(sql + " ORDER BY _key", params).fetchall()
+        documents = (json.loads(row[0]) for row in rows)
+        return [
+            document
+            for document in documents
+            if all(document.get(field) == value for field, value in others.items())
+        ]
+
+    def sync(self, full=False):
+        """
+        Brings the local copy up to date with the collection.
+
+        The documents read from the server are staged in a temporary table,
+        and the changes are then applied in a single transaction, so the copy
+        is never seen half updated. :meth:`get` and :meth:`find` keep
+        answering from the previous copy while the collection is read.
+
+        :param full: Whether to read the whole collection even when a
+            *modified_field* allows reading only the changed documents.
+        :type full: ``boolean``
+
+        :return: The number of documents written and deleted locally, as
+            ``saved`` and ``deleted``.
+        :rtype: ``record``
+        """
+        with self._sync_lock:
+            with self._lock, self._connection as connection:
+                mark = None if full else self._state("mark")
+                connection.execute(
+                    "CREATE TEMP TABLE staged AS SELECT * FROM main.documents WHERE 0"
+                )
+                connection.execute("CREATE TEMP TABLE seen (_key TEXT PRIMARY KEY)")
+            try:
+                if self.modified_field is None or mark is None:
+                    documents = self.data.iter_query(page_size=self.page_size)
+                    keys = None
+                else:
+                    condition = {self.modified_field: {"$gte": json.loads(mark)}}
+                    documents = self.data.iter_query(
+                        page_size=self.page_size, query=condition
+                    )
+                    keys = self.data.iter_query(page_size=self.page_size, fields="_key")
+                saved, mark = self._stage(documents, mark)
+                if keys is not None:
+                    for page in _chunks(keys, self.page_size):
+                        with self._lock, self._connection as connection:
+                            connection.executemany(
+                                "INSERT OR IGNORE INTO seen VALUES (?)",
+                                [(str(d["_key"]),) for d in page],
+                            )
+                with self._lock, self._connection as connection:
+                    if keys is None:
+                        connection.execute(
+                            "INSERT OR IGNORE INTO seen SELECT _key FROM staged"
+                        )
+                    connection.execute(
+                        "INSERT OR REPLACE INTO main.documents SELECT * FROM staged"
+                    )
+                    deleted = connection.execute(
+                        "DELETE FROM main.documents WHERE _key NOT IN (SELECT _key FROM seen)"
+                    ).rowcount
+                    if mark is not None:
+                        self._set_state("mark", mark)
+            finally:
+                with self._lock:
+                    self._connection.execute("DROP TABLE temp.staged")
+                    self._connection.execute("DROP TABLE temp.seen")
+        return record({"saved": saved, "deleted": deleted})
+
+    def close(self):
+        """Closes the database. The copy stays in the file for the next
+        :class:`KVStoreMirror` opened on it."""
+        with self._lock:
+            self._connection.close()
+
+    # Copy the documents to the staged table, a page at a time, and return
+    # how many there were and the new mark
+    def _stage(self, documents, mark):
+        placeholders = ", ".join("?" * (len(self._columns) + 2))
+        insert = f"INSERT INTO staged VALUES ({placeholders})"
+        modified = json.loads(mark) if mark is not None else None
+        saved = 0
+        for page in _chunks(documents, self.page_size):
+            rows = []
+            for document in page:
+                rows.append(
+                    [str(document["_key"]), json.dumps(document)]
+                    + [self._column_value(document.get(f)) for f in self.indexes]
+                )
+                value = document.get(self.modified_field)
+                if value is not None and (modified is None or value > modified):
+                    modified = value
+            with self._lock, self._connection as connection:
+                connection.executemany(insert, rows)
+            saved += len(rows)
+        if self.modified_field is None or modified is None:
+            return saved, None
+        return saved, json.dumps(modified)
+
+    @staticmethod
+    def _column_value(value):
+        if value is None or isinstance(value, (str, int, float)):
+            return value
+        return json.dumps(value, sort_keys=True)
+
+    def _open(self):
+        layout = json.dumps(
+            {
+                "collection": [self.data.owner, self.data.app, self.data.path],
+                "indexes": self.indexes,
+                "modified_field": self.modified_field,
+            }
+        )
+        connection = self._connection
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS mirror_state (name TEXT PRIMARY KEY, value TEXT)"
+            )
+            if self._state("layout") == layout:
+                return
+            connection.execute("DROP TABLE IF EXISTS documents")
+            connection.execute("DELETE FROM mirror_state")
+            columns = "".join(f", {column}" for column in self._columns.values())
+            connection.execute(
+                f"CREATE TABLE documents (_key TEXT PRIMARY KEY, document TEXT NOT NULL{columns})"
+            )
+            for column in self._columns.values():
+                connection.execute(
+                    f"CREATE INDEX documents_{column} ON documents ({column})"
+                )
+            self._set_state("layout", layout)
+
+    def _state(self, name):
+        row = self._connection.execute(
+            "SELECT value FROM mirror_state WHERE name = ?", (name,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def _set_state(self, name, value):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO mirror_state VALUES (?, ?)", (name, value)
+        )
+
+
+class KVStoreWriter:
+    """This class buffers inserts, updates and deletes of KV Store documents
+    and writes them in batches: saves with ``batch_save`` and deletes with a
+    single query per batch.
+
+    Writes to the same ``_key`` are coalesced, so that only the last one is
+    sent. The buffer is flushed once it holds *batch_size* writes, once the
+    oldest write has waited *flush_interval* seconds, and when the writer is
+    closed, which leaving a ``with`` block does. A failed batch does not stop
+    the others: each of its writes is reported in :attr:`failures`.
+
+    **Example**::
+
+        import splunklib.client as client
+        s = client.connect(...)
+        with s.kvstore["checkpoints"].data.writer(flush_interval=2) as writer:
+            for event in events:
+                writer.update(event.source, {"position": event.offset})
+        for failure in writer.failures:
+            print(failure.key, failure.error)
+
+    :param data: The collection data to write to.
+    :type data: :class:`KVStoreCollectionData`
+    :param batch_size: The number of buffered writes that triggers a flush,
+        and the most documents sent per request (the default is 1000).
+    :type batch_size: ``integer``
+    :param flush_interval: The longest a write is buffered, in seconds, or
+        ``None`` to flush on size and on close only (the default is 5).
+    :type flush_interval: ``float``
+    :param max_bytes: The maximum size of a ``batch_save`` body, in bytes.
+    :type max_bytes: ``integer``
+    :param max_query_length: The maximum length of the URL-encoded query of
+        a delete, which is sent in the URL, in bytes (the default is 4096).
+        Deletes that would not fit are split over several requests.
+    :type max_query_length: ``integer``
+    """
+
+    def __init__(
+        self,
+        data,
+        batch_size=1000,
+        flush_interval=5,
+        max_bytes=50 * 1024 * 1024,
+        max_query_length=4096,
+    ):
+        self.data = data
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_query_length = max_query_length
+        #: The writes that failed, as records with the ``key`` and the
+        #: ``document`` (``None`` for a delete) written, and the ``error``.
+        self.failures = []
+        self._saves = OrderedDict()
+        self._inserts = []
+        self._deletes = OrderedDict()
+        self._oldest = None
+        self._closed = False
+        self._lock = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        if flush_interval is not None:
+            self._thread = threading.Thread(target=self._flush_periodically)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._saves) + len(self._inserts) + len(self._deletes)
+
+    def insert(self, data):
+        """Buffers the insertion of a document. A document with a ``_key``
+        replaces any buffered write to that ``_key``.
+
+        :param data: The document to insert.
+        :type data: ``dict`` or ``string``
+        """
+        if isinstance(data, str):
+            data = json.loads(data)
+        key = data.get("_key")
+        with self._lock:
+            self._check_open()
+            if key is None:
+                self._inserts.append(data)
+            else:
+                self._deletes.pop(key, None)
+                self._saves.pop(key, None)
+                self._saves[key] = data
+            self._buffered()
+
+    def update(self, id, data):
+        """Buffers the replacement of the document with _id = id by data,
+        which replaces any buffered write to that document.
+
+        :param id: The _id of the document to update.
+        :type id: ``string``
+        :param data: The new document.
+        :type data: ``dict`` or ``string``
+        """
+        if isinstance(data, str):
+            data = json.loads(data)
+        self.insert(dict(data, _key=str(id)))
+
+    def delete_by_id(self, id):
+        """Buffers the deletion of the document with _id = id, which replaces
+        any buffered write to that document.
+
+        :param id: The _id of the document to delete.
+        :type id: ``string``
+        """
+        with self._lock:
+            self._check_open()
+            self._saves.pop(str(id), None)
+            self._deletes[str(id)] = None
+            self._buffered()
+
+    def flush(self):
+        """Writes all buffered writes now."""
+        with self._flush_lock:
+            with self._lock:
+                deletes = list(self._deletes)
+                documents = list(self._saves.values()) + self._inserts
+                self._deletes = OrderedDict()
+                self._saves = OrderedDict()
+                self._inserts = []
+                self._oldest = None
+            self._send(deletes, documents)
+
+    def close(self):
+        """Flushes the buffered writes and stops the writer."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._lock.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _check_open(self):
+        if self._closed:
+            raise IllegalOperationException("The KVStoreWriter is closed.")
+
+    # Called with the lock held after a write was buffered
+    def _buffered(self):
+        if self._oldest is None:
+            self._oldest = monotonic()
+        if len(self._saves) + len(self._inserts) + len(self._deletes) < self.batch_size:
+            return
+        # Flushing takes the flush lock, which must not be awaited while
+        # holding the buffer lock: release it for the duration.
+        self._lock.release()
+        try:
+            self.flush()
+        finally:
+            self._lock.acquire()
+
+    def _flush_periodically(self):
+        with self._lock:
+            while not self._closed:
+                if self._oldest is None:
+                    self._lock.wait(self.flush_interval)
+                    continue
+                delay = self._oldest + self.flush_interval - monotonic()
+                if delay > 0:
+                    self._lock.wait(delay)
+                    continue
+                self._lock.release()
+                try:
+                    self.flush()
+                except Exception:
+                    # The writes are in failures; keep flushing later ones.
+                    logger.exception("Flushing the KVStoreWriter failed.")
+                finally:
+                    self._lock.acquire()
+
+    # Split the keys to delete into batches whose $or query fits in the URL
+    def _delete_batches(self, keys):
+        empty = len(parse.quote(json.dumps({"$or": []}), safe=""))
+        batch = []
+        length = empty
+        for key in keys:
+            term = len(parse.quote(json.dumps({"_key": key}) + ", ", safe=""))
+            if batch and (
+                len(batch) == self.batch_size or length + term > self.max_query_length
+            ):
+                yield batch
+                batch = []
+                length = empty
+            batch.append(key)
+            length += term
+        if batch:
+            yield batch
+
+    def _send(self, deletes, documents):
+        for keys in self._delete_batches(deletes):
+            query = {"$or": [{"_key": key} for key in keys]}
+            try:
+                self.data.delete(json.dumps(query))
+            except (HTTPError, OSError) as e:
+                self._failed(((key, None) for key in keys), e)
+        for i in range(0, len(documents), self.batch_size):
+            batch = documents[i : i + self.batch_size]
+            try:
+                result = self.data.bulk_save(
+                    batch, self.batch_size, self.max_bytes, parallelism=1
+                )
+            except OSError as e:
+                # splunkd could not be reached: nothing is known to be saved
+                self._failed(((d.get("_key"), d) for d in batch), e)
+                continue
+            for error in result.errors:
+                failed = batch[error.offset : error.offset + error.count]
+                self._failed(((d.get("_key"), d) for d in failed), error.error)
+
+    def _failed(self, writes, error):
+        for key, document in writes:
+            failure = record({"key": key, "document": document, "error": error})
+            self.failures.append(failure)
@@ -16,9 +16,9 @@
 format, which is the format used by most of the REST API.
 """
 
-from xml.etree.ElementTree import XML
+from xml.etree.ElementTree import XML, XMLPullParser
 
-__all__ = ["load", "record"]
+__all__ = ["iterload", "load", "record"]
 
 # LNAME refers to element names without namespaces; XNAME is the same
 # name, but with an XML namespace.
@@ -33,6 +33,9 @@ XNAME_ITEM = XNAMEF_REST % LNAME_ITEM
 XNAME_KEY = XNAMEF_REST % LNAME_KEY
 XNAME_LIST = XNAMEF_REST % LNAME_LIST
 
+# The number of bytes iterload reads from its stream at a time
+BLOCK_SIZE = 64 * 1024
+
 
 # Some responses don't use namespaces (eg: search/parse) so we look for
 # both the extended and local versions of the following names.
@@ -92,6 +95,58 @@ def load(text, match=None):
     return [load_root(item, nametable) for item in items]
 
 
+def iterload(stream, match):
+    """This function reads the XML of an Atom Feed from a stream and yields the
+    elements that match one at a time, as soon as each has been parsed. Only
+    the root element and its children are matched, so for a feed, matching
+    ``{http://www.w3.org/2005/Atom}entry`` yields its entries.
+
+    Unlike :func:`load`, neither the whole text nor the whole element tree is
+    held in memory: each element is discarded once it has been loaded.
+
+    :param stream: The stream of XML bytes to load.
+    :type stream: file-like object
+    :param match: A tag name, or a ``tuple`` of tag names, to match.
+    :type match: ``string`` or ``tuple``
+    :return: An iterator of ``(name, value)`` pairs, where *name* is the local
+        name of the element and *value* is loaded as it would be as a member
+        of its parent by :func:`load`.
+    """
+    if isinstance(match, str):
+        match = (match,)
+    nametable = {"namespaces": [], "names": {}}
+    parser = XMLPullParser(events=("start", "end"))
+    started = False
+    root = None
+    depth = 0
+    while True:
+        block = stream.read(BLOCK_SIZE)
+        if not started:
+            # Like load, ignore leading whitespace and empty documents.
+            block = block.lstrip()
+            started = len(block) > 0
+        if block:
+            parser.feed(block)
+        elif started:
+            parser.close()
+        else:
+            return
+        for event, element in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth > 1 or element.tag not in match:
+                continue
+            yield load_elem(element, nametable)
+            if depth == 1:
+                root.remove(element)
+        if not block:
+            return
+
+
 # Load the attributes of the given element.
 def load_attrs(element):
     if not hasattrs(element):
@@ -250,9 +305,8 @@ class Record(dict):
             return dict.__getitem__(self, key)
         key += self.sep
         result = record()
-        for k, v in self.items():
-            if not k.startswith(key):
-                continue
+        for k in self._prefix_index().get(key, ()):
+            v = dict.__getitem__(self, k)
             suffix = k[len(key) :]
             if "." in suffix:
                 ks = suffix.split(self.sep)
@@ -268,6 +322,65 @@ class Record(dict):
             raise KeyError(f"No key or prefix: {key}")
         return result
 
+    # The prefix index maps every prefix ending in ``sep`` to the keys that
+    # start with it, so that prefix lookups do not scan all the keys. It is
+    # built on the first prefix lookup and dropped whenever a key is added or
+    # removed. It lives in the instance __dict__, because attribute
+    # assignment on a Record sets an item.
+    def _prefix_index(self):
+        index = self.__dict__.get("_prefixes")
+        if index is None:
+            index = {}
+            sep = self.sep
+            for k in self:
+                if not isinstance(k, str):
+                    continue
+                end = k.find(sep)
+                while end >= 0:
+                    index.setdefault(k[: end + 1], []).append(k)
+                    end = k.find(sep, end + 1)
+            self.__dict__["_prefixes"] = index
+        return index
+
+    def _invalidate(self):
+        self.__dict__.pop("_prefixes", None)
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._invalidate()
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._invalidate()
+        dict.__delitem__(self, key)
+
+    if hasattr(dict, "__ior__"):  # Python 3.9+
+
+        def __ior__(self, other):
+            self._invalidate()
+            return dict.__ior__(self, other)
+
+    def clear(self):
+        self._invalidate()
+        dict.clear(self)
+
+    def pop(self, *args):
+        self._invalidate()
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self._invalidate()
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._invalidate()
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        self._invalidate()
+        dict.update(self, *args, **kwargs)
+
 
 def record(value=None):
     """This function returns a :class:`Record` instance constructed with an
@@ -32,15 +32,16 @@ as follows:::
     print(f"Results are a preview: {reader.is_preview}")
 """
 
+import codecs
 from io import BufferedReader, BytesIO
 
 
 import xml.etree.ElementTree as et
 
 from collections import OrderedDict
-from json import loads as json_loads
+from json import JSONDecodeError, JSONDecoder
 
-__all__ = ["ResultsReader", "Message", "JSONResultsReader"]
+__all__ = ["ResultsReader", "Message", "JSONResultsReader", "ColumnarReader"]
 
 import deprecation
 
@@ -91,15 +92,18 @@ class _ConcatenatedStream:
 
         If *n* is ``None``, return all available characters.
         """
-        response = b""
+        chunks = []
         while len(self.streams) > 0 and (n is None or n > 0):
             txt = self.streams[0].read(n)
-            response += txt
+            if not txt:
+                # Only an empty read means the stream is exhausted; a short
+                # one may just be all the data available so far.
+                del self.streams[0]
+                continue
+            chunks.append(txt)
             if n is not None:
                 n -= len(txt)
-            if n is None or n > 0:
-                del self.streams[0]
-        return response
+        return b"".join(chunks)
 
 
 class _XMLDTDFilter:
@@ -109,6 +113,9 @@ class _XMLDTDFilter:
     removed in their entirety from the stream. No regular expressions
     are used, however, so everything still streams properly.
 
+    The stream is filtered a block at a time, carrying a trailing ``<``
+    or an unterminated ``<?...`` over to the next block.
+
     **Example**::
 
         from StringIO import StringIO
@@ -116,34 +123,58 @@ class _XMLDTDFilter:
         assert s.read() == "<element></element>"
     """
 
+    _BLOCK_SIZE = 64 * 1024
+
     def __init__(self, stream):
         self.stream = stream
+        self._buffer = bytearray()
+        self._carry = b""
+        self._skipping = False
+        self._eof = False
+
+    def _filter(self, block):
+        """Append *block*, minus any DTDs, to the filtered buffer."""
+        if not block:
+            self._eof = True
+            self._buffer += self._carry
+            self._carry = b""
+            return
+        data = self._carry + block
+        self._carry = b""
+        pos = 0
+        while pos < len(data):
+            if self._skipping:
+                end = data.find(b">", pos)
+                if end < 0:
+                    return
+                pos = end + 1
+                self._skipping = False
+                continue
+            start = data.find(b"<?", pos)
+            if start < 0:
+                if data.endswith(b"<"):
+                    # It might be the start of a "<?" split across blocks.
+                    self._buffer += data[pos:-1]
+                    self._carry = b"<"
+                else:
+                    self._buffer += data[pos:]
+                return
+            self._buffer += data[pos:start]
+            pos = start + 2
+            self._skipping = True
 
     def read(self, n=None):
         """Read at most *n* characters from this stream.
 
         If *n* is ``None``, return all available characters.
         """
-        response = b""
-        while n is None or n > 0:
-            c = self.stream.read(1)
-            if c == b"":
-                break
-            if c == b"<":
-                c += self.stream.read(1)
-                if c == b"<?":
-                    while True:
-                        q = self.stream.read(1)
-                        if q == b">":
-                            break
-                else:
-                    response += c
-                    if n is not None:
-                        n -= len(c)
-            else:
-                response += c
-                if n is not None:
-                    n -= 1
+        while (n is None or len(self._buffer) < n) and not self._eof:
+            self._filter(self.stream.read(max(n or 0, self._BLOCK_SIZE)))
+        if n is None or n >= len(self._buffer):
+            response, self._buffer = bytes(self._buffer), bytearray()
+        else:
+            response = bytes(self._buffer[:n])
+            del self._buffer[:n]
         return response
 
 
@@ -278,7 +309,9 @@ class JSONResultsReader:
     running search, or ``False`` when the results are from a completed search.
 
     This function has no network activity other than what is implicit in the
-    stream it operates on.
+    stream it operates on. The stream is parsed incrementally, one result at a
+    time, so the first result is available as soon as it arrives and memory use
+    does not grow with the size of the result set.
 
     :param `stream`: The stream to read from (any object that supports``.read()``).
 
@@ -320,22 +353,302 @@ class JSONResultsReader:
 
     def _parse_results(self, stream):
         """Parse results and messages out of *stream*."""
-        msg_type = None
-        text = None
-        for line in stream.readlines():
-            strip_line = line.strip()
-            if strip_line.__len__() == 0:
+        documents = _JSONDocumentStream(stream)
+        while documents.peek() is not None:
+            if documents.peek() != "{":
+                # Not an object, so there is nothing to stream from it.
+                yield from self._parse_document(documents.value())
+                continue
+            # Read the members of the object one by one, so that a large
+            # "results" array is yielded element by element instead of
+            # being decoded as a whole.
+            document = {}
+            for key in documents.members():
+                if key == "results" and documents.peek() == "[":
+                    yield from self._parse_document(document)
+                    document = {}
+                    yield from documents.elements()
+                else:
+                    document[key] = documents.value()
+            yield from self._parse_document(document)
+
+    def _parse_document(self, document):
+        """Yield the results and messages found in one decoded JSON document."""
+        if "preview" in document:
+            self.is_preview = document["preview"]
+        if "messages" in document and document["messages"].__len__() > 0:
+            for message in document["messages"]:
+                msg_type = message.get("type", "Unknown Message Type")
+                text = message.get("text")
+            yield Message(msg_type, text)
+        if "result" in document:
+            yield document["result"]
+        if "results" in document:
+            for result in document["results"]:
+                yield result
+
+
+class ColumnarReader:
+    """This class returns batches of search results in column-oriented form.
+
+    ``ColumnarReader`` is iterable, and returns one ``dict`` per batch of up to
+    *batch_size* results. Each ``dict`` maps a field name to the list of that
+    field's values, in result order, with ``None`` where a result lacks the
+    field. The field order follows the ``fields`` metadata of the stream.
+
+    Like :class:`JSONResultsReader`, it has an ``is_preview`` field. Splunk
+    messages are not interleaved with the batches, but collected in the
+    ``messages`` field, and ``fields`` holds the field names seen so far.
+
+    The reader accepts streams fetched with ``output_mode`` set to
+    ``json_rows``, ``json_cols``, or ``json``. ``json_rows`` is the cheapest to
+    read, as rows are turned into columns without creating a ``dict`` per
+    result.
+
+    When *numpy* is ``True``, every column whose values all convert to
+    integers or floats is returned as an ``int64`` or ``float64`` NumPy array
+    (``None`` becomes ``NaN`` in float columns), and every other column as an
+    ``object`` array. This requires NumPy to be installed.
+
+    This function has no network activity other than what is implicit in the
+    stream it operates on.
+
+    :param `stream`: The stream to read from (any object that supports``.read()``).
+    :param `batch_size`: The largest number of results per batch.
+    :type batch_size: ``integer``
+    :param `numpy`: Whether to return NumPy arrays instead of lists.
+    :type numpy: ``boolean``
+
+    **Example**::
+
+        from splunklib import results
+        stream = job.results(output_mode="json_rows", count=0)
+        for batch in results.ColumnarReader(stream, batch_size=50000, numpy=True):
+            print(batch["bytes"].sum())
+    """
+
+    def __init__(self, stream, batch_size=10000, numpy=False):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        self._np = None
+        if numpy:
+            try:
+                import numpy as np
+            except ImportError:
+                raise ImportError("ColumnarReader(numpy=True) requires NumPy.")
+            self._np = np
+        self.batch_size = batch_size
+        self.is_preview = None
+        self.fields = []
+        self.messages = []
+        self._rows = []
+        self._gen = self._parse_batches(BufferedReader(stream))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._gen)
+
+    def _parse_batches(self, stream):
+        """Parse batches of results out of *stream*."""
+        documents = _JSONDocumentStream(stream)
+        while documents.peek() is not None:
+            if documents.peek() != "{":
+                documents.value()
                 continue
-            parsed_line = json_loads(strip_line)
-            if "preview" in parsed_line:
-                self.is_preview = parsed_line["preview"]
-            if "messages" in parsed_line and parsed_line["messages"].__len__() > 0:
-                for message in parsed_line["messages"]:
-                    msg_type = message.get("type", "Unknown Message Type")
-                    text = message.get("text")
-                yield Message(msg_type, text)
-            if "result" in parsed_line:
-                yield parsed_line["result"]
-            if "results" in parsed_line:
-                for result in parsed_line["results"]:
-                    yield result
+            for key in documents.members():
+                if key in ("rows", "results") and documents.peek() == "[":
+                    for row in documents.elements():
+                        self._rows.append(row)
+                        if len(self._rows) >= self.batch_size:
+                            yield self._flush()
+                elif key == "columns":
+                    yield from self._split_columns(documents.value())
+                else:
+                    value = documents.value()
+                    if key == "fields":
+                        names = [f["name"] if isinstance(f, dict) else f for f in value]
+                        if names != self.fields[: len(names)]:
+                            # Rows are positional, so a new field list starts
+                            # a new batch.
+                            if self._rows:
+                                yield self._flush()
+                            self.fields = names
+                    elif key == "preview":
+                        self.is_preview = value
+                    elif key == "messages":
+                        self.messages.extend(
+                            Message(
+                                m.get("type", "Unknown Message Type"), m.get("text")
+                            )
+                            for m in value
+                        )
+                    elif key == "result":
+                        # One result per document in export streams.
+                        self._rows.append(value)
+                        if len(self._rows) >= self.batch_size:
+                            yield self._flush()
+        if self._rows:
+            yield self._flush()
+
+    def _flush(self):
+        """Turn the pending rows into a batch of columns."""
+        rows, self._rows = self._rows, []
+        if isinstance(rows[0], dict):
+            # output_mode=json: pick the fields out of each result, adding
+            # any field that the metadata did not announce.
+            known = set(self.fields)
+            for row in rows:
+                if len(row) > len(known) or not known.issuperset(row):
+                    for name in row:
+                        if name not in known:
+                            known.add(name)
+                            self.fields.append(name)
+            columns = [[row.get(name) for row in rows] for name in self.fields]
+        else:
+            # output_mode=json_rows: transpose, padding any short row.
+            width = len(self.fields)
+            if any(len(row) != width for row in rows):
+                rows = [(row + [None] * width)[:width] for row in rows]
+            columns = [list(column) for column in zip(*rows)]
+        return self._batch(columns)
+
+    def _split_columns(self, columns):
+        """Cut the columns of an ``output_mode=json_cols`` document into batches."""
+        length = max((len(column) for column in columns), default=0)
+        for start in range(0, length, self.batch_size):
+            yield self._batch(
+                [column[start : start + self.batch_size] for column in columns]
+            )
+
+    def _batch(self, columns):
+        if self._np is not None:
+            columns = [self._typed(column) for column in columns]
+        return dict(zip(self.fields, columns))
+
+    def _typed(self, column):
+        """Return *column* as the narrowest of an int64, float64, or object array."""
+        np = self._np
+        try:
+            return np.array(column, dtype=np.int64)
+        except (TypeError, ValueError, OverflowError):
+            pass
+        if any(value is not None for value in column):
+            try:
+                return np.array(
+                    [np.nan if value is None else value for value in column],
+                    dtype=np.float64,
+                )
+            except (TypeError, ValueError):
+                pass
+        array = np.empty(len(column), dtype=object)
+        array[:] = column
+        return array
+
+
+class _JSONDocumentStream:
+    """Incrementally decode a stream of concatenated JSON documents.
+
+    The stream is read and decoded a block at a time, so memory use is bounded
+    by the largest single value read with :meth:`value`, not by the size of
+    the stream. :meth:`members` and :meth:`elements` step through an object or
+    an array without decoding it as a whole.
+    """
+
+    _BLOCK_SIZE = 64 * 1024
+    _WHITESPACE = " \t\n\r"
+
+    def __init__(self, stream):
+        self._read = getattr(stream, "read1", stream.read)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Read another block from the stream; return ``False`` at its end."""
+        if self._eof:
+            return False
+        # Grow the reads with the pending input, so a value spanning many
+        # blocks is not re-decoded from its start once per block.
+        data = self._read(max(self._BLOCK_SIZE, len(self._buffer) - self._pos))
+        if not data:
+            self._eof = True
+        self._buffer = self._buffer[self._pos :] + self._decoder.decode(
+            data, final=self._eof
+        )
+        self._pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character, or ``None`` at the end."""
+        while True:
+            buffer, pos = self._buffer, self._pos
+            while pos < len(buffer) and buffer[pos] in self._WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return None
+
+    def _expect(self, chars):
+        c = self.peek()
+        if c is None or c not in chars:
+            raise ValueError(
+                f"Expected one of {chars!r} in JSON stream, found {c!r} instead."
+            )
+        self._pos += 1
+        return c
+
+    def value(self):
+        """Decode and return the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+                # A number at the very end of the buffer may continue in the
+                # next block, so only trust it once something follows it (or
+                # the stream ends).
+                if (
+                    end < len(self._buffer)
+                    or self._eof
+                    or not isinstance(value, (int, float))
+                    or isinstance(value, bool)
+                ):
+                    self._pos = end
+                    return value
+            except JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+    def members(self):
+        """Step through the next object, yielding its keys.
+
+        After each key, the caller must consume the member's value, with
+        :meth:`value` or :meth:`elements`, before resuming the generator.
+        """
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def elements(self):
+        """Step through the next array, yielding its decoded elements."""
+        self._expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self._expect(",]") == "]":
+                return
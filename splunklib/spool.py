@@ -0,0 +1,302 @@
+# Copyright © 2011-2024 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""The **splunklib.spool** module provides :class:`Spool`, a first-in,
+first-out queue of byte strings kept on disk, so that data waiting to be sent
+to splunkd survives a splunkd restart or a crash of the sender.
+
+Records are appended to segment files, and a separate offset file records how
+far the queue was consumed. A segment is deleted once it is consumed. After a
+crash, a record whose write was cut short is dropped, and a record that was
+read but not popped is read again.
+
+**Example**::
+
+    from splunklib import client, spool
+
+    s = client.connect(...)
+    with s.indexes["main"].batch_writer(spool=spool.Spool("/var/spool/app")) as w:
+        for line in log:
+            w.write(line)
+"""
+
+import json
+import os
+import struct
+import threading
+import zlib
+from collections import deque
+from time import monotonic
+
+__all__ = ["Spool", "SpoolFullError"]
+
+# Each record is its length and the CRC-32 of its data, followed by the data
+_HEADER = struct.Struct("<II")
+
+_SEGMENT_SUFFIX = ".spool"
+_OFFSET_FILE = "offset"
+
+
+class SpoolFullError(Exception):
+    """Raised by :meth:`Spool.put` when the record would take the spool past
+    its maximum size."""
+
+    pass
+
+
+class Spool:
+    """This class is a persistent first-in, first-out queue of byte strings.
+
+    Any number of threads can :meth:`put` records. A single consumer reads the
+    oldest record with :meth:`peek` and removes it with :meth:`pop` once it
+    has been handled, so that a record is only lost if it was popped.
+
+    :param directory: The directory of the spool files, created if needed.
+        A spool opened on a directory again continues where it stopped.
+    :type directory: ``string``
+    :param segment_size: The size after which a new segment file is started,
+        in bytes (the default is 64 MiB).
+    :type segment_size: ``integer``
+    :param max_size: The largest amount of data waiting in the spool, in
+        bytes (the default is 1 GiB).
+    :type max_size: ``integer``
+    :param fsync: Whether every record and offset is forced to disk before
+        :meth:`put` and :meth:`pop` return, which survives a power loss and
+        not only a crash of the process, at the cost of speed (the default
+        is ``False``).
+    :type fsync: ``boolean``
+    """
+
+    def __init__(
+        self,
+        directory,
+        segment_size=64 * 1024 * 1024,
+        max_size=1024 * 1024 * 1024,
+        fsync=False,
+    ):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_size = max_size
+        self.fsync = fsync
+        self._lock = threading.Condition()
+        self._closed = False
+        self._count = 0
+        self._size = 0
+        self._pending = None
+        os.makedirs(directory, exist_ok=True)
+
+        segment, position = self._load_offset()
+        segments = sorted(
+            int(name[: -len(_SEGMENT_SUFFIX)])
+            for name in os.listdir(directory)
+            if name.endswith(_SEGMENT_SUFFIX)
+            and name[: -len(_SEGMENT_SUFFIX)].isdigit()
+        )
+        for consumed in [s for s in segments if s < segment]:
+            os.remove(self._path(consumed))
+        segments = [s for s in segments if s >= segment]
+        if not segments:
+            segments = [segment]
+            open(self._path(segment), "ab").close()
+        if segments[0] != segment:
+            segment, position = segments[0], 0
+        for s in segments:
+            start = position if s == segment else 0
+            end, count = self._scan(s, start)
+            self._count += count
+            self._size += max(end - start, 0)
+        self._segments = deque(segments)
+        self._writer = open(self._path(segments[-1]), "ab")
+        self._reader = open(self._path(segment), "rb")
+        self._reader.seek(min(position, os.path.getsize(self._path(segment))))
+        self._read_segment = segment
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._count
+
+    @property
+    def size(self):
+        """The number of bytes waiting in the spool."""
+        with self._lock:
+            return self._size
+
+    def put(self, data):
+        """Appends a record to the spool.
+
+        :param data: The record.
+        :type data: ``bytes``
+
+        :raises SpoolFullError: When the spool has no room for the record.
+        """
+        length = _HEADER.size + len(data)
+        with self._lock:
+            self._check_open()
+            if self._size + length > self.max_size:
+                raise SpoolFullError(
+                    f"The spool in {self.directory} is full ({self._size} bytes)."
+                )
+            if self._writer.tell() >= self.segment_size:
+                self._writer.close()
+                self._segments.append(self._segments[-1] + 1)
+                self._writer = open(self._path(self._segments[-1]), "ab")
+            self._writer.write(_HEADER.pack(len(data), zlib.crc32(data)) + data)
+            self._writer.flush()
+            if self.fsync:
+                os.fsync(self._writer.fileno())
+            self._count += 1
+            self._size += length
+            self._lock.notify_all()
+
+    def peek(self, timeout=None):
+        """Returns the oldest record without removing it, waiting for one if
+        the spool is empty.
+
+        :param timeout: The longest to wait, in seconds, or ``None`` to wait
+            until a record arrives or the spool is closed (the default).
+        :type timeout: ``float``
+
+        :return: The record, or ``None`` if there is none or the spool is
+            closed.
+        :rtype: ``bytes``
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        with self._lock:
+            while self._count == 0 and not self._closed:
+                remaining = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._lock.wait(remaining)
+            if self._count == 0 or self._closed:
+                return None
+            if self._pending is None:
+                self._pending = self._read()
+            return self._pending[0]
+
+    def pop(self):
+        """Removes the oldest record, which :meth:`peek` returned, for good.
+
+        :return: The record, or ``None`` if the spool is empty or closed.
+        :rtype: ``bytes``
+        """
+        with self._lock:
+            if self._count == 0 or self._closed:
+                return None
+            if self._pending is None:
+                self._pending = self._read()
+            data, segment, position = self._pending
+            self._pending = None
+            self._count -= 1
+            self._size -= _HEADER.size + len(data)
+            self._save_offset(segment, position)
+            self._lock.notify_all()
+            return data
+
+    def wait_empty(self, timeout=None):
+        """Waits until every record was popped.
+
+        :param timeout: The longest to wait, in seconds, or ``None`` to wait
+            as long as it takes (the default).
+        :type timeout: ``float``
+
+        :return: Whether the spool is empty.
+        :rtype: ``boolean``
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        with self._lock:
+            while self._count and not self._closed:
+                remaining = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._lock.wait(remaining)
+            return self._count == 0
+
+    def close(self):
+        """Closes the spool files. The records that were not popped are kept
+        for the next :class:`Spool` opened on the directory."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._writer.close()
+            self._reader.close()
+            self._lock.notify_all()
+
+    def _check_open(self):
+        if self._closed:
+            raise ValueError("The spool is closed.")
+
+    def _path(self, segment):
+        return os.path.join(self.directory, f"{segment:020d}{_SEGMENT_SUFFIX}")
+
+    def _load_offset(self):
+        try:
+            with open(os.path.join(self.directory, _OFFSET_FILE)) as f:
+                offset = json.load(f)
+            return offset["segment"], offset["position"]
+        except FileNotFoundError:
+            return 0, 0
+
+    def _save_offset(self, segment, position):
+        path = os.path.join(self.directory, _OFFSET_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"segment": segment, "position": position}, f)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def _scan(self, segment, start):
+        """Returns the end of the last whole record of *segment* after
+        *start*, and the number of records up to there, and cuts off what
+        follows."""
+        path = self._path(segment)
+        end = start
+        count = 0
+        with open(path, "rb") as f:
+            f.seek(start)
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                length, crc = _HEADER.unpack(header)
+                data = f.read(length)
+                if len(data) < length or zlib.crc32(data) != crc:
+                    break
+                end += _HEADER.size + length
+                count += 1
+        if os.path.getsize(path) > end:
+            os.truncate(path, end)
+        return end, count
+
+    # Called with the lock held, when a record is known to be there
+    def _read(self):
+        while True:
+            header = self._reader.read(_HEADER.size)
+            if header:
+                length, _ = _HEADER.unpack(header)
+                data = self._reader.read(length)
+                return data, self._read_segment, self._reader.tell()
+            # The end of a segment that the writer has moved on from
+            self._reader.close()
+            consumed = self._segments.popleft()
+            os.remove(self._path(consumed))
+            self._read_segment = self._segments[0]
+            self._reader = open(self._path(self._read_segment), "rb")
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+#
+# Copyright © 2011-2024 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import asyncio
+import json
+import unittest
+from http import server as BaseHTTPServer
+from threading import Thread
+
+from splunklib import async_binding, async_client, binding
+
+_LOGIN = b"<response><sessionKey>abc</sessionKey></response>"
+_INFO = b"""<feed xmlns="http://www.w3.org/2005/Atom"
+    xmlns:s="http://dev.splunk.com/ns/rest"><entry><title>server-info</title>
+<content type="text/xml"><s:dict><s:key name="version">9.1.0</s:key>
+</s:dict></content></entry></feed>"""
+_SID = b"<response><sid>1234.5</sid></response>"
+
+
+class _SplunkdHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status=200, body=b"ok", chunked=False):
+        self.send_response(status)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(body), 7):
+                piece = body[i : i + 7]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        received = self.rfile.read(length) if length else b""
+        self.server.requests.append(
+            (self.command, self.path, received, self.headers.get("Authorization"))
+        )
+        path = self.path.split("?")[0].rstrip("/")
+        if path == "/services/auth/login":
+            self._reply(body=_LOGIN)
+        elif self.headers.get("Authorization") != "Splunk abc":
+            self._reply(401, b"<response/>")
+        elif path == "/services/server/info":
+            self._reply(body=_INFO)
+        elif path.endswith("/search/v2/jobs"):
+            self._reply(201, _SID)
+        elif path.endswith("/search/v2/jobs/export"):
+            self._reply(body=b'{"result": 1}\n{"result": 2}\n', chunked=True)
+        elif "/storage/collections/data/" in path:
+            self._reply(body=json.dumps({"path": path}).encode("utf-8"))
+        else:
+            self._reply(404, b"<response>missing</response>")
+
+    do_GET = do_POST = do_DELETE = _dispatch
+
+    def log_message(self, *args):
+        pass
+
+
+class _SplunkdServer(BaseHTTPServer.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("localhost", 0), _SplunkdHandler)
+        self.requests = []
+        self.connections = 0
+
+    def get_request(self):
+        self.connections += 1
+        return super().get_request()
+
+
+class AsyncServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = _SplunkdServer()
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.kwargs = {
+            "scheme": "http",
+            "host": "localhost",
+            "port": self.server.server_address[1],
+        }
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def run_async(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def test_autologin_and_connection_reuse(self):
+        async def scenario():
+            service = async_client.AsyncService(
+                username="admin", password="changeme", autologin=True, **self.kwargs
+            )
+            version = await service.splunk_version()
+            info = await service.info()
+            service.close()
+            return version, info
+
+        version, info = self.run_async(scenario())
+        self.assertEqual(version, (9, 1, 0))
+        self.assertEqual(info["version"], "9.1.0")
+        self.assertEqual(self.server.requests[0][1], "/services/auth/login")
+        self.assertEqual(self.server.connections, 1)
+
+    def test_unauthenticated_request_raises(self):
+        async def scenario():
+            context = async_binding.AsyncContext(**self.kwargs)
+            await context.get("/services/server/info")
+
+        with self.assertRaises(binding.AuthenticationError):
+            self.run_async(scenario())
+
+    def test_only_async_http_is_built(self):
+        async def handler(url, message, **kwargs):
+            return {"status": 200, "reason": "OK", "headers": [], "body": None}
+
+        context = async_binding.AsyncContext(handler=handler, **self.kwargs)
+        self.assertIsInstance(context.http, async_binding.AsyncHttpLib)
+        self.assertIs(context.http.handler, handler)
+        self.assertIsNone(getattr(context.http.handler, "pool", None))
+
+    def test_http_error_carries_body(self):
+        async def scenario():
+            context = await async_binding.connect(
+                username="admin", password="changeme", **self.kwargs
+            )
+            await context.get("nowhere")
+
+        with self.assertRaises(binding.HTTPError) as raised:
+            self.run_async(scenario())
+        self.assertEqual(raised.exception.status, 404)
+        self.assertEqual(raised.exception.body, b"<response>missing</response>")
+
+    def test_jobs_create_and_export(self):
+        async def scenario():
+            service = await async_client.connect(
+                username="admin", password="changeme", **self.kwargs
+            )
+            job = await service.jobs.create("search index=_internal")
+            stream = await service.jobs.export("search *", output_mode="json")
+            lines = [line async for line in stream]
+            service.close()
+            return job, lines
+
+        job, lines = self.run_async(scenario())
+        self.assertEqual(job.sid, "1234.5")
+        self.assertEqual(job.path, "search/v2/jobs/1234.5/")
+        self.assertEqual(lines, [b'{"result": 1}\n', b'{"result": 2}\n'])
+        self.assertIn(b"search=search+index%3D_internal", self.server.requests[2][2])
+
+    def test_kvstore_data_concurrent(self):
+        async def scenario():
+            service = await async_client.connect(
+                username="admin", password="changeme", app="search", **self.kwargs
+            )
+            data = service.kvstore_data("people")
+            return await asyncio.gather(
+                *(data.query_by_id(f"id/{i}") for i in range(5))
+            )
+
+        documents = self.run_async(scenario())
+        self.assertEqual(
+            documents[3]["path"],
+            "/servicesNS/nobody/search/storage/collections/data/people/id%2F3",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
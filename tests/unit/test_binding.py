@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+#
+# Copyright © 2011-2024 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import gzip
+import os
+import tempfile
+import unittest
+import zlib
+from http import server as BaseHTTPServer
+from io import BytesIO
+from threading import Condition, Thread
+
+from splunklib import binding
+
+
+class _KeepAliveHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().split(b";")[0], 16)
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+            if size == 0:
+                return b"".join(chunks)
+
+    def _reply(self, status=200, body=b"ok"):
+        length = int(self.headers.get("Content-Length") or 0)
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            received = self._read_chunked()
+        else:
+            received = self.rfile.read(length) if length else b""
+        self.server.requests.append((self.command, self.path, received))
+        self.server.headers.append(self.headers)
+        encoding = None
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            encoding, body = "gzip", gzip.compress(body)
+        self.send_response(status)
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/empty":
+            self._reply(204, b"")
+        elif self.path == "/large":
+            self._reply(body=os.urandom(100000).hex().encode("ascii"))
+        elif self.path == "/hangup":
+            self._hang_up()
+        elif self.path == "/drop":
+            # Hang up after replying without announcing it, the way splunkd
+            # drops idle keep-alive connections.
+            self._reply(body=b"dropped")
+            self.close_connection = True
+        else:
+            self._reply(body=b"x" * 1000)
+
+    def _hang_up(self):
+        # Read the request and hang up without replying
+        length = int(self.headers.get("Content-Length") or 0)
+        received = self.rfile.read(length) if length else b""
+        self.server.requests.append((self.command, self.path, received))
+        self.close_connection = True
+
+    def do_POST(self):
+        if self.path == "/hangup":
+            self._hang_up()
+        else:
+            self._reply(body=b"posted")
+
+    def do_DELETE(self):
+        self._reply(body=b"deleted")
+
+    def log_message(self, *args):
+        pass
+
+
+class _KeepAliveServer(BaseHTTPServer.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("localhost", 0), _KeepAliveHandler)
+        self.requests = []
+        self.headers = []
+        self.connections = 0
+        self.hung_up = 0
+        self.closed = Condition()
+
+    def get_request(self):
+        self.connections += 1
+        return super().get_request()
+
+    def shutdown_request(self, request):
+        super().shutdown_request(request)
+        with self.closed:
+            self.hung_up += 1
+            self.closed.notify_all()
+
+    def wait_hung_up(self, count):
+        with self.closed:
+            self.closed.wait_for(lambda: self.hung_up >= count, timeout=5)
+
+
+class HandlerPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = _KeepAliveServer()
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://localhost:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reuses_connection_across_methods(self):
+        http = binding.HttpLib()
+        self.assertEqual(http.get(self.url + "/a").body.read(), b"x" * 1000)
+        self.assertEqual(http.post(self.url + "/b", foo="bar").body.read(), b"posted")
+        self.assertEqual(http.delete(self.url + "/c").body.read(), b"deleted")
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(len(http.handler.pool), 1)
+        self.assertEqual(self.server.requests[1], ("POST", "/b", b"foo=bar"))
+
+    def test_unread_response_is_not_reused(self):
+        http = binding.HttpLib()
+        response = http.get(self.url + "/a")
+        response.body.read(10)
+        response.body.close()
+        http.get(self.url + "/a").body.read()
+        self.assertEqual(self.server.connections, 2)
+
+    def test_empty_response_released_immediately(self):
+        http = binding.HttpLib()
+        self.assertEqual(http.get(self.url + "/empty").status, 204)
+        self.assertEqual(len(http.handler.pool), 1)
+        http.get(self.url + "/empty")
+        self.assertEqual(self.server.connections, 1)
+
+    def test_stale_connection_is_retried(self):
+        http = binding.HttpLib()
+        self.assertEqual(http.get(self.url + "/drop").body.read(), b"dropped")
+        self.assertEqual(len(http.handler.pool), 1)
+        self.assertEqual(http.get(self.url + "/a").body.read(), b"x" * 1000)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_lost_response_only_retried_when_idempotent(self):
+        http = binding.HttpLib()
+        http.get(self.url + "/a").body.read()
+        self.assertRaises(ConnectionError, http.post, self.url + "/hangup", foo="bar")
+        self.assertEqual(len(self.server.requests), 2)
+        http.get(self.url + "/a").body.read()
+        self.assertRaises(ConnectionError, http.get, self.url + "/hangup")
+        # Sent on the reused connection, then once more on a fresh one
+        self.assertEqual(
+            [request[:2] for request in self.server.requests[3:]],
+            [("GET", "/hangup"), ("GET", "/hangup")],
+        )
+
+    def test_pooling_disabled(self):
+        http = binding.HttpLib(pool_maxsize=0)
+        self.assertIsNone(http.handler.pool)
+        http.get(self.url + "/a").body.read()
+        http.get(self.url + "/a").body.read()
+        self.assertEqual(self.server.connections, 2)
+
+
+class CompressionTestCase(unittest.TestCase):
+    setUp = HandlerPoolTestCase.setUp
+    tearDown = HandlerPoolTestCase.tearDown
+
+    def test_request_body_compressed_above_threshold(self):
+        http = binding.HttpLib(compression="gzip", compression_threshold=100)
+        http.post(self.url + "/small", body=b"a" * 99).body.read()
+        http.post(self.url + "/large", body="é" * 100).body.read()
+        small, large = self.server.requests
+        self.assertEqual(small[2], b"a" * 99)
+        self.assertIsNone(self.server.headers[0]["Content-Encoding"])
+        self.assertEqual(gzip.decompress(large[2]), "é".encode("utf-8") * 100)
+        self.assertEqual(self.server.headers[1]["Content-Encoding"], "gzip")
+
+    def test_deflate(self):
+        http = binding.HttpLib(compression="deflate", compression_threshold=0)
+        http.post(self.url + "/b", foo="bar").body.read()
+        self.assertEqual(zlib.decompress(self.server.requests[0][2]), b"foo=bar")
+        self.assertRaises(ValueError, binding.HttpLib, compression="br")
+
+    def test_response_decompressed_while_read(self):
+        http = binding.HttpLib(accept_compressed=True)
+        response = http.get(self.url + "/large")
+        self.assertIn(("Content-Encoding", "gzip"), response.headers)
+        chunks = list(iter(lambda: response.body.read(1000), b""))
+        self.assertEqual(len(b"".join(chunks)), 200000)
+        self.assertTrue(all(len(chunk) == 1000 for chunk in chunks))
+        self.assertEqual(len(http.handler.pool), 1)
+        self.assertEqual(http.get(self.url + "/a").body.read(), b"x" * 1000)
+        self.assertEqual(self.server.connections, 1)
+
+
+class ResponseReaderTestCase(unittest.TestCase):
+    def test_decompresses_while_read(self):
+        data = b"".join(b"line %d\n" % i for i in range(10000))
+        reader = binding.ResponseReader(
+            BytesIO(zlib.compress(data)), encoding="deflate"
+        )
+        reader._BLOCK_SIZE = 7
+        self.assertEqual(reader.read(10), data[:10])
+        self.assertEqual(reader.peek(5), data[10:15])
+        self.assertEqual(reader.read(), data[10:])
+
+
+class StreamedBodyTestCase(unittest.TestCase):
+    setUp = HandlerPoolTestCase.setUp
+    tearDown = HandlerPoolTestCase.tearDown
+
+    def test_iterable_is_chunked(self):
+        http = binding.HttpLib()
+        chunks = (b"event %d\n" % i for i in range(1000))
+        http.post(self.url + "/b", body=chunks).body.read()
+        http.post(self.url + "/b", body=iter(["a", "", "é"])).body.read()
+        self.assertEqual(
+            self.server.requests[0][2], b"".join(b"event %d\n" % i for i in range(1000))
+        )
+        self.assertEqual(self.server.headers[0]["Transfer-Encoding"], "chunked")
+        self.assertIsNone(self.server.headers[0]["Content-Length"])
+        self.assertEqual(self.server.requests[1][2], "aé".encode("utf-8"))
+        self.assertEqual(self.server.connections, 1)
+
+    def test_memoryview_and_stream(self):
+        http = binding.HttpLib()
+        data = bytearray(b"0123456789" * 100)
+        http.post(self.url + "/b", body=memoryview(data)[10:]).body.read()
+        http.post(self.url + "/b", body=BytesIO(bytes(data))).body.read()
+        self.assertEqual(self.server.requests[0][2], bytes(data[10:]))
+        self.assertEqual(self.server.headers[0]["Content-Length"], "990")
+        self.assertEqual(self.server.requests[1][2], bytes(data))
+        self.assertEqual(self.server.headers[1]["Transfer-Encoding"], "chunked")
+
+    def test_text_file_is_encoded_as_utf8(self):
+        http = binding.HttpLib()
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as f:
+            f.write("header\n" + "☃" * 10000)
+            f.seek(7)
+            http.post(self.url + "/b", body=f).body.read()
+        self.assertEqual(self.server.requests[-1][2], "☃".encode("utf-8") * 10000)
+        self.assertEqual(self.server.headers[-1]["Transfer-Encoding"], "chunked")
+
+    def test_regular_file_is_sent_whole(self):
+        http = binding.HttpLib()
+        self.assertEqual(http.get(self.url + "/drop").body.read(), b"dropped")
+        self.server.wait_hung_up(1)
+        with tempfile.TemporaryFile() as f:
+            f.write(b"header\n" + b"x" * 100000)
+            f.seek(7)
+            http.post(self.url + "/b", body=f).body.read()
+        self.assertEqual(self.server.requests[-1][2], b"x" * 100000)
+        self.assertEqual(self.server.headers[-1]["Content-Length"], "100000")
+        self.assertEqual(self.server.connections, 2)
+
+
+class AutologinReplayTestCase(unittest.TestCase):
+    def setUp(self):
+        self.received = []
+        self.context = binding.Context(
+            handler=self.handler,
+            username="admin",
+            password="changeme",
+            token="Splunk expired",
+            autologin=True,
+        )
+
+    def handler(self, url, message, **kwargs):
+        if url.endswith("/services/auth/login"):
+            body = b"<response><sessionKey>fresh</sessionKey></response>"
+            return self.response(200, body)
+        body = message["body"]
+        self.received.append(body.read() if hasattr(body, "read") else body)
+        if ("Authorization", "Splunk fresh") not in message["headers"]:
+            return self.response(401, b"<response/>")
+        return self.response(200, b"ok")
+
+    @staticmethod
+    def response(status, body):
+        return {"status": status, "reason": "", "headers": [], "body": BytesIO(body)}
+
+    def test_seekable_body_is_rewound(self):
+        body = BytesIO(b"header\nevents")
+        body.seek(7)
+        self.context.post("receivers/simple", body=body)
+        self.assertEqual(self.received, [b"events", b"events"])
+
+    def test_consumed_stream_is_not_sent_again(self):
+        chunks = iter([b"one\n", b"two\n"])
+        with self.assertRaises(binding.AuthenticationError):
+            self.context.post("receivers/simple", body=chunks)
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(self.context.token, "Splunk fresh")
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    class _Connection:
+        def __init__(self):
+            self.closed = False
+            self.sock = None
+
+        def close(self):
+            self.closed = True
+
+    def test_bounded_and_idle_eviction(self):
+        pool = binding._ConnectionPool(
+            lambda *args: self._Connection(), maxsize=2, idle_timeout=60
+        )
+        connections = [pool.acquire("https", "h", 8089)[0] for _ in range(3)]
+        for connection in connections:
+            pool.release("https", "h", 8089, connection)
+        self.assertEqual(len(pool), 2)
+        self.assertTrue(connections[2].closed)
+
+        connection, reused = pool.acquire("https", "h", 8089)
+        self.assertTrue(reused)
+        self.assertIs(connection, connections[1])
+
+        pool.idle_timeout = -1
+        connection, reused = pool.acquire("https", "h", 8089)
+        self.assertFalse(reused)
+        self.assertTrue(connections[0].closed)
+        self.assertEqual(len(pool), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
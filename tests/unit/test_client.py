@@ -0,0 +1,1280 @@
+#!/usr/bin/env python
+#
+# Copyright © 2011-2024 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import os
+import shutil
+import socketserver
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from http import server as BaseHTTPServer
+from threading import Thread
+from urllib.parse import parse_qs, quote, urlsplit
+
+from splunklib import client, data, results, spool
+
+
+_ACL = (
+    '<s:dict><s:key name="owner">nobody</s:key><s:key name="app">search</s:key>'
+    '<s:key name="sharing">app</s:key></s:dict>'
+)
+
+
+def _atom_entry(title, content, tag="entry", path=None):
+    content = dict(content, **{"eai:acl": _ACL})
+    keys = "".join(f'<s:key name="{k}">{v}</s:key>' for k, v in content.items())
+    link = f'<link href="{path}" rel="alternate"/>' if path else ""
+    return (
+        f'<{tag} xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:s="http://dev.splunk.com/ns/rest">'
+        f"<title>{title}</title>{link}"
+        f'<content type="text/xml"><s:dict>{keys}</s:dict></content>'
+        f"</{tag}>"
+    )
+
+
+class _SplunkdHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serves the routes of its server: ``(method, path)`` to a function
+    taking the query and returning ``(status, body)``, or
+    ``(status, body, headers)``. A JSON request body is decoded into the
+    ``"json"`` key of the query."""
+
+    protocol_version = "HTTP/1.1"
+    # The headers and the body are written separately; without this, a
+    # kept-alive connection waits for a delayed ACK on every response.
+    disable_nagle_algorithm = True
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        received = self.rfile.read(length) if length else b""
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if self.headers.get("Content-Type") != "application/json":
+            query.update(parse_qs(received.decode("utf-8")))
+        query = {k: v[0] for k, v in query.items()}
+        if self.headers.get("Content-Type") == "application/json":
+            query["json"] = json.loads(received)
+        with self.server.lock:
+            self.server.requests.append((self.command, url.path, query))
+            self.server.bodies.append(received)
+            self.server.headers_seen.append(self.headers.get("If-None-Match"))
+        route = self.server.routes.get((self.command, url.path.rstrip("/")))
+        status, body, *headers = route(query) if route else (404, "<response/>")
+        body = body.encode("utf-8")
+        self.send_response(status)
+        for name, value in headers[0] if headers else []:
+            self.send_header(name, value)
+        if body.startswith(b"{"):
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+        else:
+            self.send_header("Content-Type", "text/xml; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_DELETE = _dispatch
+
+    def log_message(self, *args):
+        pass
+
+
+class _SplunkdServer(BaseHTTPServer.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("localhost", 0), _SplunkdHandler)
+        self.routes = {}
+        self.requests = []
+        self.headers_seen = []
+        self.bodies = []
+        self.lock = threading.Lock()
+        self.connections = 0
+
+    def get_request(self):
+        self.connections += 1
+        return super().get_request()
+
+
+class ServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = _SplunkdServer()
+        self.thread = Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+        self.thread.start()
+        self.service = client.Service(
+            scheme="http",
+            host="localhost",
+            port=self.server.server_address[1],
+            token="Splunk abc",
+        )
+        self.service._splunk_version = (9, 1, 0)
+        self.service._instance_type = ""
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def requests_to(self, path):
+        return [q for _, p, q in self.server.requests if p.rstrip("/") == path]
+
+
+class BoundedMapTestCase(unittest.TestCase):
+    def test_ordered(self):
+        def slow_square(n):
+            time.sleep(0.01 * (5 - n))
+            return n * n
+
+        self.assertEqual(
+            list(client._bounded_map(slow_square, range(5), 3)), [0, 1, 4, 9, 16]
+        )
+
+    def test_unordered_and_bounded(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def track(n):
+            with lock:
+                running.append(n)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(n)
+            return n
+
+        output = list(client._bounded_map(track, range(20), 4, ordered=False))
+        self.assertEqual(sorted(output), list(range(20)))
+        self.assertLessEqual(max(peak), 4)
+
+    def test_serial(self):
+        self.assertEqual(list(client._bounded_map(str, [1, 2], 1)), ["1", "2"])
+
+    def test_error_is_raised(self):
+        def fail(n):
+            if n == 2:
+                raise ValueError(n)
+            return n
+
+        with self.assertRaises(ValueError):
+            list(client._bounded_map(fail, range(10), 3))
+
+
+_RESULTS = "/servicesNS/nobody/search/search/v2/jobs/1234.5/results"
+
+
+class JobIterResultsTestCase(ServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.total = 23
+        self.done = "1"
+        self.server.routes[("GET", "/services/search/v2/jobs/1234.5")] = lambda query: (
+            200,
+            _atom_entry(
+                "search *",
+                {
+                    "sid": "1234.5",
+                    "dispatchState": "DONE",
+                    "isDone": self.done,
+                    "resultCount": self.total,
+                },
+            ),
+        )
+        self.server.routes[("POST", _RESULTS)] = self.results_page
+
+    def results_page(self, query):
+        offset, count = int(query["offset"]), int(query["count"])
+        # Make later pages arrive first.
+        time.sleep(0.002 * (self.total - offset) / count)
+        rows = [{"n": str(i)} for i in range(offset, min(offset + count, self.total))]
+        return 200, json.dumps({"preview": False, "results": rows})
+
+    def test_ordered_pages(self):
+        job = client.Job(self.service, "1234.5")
+        rows = list(job.iter_results(parallelism=3, page_size=5))
+        self.assertEqual([row["n"] for row in rows], [str(i) for i in range(23)])
+        pages = self.requests_to(_RESULTS)
+        self.assertEqual(sorted(int(q["offset"]) for q in pages), [0, 5, 10, 15, 20])
+        self.assertTrue(all(q["output_mode"] == "json" for q in pages))
+
+    def test_unordered_pages(self):
+        job = client.Job(self.service, "1234.5")
+        rows = list(job.iter_results(parallelism=5, page_size=5, ordered=False))
+        self.assertEqual(sorted(int(row["n"]) for row in rows), list(range(23)))
+
+    def test_unfinished_job(self):
+        self.done = "0"
+        job = client.Job(self.service, "1234.5")
+        with self.assertRaises(client.IllegalOperationException):
+            job.iter_results()
+
+    def test_messages_are_passed_through(self):
+        self.total = 1
+        self.server.routes[("POST", _RESULTS)] = lambda query: (
+            200,
+            json.dumps(
+                {
+                    "messages": [{"type": "WARN", "text": "careful"}],
+                    "results": [{"n": "0"}],
+                }
+            ),
+        )
+        job = client.Job(self.service, "1234.5")
+        self.assertEqual(
+            list(job.iter_results()), [results.Message("WARN", "careful"), {"n": "0"}]
+        )
+
+
+class JobWaitTestCase(ServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.polls = 0
+        self.done_after = 3
+        self.server.routes[("GET", "/services/search/v2/jobs/1234.5")] = self.job
+
+    def job(self, query):
+        if query.get("output_mode") != "json":
+            return 200, _atom_entry("search *", {"sid": "1234.5", "isDone": "1"})
+        self.polls += 1
+        done = self.polls >= self.done_after
+        content = {"isDone": done, "doneProgress": min(1.0, self.polls / 3)}
+        return 200, json.dumps({"entry": [{"name": "1234.5", "content": content}]})
+
+    def test_status_is_lightweight(self):
+        job = client.Job(self.service, "1234.5")
+        self.assertEqual(job.status(), {"isDone": False, "doneProgress": 1 / 3})
+        (query,) = self.requests_to("/services/search/v2/jobs/1234.5")
+        self.assertEqual(query["output_mode"], "json")
+        self.assertIn("f", query)
+
+    def test_wait_polls_until_done(self):
+        seen = []
+        job = client.Job(self.service, "1234.5")
+        job.wait(poll_interval=0.01, callback=lambda j, s: seen.append(s["isDone"]))
+        self.assertEqual(seen, [False, False, True])
+        self.assertEqual(job["isDone"], "1")
+
+    def test_wait_backs_off(self):
+        self.done_after = 1000
+        job = client.Job(self.service, "1234.5")
+        with self.assertRaises(client.OperationError):
+            job.wait(timeout=0.5, poll_interval=0.05, backoff=2)
+        # 0.05 + 0.1 + 0.2 + (0.15 of 0.4) seconds
+        self.assertLessEqual(self.polls, 5)
+
+
+class JobPoolTestCase(ServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.jobs = {}
+        self.searches = {}
+        self.refusals = 0
+        self.server.routes[("POST", "/services/search/v2/jobs")] = self.create
+        self.server.routes[("GET", "/services/search/v2/jobs")] = self.listing
+
+    def create(self, query):
+        if self.refusals:
+            self.refusals -= 1
+            return 503, "<response><messages><msg>quota</msg></messages></response>"
+        sid = str(len(self.jobs))
+        # Each job is done after two polls.
+        self.jobs[sid] = 2
+        self.searches[sid] = query["search"]
+        return 201, f"<response><sid>{sid}</sid></response>"
+
+    def listing(self, query):
+        entries = []
+        for sid in self.jobs:
+            self.jobs[sid] -= 1
+            content = {"sid": sid, "isDone": self.jobs[sid] <= 0}
+            entries.append({"name": self.searches[sid], "content": content})
+        return 200, json.dumps({"entry": entries})
+
+    def running(self):
+        return sum(1 for polls in self.jobs.values() if polls > 0)
+
+    def test_limits_running_jobs_and_polls_once(self):
+        pool = client.JobPool(self.service, max_running=3, poll_interval=0.01)
+        keys = [pool.submit(f"search {i}") for i in range(7)]
+        self.assertEqual(len(pool), 7)
+        peak = []
+        completed = []
+        for key, job in pool.as_completed():
+            peak.append(self.running())
+            completed.append(key)
+        self.assertEqual(sorted(completed), sorted(keys))
+        self.assertLessEqual(max(peak), 3)
+        polls = self.requests_to("/services/search/v2/jobs")
+        listings = [q for q in polls if q.get("output_mode") == "json"]
+        self.assertEqual(len(listings), 6)
+        self.assertEqual(len(pool), 0)
+
+    def test_quota_refusal_is_retried(self):
+        self.refusals = 2
+        pool = client.JobPool(self.service, max_running=5, poll_interval=0.01)
+        pool.submit("search a", key="a")
+        pool.submit("search b", key="b")
+        self.assertEqual(sorted(key for key, _ in pool.as_completed()), ["a", "b"])
+
+    def test_timeout(self):
+        pool = client.JobPool(self.service, max_running=1, poll_interval=0.01)
+        pool.submit("search a")
+        pool.submit("search b")
+        with self.assertRaises(client.OperationError):
+            list(pool.as_completed(timeout=0.015))
+
+
+_EMPTY_FEED = (
+    '<feed xmlns="http://www.w3.org/2005/Atom" '
+    'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+    "<title>savedsearch</title><opensearch:totalResults>0</opensearch:totalResults>"
+    "</feed>"
+)
+
+
+class AtomListingTestCase(ServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sids = [str(i) for i in range(5)]
+        self.server.routes[("GET", "/services/search/v2/jobs")] = self.listing
+
+    def listing(self, query):
+        offset = int(query.get("offset", 0))
+        count = int(query.get("count", 0)) or len(self.sids)
+        entries = "".join(
+            _atom_entry(sid, {"sid": sid, "isDone": "1"})
+            for sid in self.sids[offset : offset + count]
+        )
+        return 200, (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom" '
+            'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+            "<title>jobs</title>"
+            f"<opensearch:totalResults>{len(self.sids)}</opensearch:totalResults>"
+            f"{entries}</feed>"
+        )
+
+    def test_list(self):
+        jobs = self.service.jobs.list()
+        self.assertEqual([job.sid for job in jobs], self.sids)
+        self.assertEqual(jobs[2].path, "search/v2/jobs/2")
+
+    def test_iter_pages(self):
+        jobs = self.service.jobs.iter(pagesize=2)
+        self.assertEqual([job.sid for job in jobs], self.sids)
+        offsets = [q["offset"] for q in self.requests_to("/services/search/v2/jobs")]
+        self.assertEqual(offsets, ["0", "2", "4"])
+
+    def test_iter_prefetch(self):
+        self.sids = [str(i) for i in range(11)]
+        jobs = self.service.jobs.iter(pagesize=3, prefetch=2)
+        self.assertEqual([job.sid for job in jobs], self.sids)
+        pages = [
+            (q["offset"], q["count"])
+            for q in self.requests_to("/services/search/v2/jobs")
+        ]
+        self.assertEqual(
+            sorted(pages, key=lambda page: int(page[0])),
+            [("0", "3"), ("3", "3"), ("6", "3"), ("9", "2")],
+        )
+
+    def test_iter_prefetch_with_count(self):
+        self.sids = [str(i) for i in range(11)]
+        jobs = self.service.jobs.iter(offset=1, count=4, pagesize=3, prefetch=2)
+        self.assertEqual([job.sid for job in jobs], ["1", "2", "3", "4"])
+
+    def test_stop_early(self):
+        for job in self.service.jobs.iter():
+            break
+        self.assertEqual(job.sid, "0")
+        self.assertEqual(len(self.service.jobs.list()), 5)
+
+    def test_empty_feed(self):
+        self.sids = []
+        self.assertEqual(self.service.jobs.list(), [])
+        self.server.routes[("GET", "/services/search/v2/jobs")] = lambda q: (
+            200,
+            _EMPTY_FEED,
+        )
+        self.assertEqual(self.service.jobs.list(), [])
+
+
+class LazyListingTestCase(ServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server.routes[("GET", "/services/saved/searches")] = self.listing
+
+    def listing(self, query):
+        entries = "".join(
+            _atom_entry(
+                f"search{i}",
+                {"search": f"index=main {i}", "type": "scheduled"}
+                if query.get("f") in (None, "search", "type")
+                else {},
+                path=f"/servicesNS/nobody/search/saved/searches/search{i}",
+            )
+            for i in range(3)
+        )
+        return 200, f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+
+    def test_entities_parse_their_entry_on_first_use(self):
+        with mock.patch.object(
+            client, "_parse_atom_entry", wraps=client._parse_atom_entry
+        ) as parse:
+            saved_searches = self.service.saved_searches.list()
+            self.assertEqual(
+                [s.name for s in saved_searches], ["search0", "search1", "search2"]
+            )
+            self.assertEqual(saved_searches[1].path, "saved/searches/search1")
+            self.assertEqual(parse.call_count, 0)
+            self.assertEqual(saved_searches[1]["search"], "index=main 1")
+            self.assertEqual(saved_searches[1]["type"], "scheduled")
+            self.assertEqual(saved_searches[1].access.app, "search")
+            self.assertEqual(parse.call_count, 1)
+
+    def test_names(self):
+        names = self.service.saved_searches.names()
+        self.assertEqual(names, ["search0", "search1", "search2"])
+        (query,) = self.requests_to("/services/saved/searches")
+        self.assertEqual(query["f"], "title")
+
+    def test_iter_fields(self):
+        fields = list(self.service.saved_searches.iter_fields("search", "type", "x"))
+        self.assertEqual(
+            fields[2],
+            {
+                "name": "search2",
+                "search": "index=main 2",
+                "type": "scheduled",
+                "x": None,
+            },
+        )
+        (query,) = self.requests_to("/services/saved/searches")
+        self.assertEqual(query["f"], "search")
+
+    def test_job_names_are_sids(self):
+        entries = _atom_entry("search *", {"sid": "1234.5"})
+        self.server.routes[("GET", "/services/search/v2/jobs")] = lambda q: (
+            200,
+            f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>',
+        )
+        self.assertEqual(self.service.jobs.names(), ["1234.5"])
+        (query,) = self.requests_to("/services/search/v2/jobs")
+        self.assertEqual(query["f"], "sid")
+
+
+def _atom_feed(*entries):
+    return f'<feed xmlns="http://www.w3.org/2005/Atom">{"".join(entries)}</feed>'
+
+
+class InputsTestCase(ServiceTestCase):
+    kinds = {
+        "": ["monitor", "tcp", "all", "script"],
+        "tcp": ["raw", "cooked", "ssl"],
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.running = 0
+        self.peak = 0
+        for group, titles in self.kinds.items():
+            path = "/services/data/inputs/" + group
+            self.server.routes[("GET", path.rstrip("/"))] = lambda q, titles=titles: (
+                200,
+                _atom_feed(*map(self.kind, titles)),
+            )
+        for kind in ("monitor", "tcp/raw", "tcp/cooked"):
+            self.server.routes[("GET", "/services/data/inputs/" + kind)] = (
+                lambda q, kind=kind: self.listing(kind)
+            )
+
+    def kind(self, title):
+        rel = "list" if title == "tcp" else "create"
+        return (
+            '<entry xmlns="http://www.w3.org/2005/Atom">'
+            f'<title>{title}</title><link href="/x" rel="{rel}"/></entry>'
+        )
+
+    def listing(self, kind):
+        with self.server.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.05)
+        with self.server.lock:
+            self.running -= 1
+        entry = _atom_entry(
+            f"{kind}-input", {}, path=f"/servicesNS/nobody/search/data/inputs/{kind}/1"
+        )
+        return 200, _atom_feed(entry)
+
+    def test_kinds_are_discovered_once(self):
+        expected = ["monitor", "tcp/raw", "tcp/cooked", "script"]
+        self.assertEqual(self.service.inputs.kinds, expected)
+        self.assertEqual(self.service.inputs.kinds, expected)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.service.inputs.refresh_kinds(), expected)
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_list_fans_out(self):
+        inputs = self.service.inputs.list()
+        self.assertEqual(
+            [(i.kind, i.name) for i in inputs],
+            [
+                ("monitor", "monitor-input"),
+                ("tcp/raw", "tcp/raw-input"),
+                ("tcp/cooked", "tcp/cooked-input"),
+            ],
+        )
+        self.assertEqual(self.peak, 3)
+
+    def test_serial_list(self):
+        service_inputs = self.service.inputs
+        service_inputs.parallelism = 1
+        self.assertEqual(len(service_inputs.list()), 3)
+        self.assertEqual(self.peak, 1)
+
+
+class ResponseCacheTestCase(ServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.service.cache = client.ResponseCache(maxsize=3)
+        self.etag = None
+        for path in (
+            "/services/apps/local/search",
+            "/servicesNS/nobody/search/apps/local/search",
+        ):
+            self.server.routes[("GET", path)] = self.app
+            self.server.routes[("POST", path)] = lambda q: (200, self.app(q)[1])
+        self.server.routes[("GET", "/services/search/v2/jobs/1")] = lambda q: (
+            200,
+            _atom_entry("search *", {"sid": "1", "isDone": "0"}),
+        )
+
+    def app(self, query):
+        entry = _atom_entry(
+            "search",
+            {"visible": "1"},
+            path="/servicesNS/nobody/system/apps/local/search",
+        )
+        entry = f'<feed xmlns="http://www.w3.org/2005/Atom">{entry}</feed>'
+        if self.etag is None:
+            return 200, entry
+        if self.server.headers_seen[-1] == self.etag:
+            return 304, ""
+        return 200, entry, [("ETag", self.etag)]
+
+    def gets(self):
+        return [r for r in self.server.requests if r[0] == "GET"]
+
+    def test_repeated_reads_are_cached(self):
+        self.service.apps["search"].refresh()
+        self.service.apps["search"].refresh()
+        self.assertEqual(len(self.gets()), 2)
+
+    def test_writes_invalidate(self):
+        app = self.service.apps["search"]
+        app.update(visible="0")
+        self.service.apps["search"]
+        self.assertEqual(len(self.gets()), 2)
+
+    def test_ttl_and_lru(self):
+        self.service.cache.ttl = 0.05
+        self.service.apps["search"]
+        time.sleep(0.06)
+        self.service.apps["search"]
+        self.assertEqual(len(self.gets()), 2)
+        for path in ("a", "b", "c"):
+            self.server.routes[("GET", f"/services/{path}")] = lambda q: (200, "<a/>")
+            self.service.get(path)
+        self.assertEqual(len(self.service.cache), 3)
+        self.service.apps["search"]
+        self.assertEqual(len(self.gets()), 6)
+
+    def test_jobs_are_not_cached(self):
+        self.service.job("1")
+        self.service.job("1")
+        self.assertEqual(len(self.gets()), 2)
+        self.assertEqual(self.service.cache.ttl_for("search/v2/jobs/1"), 0)
+
+    def test_conditional_request(self):
+        self.service.cache.ttl = 0.01
+        self.etag = '"v1"'
+        self.service.apps["search"]
+        time.sleep(0.02)
+        app = self.service.apps["search"]
+        self.assertEqual(app["visible"], "1")
+        self.assertEqual(self.server.headers_seen[-2:], [None, '"v1"'])
+
+
+class IndexWriterTestCase(ServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        state = data.record({"title": "main"})
+        self.index = client.Index(self.service, "data/indexes/main", state=state)
+        self.server.routes[("POST", "/services/receivers/simple")] = self.receive
+        self.status = 200
+        self.statuses = []
+
+    def receive(self, query):
+        return (self.statuses.pop(0) if self.statuses else self.status), "<response/>"
+
+    def spool(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        return spool.Spool(directory)
+
+    def sent(self):
+        return [
+            (query, body)
+            for (_, path, query), body in zip(self.server.requests, self.server.bodies)
+            if path == "/services/receivers/simple"
+        ]
+
+    def test_batches_per_group(self):
+        with self.index.batch_writer(
+            batch_size=3, flush_interval=None, sourcetype="log"
+        ) as writer:
+            for i in range(4):
+                writer.write(f"event {i}\n", host="a")
+            writer.write(b"other", host="b")
+            self.assertEqual(len(writer), 2)
+            self.assertEqual(len(self.sent()), 1)
+        sent = self.sent()
+        self.assertEqual(len(sent), 3)
+        query, body = sent[0]
+        self.assertEqual(body, b"event 0\nevent 1\nevent 2\n")
+        self.assertEqual(
+            (query["index"], query["host"], query["sourcetype"]), ("main", "a", "log")
+        )
+        self.assertEqual(
+            sent[2], ({"index": "main", "host": "b", "sourcetype": "log"}, b"other\n")
+        )
+        stats = writer.stats()
+        self.assertEqual((stats.batches, stats.events), (3, 5))
+        self.assertGreater(stats.events_per_second, 0)
+
+    def test_batches_share_a_connection(self):
+        with self.index.batch_writer(batch_size=1, flush_interval=None) as writer:
+            for i in range(3):
+                writer.write(f"event {i}")
+            self.statuses = [400]
+            writer.write("rejected")
+            writer.write("after")
+        self.assertEqual(len(self.sent()), 5)
+        self.assertEqual(len(writer.failures), 1)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_concurrent_writers(self):
+        writer = self.index.batch_writer(max_bytes=100, flush_interval=None)
+
+        def produce(n):
+            for i in range(300):
+                writer.write(f"thread {n} event {i}")
+
+        threads = [Thread(target=produce, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+        events = b"".join(body for _, body in self.sent()).splitlines()
+        self.assertEqual(len(events), 1200)
+        self.assertEqual(len(set(events)), 1200)
+        self.assertEqual(writer.stats().events, 1200)
+
+    def test_max_bytes_and_interval(self):
+        writer = self.index.batch_writer(max_bytes=10, flush_interval=0.05)
+        writer.write("12345")
+        writer.write("67890")
+        self.assertEqual([body for _, body in self.sent()], [b"12345\n"])
+        deadline = time.monotonic() + 2
+        while len(self.sent()) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.sent()[1][1], b"67890\n")
+        writer.close()
+        self.assertRaises(client.IllegalOperationException, writer.write, "x")
+
+    def test_failed_batch(self):
+        self.status = 503
+        with self.index.batch_writer(flush_interval=None) as writer:
+            writer.write("lost")
+        (failure,) = writer.failures
+        self.assertEqual(failure.events, [b"lost"])
+        self.assertEqual(failure.error.status, 503)
+        self.assertEqual(writer.stats().batches, 0)
+
+    def test_retries_until_splunkd_is_back(self):
+        self.statuses = [503, 503]
+        writer = self.index.batch_writer(
+            flush_interval=None, spool=self.spool(), retry_delay=0.01
+        )
+        writer.write("one\ntwo", host="a")
+        writer.write("three", host="b")
+        writer.close(timeout=5)
+        self.assertEqual(
+            [body for _, body in self.sent()],
+            [b"one\ntwo\n", b"one\ntwo\n", b"one\ntwo\n", b"three\n"],
+        )
+        self.assertEqual(writer.failures, [])
+        self.assertEqual(writer.stats().events, 2)
+
+    def test_rejected_batch_is_not_retried(self):
+        self.statuses = [400]
+        with self.index.batch_writer(flush_interval=None, spool=self.spool()) as writer:
+            writer.write("one\ntwo")
+            writer.write("three")
+        (failure,) = writer.failures
+        self.assertEqual(failure.events, [b"one\ntwo", b"three"])
+        self.assertEqual(len(self.sent()), 1)
+
+    def test_left_in_spool_on_timeout(self):
+        self.statuses = [503] * 1000
+        writer = self.index.batch_writer(
+            flush_interval=None, spool=self.spool(), retry_delay=0.01
+        )
+        writer.write("kept")
+        writer.close(timeout=0.05)
+        with spool.Spool(writer.spool.directory) as queue:
+            self.assertEqual(len(queue), 1)
+            self.assertTrue(queue.peek().endswith(b"\nkept"))
+
+
+class _StreamHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        received = b"".join(iter(lambda: self.request.recv(65536), b""))
+        with self.server.lock:
+            self.server.received.append(received)
+
+
+class _StreamServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("localhost", 0), _StreamHandler)
+        self.received = []
+        self.lock = threading.Lock()
+
+
+class StreamingIndexWriterTestCase(ServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        state = data.record({"title": "main"})
+        self.index = client.Index(self.service, "data/indexes/main", state=state)
+        self.stream_server = _StreamServer()
+        Thread(
+            target=self.stream_server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        self.service.port = self.stream_server.server_address[1]
+
+    def tearDown(self):
+        self.stream_server.shutdown()
+        self.stream_server.server_close()
+        super().tearDown()
+
+    def test_round_robin_connections(self):
+        with self.index.stream_writer(
+            connections=2, buffer_size=100, sourcetype="log"
+        ) as writer:
+            for i in range(50):
+                writer.write(f"event {i}")
+        deadline = time.monotonic() + 2
+        while len(self.stream_server.received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        events = []
+        for received in self.stream_server.received:
+            headers, _, body = received.partition(b"\r\n\r\n")
+            self.assertTrue(
+                headers.startswith(
+                    b"POST /services/receivers/stream?index=main&sourcetype=log "
+                )
+            )
+            self.assertIn(b"Authorization: Splunk abc", headers)
+            events.extend(body.decode("utf-8").splitlines())
+        self.assertEqual(len(self.stream_server.received), 2)
+        self.assertEqual(sorted(events), sorted(f"event {i}" for i in range(50)))
+        self.assertEqual(writer.bytes_sent, sum(len(e) + 1 for e in events))
+
+    def test_reconnect_and_resend(self):
+        broken = mock.Mock()
+        broken.sendall.side_effect = BrokenPipeError()
+        working = mock.Mock()
+        with mock.patch.object(self.index, "attach", side_effect=[broken, working]):
+            with self.index.stream_writer(retry_delay=0) as writer:
+                writer.write("one\n")
+                writer.write(b"two")
+        working.sendall.assert_called_once_with(b"one\ntwo\n")
+        self.assertEqual((writer.reconnects, writer.failures), (1, []))
+
+    def test_failure_after_retries(self):
+        with mock.patch.object(self.index, "attach", side_effect=OSError("down")):
+            with self.index.stream_writer(retries=2, retry_delay=0) as writer:
+                writer.write("lost")
+        (failure,) = writer.failures
+        self.assertEqual(failure.data, b"lost\n")
+        self.assertRaises(client.IllegalOperationException, writer.write, "x")
+
+    def test_attach_error_keeps_draining(self):
+        refused = RuntimeError("no session")
+        working = mock.Mock()
+        with mock.patch.object(self.index, "attach", side_effect=[refused, working]):
+            with self.index.stream_writer(retries=0, buffer_size=1) as writer:
+                writer.write("lost")
+                writer.write("sent")
+        self.assertEqual(
+            [(f.data, f.error) for f in writer.failures], [(b"lost\n", refused)]
+        )
+        working.sendall.assert_called_once_with(b"sent\n")
+
+
+_KVSTORE_DATA = "/servicesNS/nobody/search/storage/collections/data/people"
+
+
+class KVStoreTestCase(ServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        state = data.record(
+            {
+                "title": "people",
+                "access": data.record(
+                    {"owner": "nobody", "app": "search", "sharing": "app"}
+                ),
+            }
+        )
+        collection = client.KVStoreCollection(
+            self.service, "storage/collections/config/people", state=state
+        )
+        self.data = collection.data
+
+
+class BulkSaveTestCase(KVStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.batches = []
+        self.server.routes[("POST", _KVSTORE_DATA + "/batch_save")] = self.batch_save
+
+    def batch_save(self, query):
+        documents = query["json"]
+        with self.server.lock:
+            self.batches.append(documents)
+        if any(document.get("bad") for document in documents):
+            return 400, "<response><messages><msg>bad</msg></messages></response>"
+        return 200, json.dumps([d.get("_key", "generated") for d in documents])
+
+    def test_batches_by_count_and_size(self):
+        documents = ({"_key": str(i), "v": "x" * (i % 3)} for i in range(25))
+        result = self.data.bulk_save(documents, batch_size=10, max_bytes=200)
+        self.assertEqual(result.ids, [str(i) for i in range(25)])
+        self.assertEqual(result.errors, [])
+        sizes = sorted(
+            len("[" + ",".join(map(json.dumps, batch)) + "]") for batch in self.batches
+        )
+        self.assertLessEqual(sizes[-1], 200)
+        self.assertTrue(all(len(batch) <= 10 for batch in self.batches))
+        self.assertGreater(len(self.batches), 3)
+
+    def test_failed_batch(self):
+        documents = [{"_key": str(i), "bad": i == 4} for i in range(9)]
+        result = self.data.bulk_save(documents, batch_size=3, parallelism=2)
+        self.assertEqual(result.ids, ["0", "1", "2", None, None, None, "6", "7", "8"])
+        (error,) = result.errors
+        self.assertEqual((error.offset, error.count), (3, 3))
+        self.assertEqual(error.error.status, 400)
+
+
+class KVStoreWriterTestCase(BulkSaveTestCase):
+    def setUp(self):
+        super().setUp()
+        self.deleted = []
+        self.server.routes[("DELETE", _KVSTORE_DATA)] = self.delete
+
+    def delete(self, query):
+        self.deleted.append(json.loads(query["query"]))
+        return 200, ""
+
+    def test_writes_are_coalesced(self):
+        with self.data.writer(flush_interval=None) as writer:
+            writer.insert({"_key": "a", "v": 1})
+            writer.update("a", {"v": 2})
+            writer.insert({"_key": "b", "v": 1})
+            writer.delete_by_id("c")
+            writer.delete_by_id("b")
+            writer.insert({"v": 3})
+            self.assertEqual(len(writer), 4)
+            self.assertEqual(self.batches, [])
+        self.assertEqual(self.deleted, [{"$or": [{"_key": "c"}, {"_key": "b"}]}])
+        self.assertEqual(self.batches, [[{"_key": "a", "v": 2}, {"v": 3}]])
+
+    def test_size_threshold(self):
+        with self.data.writer(batch_size=3, flush_interval=None) as writer:
+            for i in range(7):
+                writer.insert({"_key": str(i)})
+            self.assertEqual([len(batch) for batch in self.batches], [3, 3])
+        self.assertEqual([len(batch) for batch in self.batches], [3, 3, 1])
+        self.assertRaises(client.IllegalOperationException, writer.insert, {})
+
+    def test_deletes_split_by_query_length(self):
+        keys = ["key-%03d" % i for i in range(100)]
+        with self.data.writer(flush_interval=None, max_query_length=500) as writer:
+            for key in keys:
+                writer.delete_by_id(key)
+        self.assertGreater(len(self.deleted), 1)
+        for query in self.deleted:
+            self.assertLessEqual(len(quote(json.dumps(query), safe="")), 500)
+        deleted = [term["_key"] for query in self.deleted for term in query["$or"]]
+        self.assertEqual(deleted, keys)
+
+    def test_time_threshold(self):
+        writer = self.data.writer(flush_interval=0.02)
+        writer.insert({"_key": "a"})
+        deadline = time.monotonic() + 2
+        while not self.batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.batches, [[{"_key": "a"}]])
+        self.assertEqual(len(writer), 0)
+        writer.close()
+
+    def test_failures(self):
+        with self.data.writer(batch_size=2, flush_interval=None) as writer:
+            writer.insert({"_key": "a"})
+            writer.insert({"_key": "b", "bad": True})
+            writer.insert({"_key": "c"})
+        self.assertEqual([f.key for f in writer.failures], ["a", "b"])
+        self.assertEqual(writer.failures[1].document, {"_key": "b", "bad": True})
+        self.assertEqual(writer.failures[0].error.status, 400)
+
+    def wait_for(self, condition):
+        deadline = time.monotonic() + 2
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_unreachable_server_keeps_timed_flushes(self):
+        refused = ConnectionRefusedError("refused")
+        writer = self.data.writer(flush_interval=0.02)
+        with mock.patch.object(self.data, "_post", side_effect=refused):
+            with mock.patch.object(self.data, "_delete", side_effect=refused):
+                writer.insert({"_key": "a"})
+                writer.delete_by_id("b")
+                self.wait_for(lambda: len(writer.failures) == 2)
+        self.assertEqual(
+            sorted((f.key, f.error) for f in writer.failures),
+            [("a", refused), ("b", refused)],
+        )
+        writer.insert({"_key": "c"})
+        self.wait_for(lambda: self.batches)
+        self.assertEqual(self.batches, [[{"_key": "c"}]])
+        writer.close()
+
+
+class KVStoreCacheTestCase(KVStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.documents = {"a": {"_key": "a", "v": 1}}
+        for key in ("a", "b"):
+            self.server.routes[("GET", f"{_KVSTORE_DATA}/{key}")] = lambda q, key=key: (
+                (200, json.dumps(self.documents[key]))
+                if key in self.documents
+                else (404, "<response/>")
+            )
+        self.server.routes[("POST", f"{_KVSTORE_DATA}/a")] = self.update
+        self.server.routes[("GET", _KVSTORE_DATA)] = lambda q: (
+            200,
+            json.dumps(list(self.documents.values())),
+        )
+        self.cache = self.data.cached(ttl=60)
+
+    def update(self, query):
+        self.documents["a"] = query["json"]
+        return 200, json.dumps({"_key": "a"})
+
+    def test_reads_are_cached(self):
+        self.assertEqual(self.cache.query_by_id("a")["v"], 1)
+        self.cache.query_by_id("a")["v"] = 5
+        self.assertEqual(self.cache.query_by_id("a")["v"], 1)
+        self.assertEqual(self.cache.query(limit=1), [{"_key": "a", "v": 1}])
+        self.assertEqual(self.cache.query(limit=1), [{"_key": "a", "v": 1}])
+        self.assertEqual((self.cache.hits, self.cache.misses), (3, 2))
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_writes_invalidate(self):
+        self.cache.query_by_id("a")
+        self.cache.query()
+        self.cache.update("a", {"_key": "a", "v": 2})
+        self.assertEqual(self.cache.query_by_id("a")["v"], 2)
+        self.assertEqual(self.cache.query(), [{"_key": "a", "v": 2}])
+        self.assertEqual(self.cache.misses, 4)
+
+    def test_batch_save_invalidates_json_documents(self):
+        self.server.routes[("POST", _KVSTORE_DATA + "/batch_save")] = lambda q: (
+            200,
+            json.dumps(["a"]),
+        )
+        self.cache.query_by_id("a")
+        self.cache.batch_save(json.dumps({"_key": "a", "v": 2}))
+        self.cache.query_by_id("a")
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_negative_caching(self):
+        self.assertRaises(client.HTTPError, self.cache.query_by_id, "b")
+        self.assertRaises(client.HTTPError, self.cache.query_by_id, "b")
+        self.assertEqual(len(self.server.requests), 2)
+        cache = self.data.cached(negative_ttl=60)
+        errors = []
+        for _ in range(3):
+            with self.assertRaises(client.HTTPError) as raised:
+                cache.query_by_id("b")
+            errors.append(raised.exception)
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual([e.status for e in errors], [404] * 3)
+        self.assertEqual(errors[2].body, errors[0].body)
+        self.assertIsNot(errors[2], errors[1])
+
+    def test_ttl_and_lru(self):
+        cache = self.data.cached(maxsize=1, ttl=0.02)
+        cache.query_by_id("a")
+        cache.query()
+        self.assertEqual(len(cache), 1)
+        cache.query()
+        time.sleep(0.03)
+        cache.query()
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+
+class IterQueryTestCase(KVStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.documents = [
+            {"_key": f"{i:03}", "n": 30 - i, "odd": i % 2} for i in range(30)
+        ]
+        self.server.routes[("GET", _KVSTORE_DATA)] = self.query
+
+    def matches(self, document, condition):
+        for field, value in condition.items():
+            if field == "$and":
+                if not all(self.matches(document, c) for c in value):
+                    return False
+            elif isinstance(value, dict):
+                if "$gt" in value and not document[field] > value["$gt"]:
+                    return False
+                if "$gte" in value and not document[field] >= value["$gte"]:
+                    return False
+            elif document[field] != value:
+                return False
+        return True
+
+    def query(self, query):
+        condition = json.loads(query.get("query", "{}"))
+        documents = [d for d in self.documents if self.matches(d, condition)]
+        documents.sort(key=lambda d: d[query["sort"]])
+        skip = int(query.get("skip", 0))
+        documents = documents[skip : skip + int(query["limit"])]
+        return 200, json.dumps(documents)
+
+    def test_keyset_pages(self):
+        documents = list(self.data.iter_query(page_size=7, query={"odd": 1}))
+        self.assertEqual(
+            [d["_key"] for d in documents], [f"{i:03}" for i in range(1, 30, 2)]
+        )
+        queries = self.requests_to(_KVSTORE_DATA)
+        self.assertEqual(len(queries), 3)
+        self.assertNotIn("skip", queries[1])
+        self.assertEqual(
+            json.loads(queries[1]["query"]),
+            {"$and": [{"odd": 1}, {"_key": {"$gt": "013"}}]},
+        )
+
+    def test_sorted_pages_with_skip_and_limit(self):
+        documents = self.data.iter_query(
+            page_size=4, prefetch=False, sort="n", skip=2, limit=9
+        )
+        self.assertEqual([d["n"] for d in documents], list(range(3, 12)))
+        queries = self.requests_to(_KVSTORE_DATA)
+        self.assertEqual(
+            [(q["skip"], q["limit"]) for q in queries],
+            [("2", "4"), ("6", "4"), ("10", "1")],
+        )
+
+    def test_exact_multiple_of_page_size(self):
+        self.assertEqual(len(list(self.data.iter_query(page_size=10))), 30)
+        self.assertEqual(len(self.requests_to(_KVSTORE_DATA)), 4)
+
+    def test_zero_limit_is_unlimited(self):
+        self.assertEqual(len(list(self.data.iter_query(page_size=10, limit=0))), 30)
+        queries = self.requests_to(_KVSTORE_DATA)
+        self.assertEqual([q["limit"] for q in queries], ["10"] * 4)
+
+    def test_string_limit_and_skip(self):
+        documents = self.data.iter_query(page_size=4, sort="n", skip="2", limit="5")
+        self.assertEqual([d["n"] for d in documents], list(range(3, 8)))
+
+
+class KVStoreMirrorTestCase(IterQueryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "people.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super().tearDown()
+
+    def test_get_and_find(self):
+        with self.data.mirror(indexes=["odd"]) as mirror:
+            self.assertEqual(mirror.sync(), {"saved": 30, "deleted": 0})
+            self.assertEqual(len(mirror), 30)
+            self.assertEqual(mirror.get("004"), {"_key": "004", "n": 26, "odd": 0})
+            self.assertIsNone(mirror.get("missing"))
+            self.assertEqual(mirror.find(odd=1, n=29), [self.documents[1]])
+            self.assertEqual(len(mirror.find(odd=0)), 15)
+
+    def test_incremental_sync(self):
+        mirror = self.data.mirror(self.path, modified_field="n")
+        mirror.sync()
+        mirror.close()
+        self.documents[0]["n"] = 40
+        del self.documents[5]
+        mirror = self.data.mirror(self.path, modified_field="n")
+        self.server.requests.clear()
+        self.assertEqual(mirror.sync(), {"saved": 1, "deleted": 1})
+        self.assertEqual(
+            json.loads(self.requests_to(_KVSTORE_DATA)[0]["query"]),
+            {"n": {"$gte": 30}},
+        )
+        self.assertEqual(mirror.get("000")["n"], 40)
+        self.assertNotIn("005", mirror)
+        self.assertEqual(len(mirror), 29)
+        mirror.close()
+
+    def test_reads_during_sync_see_previous_copy(self):
+        mirror = self.data.mirror(self.path)
+        mirror.sync()
+        self.documents[0]["n"] = 40
+        seen = []
+
+        def query(query):
+            # Read the mirror while the sync waits for this page
+            reader = threading.Thread(target=lambda: seen.append(mirror.get("000")))
+            reader.start()
+            reader.join(2)
+            return self.query(query)
+
+        self.server.routes[("GET", _KVSTORE_DATA)] = query
+        mirror.sync()
+        self.assertEqual(seen[0]["n"], 30)
+        self.assertEqual(mirror.get("000")["n"], 40)
+        mirror.close()
+
+    def test_layout_change_starts_over(self):
+        with self.data.mirror(self.path, modified_field="n") as mirror:
+            mirror.sync()
+        mirror = self.data.mirror(self.path, indexes=["odd"], modified_field="n")
+        self.assertEqual(len(mirror), 0)
+        self.assertEqual(mirror.sync(), {"saved": 30, "deleted": 0})
+        mirror.close()
+
+
+_SAVED_SEARCH = {
+    "name": "errors",
+    "id": "https://localhost:8089/servicesNS/admin/search/saved/searches/errors",
+    "updated": "2024-01-01T00:00:00+00:00",
+    "links": {
+        "alternate": "/servicesNS/admin/search/saved/searches/errors",
+        "list": "/servicesNS/admin/search/saved/searches/errors",
+        "dispatch": "/servicesNS/admin/search/saved/searches/errors/dispatch",
+    },
+    "author": "admin",
+    "acl": {
+        "app": "search",
+        "owner": "admin",
+        "sharing": "user",
+        "can_write": True,
+        "perms": {"read": ["*"], "write": ["admin"]},
+    },
+    "fields": {"required": ["search"], "optional": ["description"], "wildcard": []},
+    "content": {
+        "search": "index=_internal error",
+        "disabled": False,
+        "dispatch.earliest_time": "-24h",
+        "dispatch.ttl": 120,
+        "description": "",
+        "type": "scheduled",
+    },
+}
+
+
+class JSONOutputModeTestCase(ServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.service.output_mode = "json"
+        listing = json.dumps({"entry": [_SAVED_SEARCH], "paging": {"total": 1}})
+        self.server.routes[("GET", "/services/saved/searches")] = lambda q: (
+            (200, listing) if q.get("output_mode") == "json" else (200, _EMPTY_FEED)
+        )
+        self.server.routes[
+            ("GET", "/servicesNS/admin/search/saved/searches/errors")
+        ] = lambda q: (200, listing)
+
+    def test_list_builds_atom_equivalent_state(self):
+        (saved_search,) = self.service.saved_searches.list()
+        self.assertEqual(saved_search.name, "errors")
+        self.assertEqual(saved_search.path, "saved/searches/errors")
+        self.assertEqual(saved_search.access.owner, "admin")
+        self.assertEqual(saved_search.access.can_write, "1")
+        self.assertEqual(saved_search.access.perms.read, ["*"])
+        self.assertEqual(saved_search.fields.required, ["search"])
+        self.assertEqual(saved_search["disabled"], "0")
+        self.assertEqual(saved_search["dispatch.ttl"], "120")
+        self.assertEqual(saved_search.content.dispatch.earliest_time, "-24h")
+        self.assertIsNone(saved_search["description"])
+        self.assertEqual(saved_search["type"], "scheduled")
+        self.assertNotIn("eai:acl", saved_search.content)
+        self.assertEqual(
+            saved_search.links.dispatch,
+            "/servicesNS/admin/search/saved/searches/errors/dispatch",
+        )
+
+    def test_numbers_keep_their_text(self):
+        listing = json.dumps({"entry": [_SAVED_SEARCH]}).replace(
+            '"dispatch.ttl": 120',
+            '"dispatch.ttl": 120, "alert.threshold": 1.0, "max_time": 1.50',
+        )
+        self.server.routes[("GET", "/services/saved/searches")] = lambda q: (
+            200,
+            listing,
+        )
+        (saved_search,) = self.service.saved_searches.list()
+        self.assertEqual(saved_search["alert.threshold"], "1.0")
+        self.assertEqual(saved_search["max_time"], "1.50")
+        self.assertEqual(saved_search["dispatch.ttl"], "120")
+
+    def test_refresh(self):
+        saved_search = self.service.saved_searches.list()[0]
+        saved_search.refresh()
+        self.assertEqual(saved_search["search"], "index=_internal error")
+        (query,) = self.requests_to("/servicesNS/admin/search/saved/searches/errors")
+        self.assertEqual(query["output_mode"], "json")
+
+    def test_xml_mode_is_the_default(self):
+        self.service.output_mode = None
+        self.assertEqual(self.service.saved_searches.list(), [])
+        (query,) = self.requests_to("/services/saved/searches")
+        self.assertNotIn("output_mode", query)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,10 +15,12 @@
 # under the License.
 
 import sys
+from io import BytesIO
 from os import path
 import xml.etree.ElementTree as et
 
 import unittest
+from unittest import mock
 
 from splunklib import data
 
@@ -132,6 +134,28 @@ class DataTestCase(unittest.TestCase):
         self.assertEqual(result.feed.entry.content.os_name, "Darwin")
         self.assertEqual(result.feed.entry.content.os_version, "10.8.0")
 
+    def test_iterload(self):
+        testpath = path.dirname(path.abspath(__file__))
+        with open(path.join(testpath, "data/services.xml"), "rb") as fh:
+            text = fh.read()
+        expected = data.load(text.decode("utf-8")).feed.entry
+        entry = "{http://www.w3.org/2005/Atom}entry"
+        with mock.patch.object(data, "BLOCK_SIZE", 7):
+            loaded = list(data.iterload(BytesIO(b"\n  " + text), entry))
+        self.assertEqual([name for name, _ in loaded], ["entry"] * len(expected))
+        self.assertEqual([value for _, value in loaded], expected)
+
+        stream = BytesIO(b"<a><b>1</b><c><b>2</b></c><d>3</d><b>4</b></a>")
+        self.assertEqual(
+            list(data.iterload(stream, ("b", "d"))),
+            [("b", "1"), ("d", "3"), ("b", "4")],
+        )
+        self.assertEqual(list(data.iterload(BytesIO(b"<b>1</b>"), "b")), [("b", "1")])
+        self.assertEqual(list(data.iterload(BytesIO(b" \n"), "b")), [])
+        stream = data.iterload(BytesIO(b"<a><b>1</b><b>"), "b")
+        self.assertEqual(next(stream), ("b", "1"))
+        self.assertRaises(et.ParseError, next, stream)
+
     def test_invalid(self):
         if sys.version_info[1] >= 7:
             self.assertRaises(et.ParseError, data.load, "<dict</dict>")
@@ -282,6 +306,25 @@ class DataTestCase(unittest.TestCase):
         self.assertEqual(d.bar, {"baz": 6, "qux": 7, "zrp": {"meep": 8, "peem": 9}})
         self.assertRaises(KeyError, d.__getitem__, "boris")
 
+    def test_record_prefix_index_follows_mutation(self):
+        d = data.record({"a.b": 1, "a.c.d": 2, "ab": 3})
+        self.assertEqual(d.a, {"b": 1, "c": {"d": 2}})
+        self.assertEqual(d["a.c"], {"d": 2})
+        d["a.e"] = 4
+        self.assertEqual(d.a, {"b": 1, "c": {"d": 2}, "e": 4})
+        d["a.b"] = 5
+        self.assertEqual(d.a.b, 5)
+        del d["a.c.d"]
+        self.assertRaises(KeyError, d.__getitem__, "a.c")
+        d.update({"a.c.f": 6})
+        self.assertEqual(d.a.c, {"f": 6})
+        d.pop("a.c.f")
+        d.setdefault("x.y", 7)
+        self.assertEqual(d.x, {"y": 7})
+        d.clear()
+        self.assertRaises(AttributeError, getattr, d, "a")
+        self.assertNotIn("_prefixes", d)
+
 
 if __name__ == "__main__":
     import unittest
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+#
+# Copyright © 2011-2024 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import unittest
+from io import BufferedReader, BytesIO, RawIOBase
+
+from splunklib import results
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class _TrickleStream(RawIOBase):
+    """Returns at most *size* bytes per read and counts the bytes handed out."""
+
+    def __init__(self, data, size=1):
+        self._data = BytesIO(data)
+        self._size = size
+        self.consumed = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._data.read(min(len(b), self._size))
+        b[: len(data)] = data
+        self.consumed += len(data)
+        return len(data)
+
+
+class JSONResultsReaderTestCase(unittest.TestCase):
+    results_document = {
+        "preview": False,
+        "init_offset": 0,
+        "messages": [{"type": "DEBUG", "text": "base lispy: [ AND ]"}],
+        "fields": [{"name": "series"}, {"name": "count"}],
+        "results": [
+            {"series": "twitter", "count": "12"},
+            {"series": "splünkd", "count": "4"},
+        ],
+        "highlighted": {},
+    }
+
+    expected = [
+        results.Message("DEBUG", "base lispy: [ AND ]"),
+        {"series": "twitter", "count": "12"},
+        {"series": "splünkd", "count": "4"},
+    ]
+
+    def test_results_document(self):
+        data = json.dumps(self.results_document).encode("utf-8")
+        reader = results.JSONResultsReader(BytesIO(data))
+        self.assertEqual(list(reader), self.expected)
+        self.assertFalse(reader.is_preview)
+
+    def test_split_at_every_byte(self):
+        data = json.dumps(self.results_document, indent=2).encode("utf-8")
+        reader = results.JSONResultsReader(_TrickleStream(data))
+        self.assertEqual(list(reader), self.expected)
+
+    def test_export_stream(self):
+        lines = [
+            {"preview": True, "offset": 0, "result": {"n": 1}},
+            {"preview": True, "messages": [{"type": "INFO", "text": "hi"}]},
+            {"preview": False, "offset": 1, "lastrow": True, "result": {"n": 2}},
+        ]
+        data = b"\n".join(json.dumps(line).encode("utf-8") for line in lines)
+        reader = results.JSONResultsReader(_TrickleStream(data, size=5))
+        self.assertEqual(
+            list(reader), [{"n": 1}, results.Message("INFO", "hi"), {"n": 2}]
+        )
+        self.assertFalse(reader.is_preview)
+
+    def test_top_level_number_at_block_boundary(self):
+        reader = results.JSONResultsReader(_TrickleStream(b'{"preview": 1234}', 10))
+        self.assertEqual(list(reader), [])
+        self.assertEqual(reader.is_preview, 1234)
+
+    def test_first_result_before_end_of_stream(self):
+        document = dict(self.results_document)
+        document["results"] = [{"n": str(i)} for i in range(50000)]
+        stream = _TrickleStream(json.dumps(document).encode("utf-8"), size=4096)
+        reader = results.JSONResultsReader(stream)
+        next(reader)
+        self.assertEqual(next(reader), {"n": "0"})
+        self.assertLess(stream.consumed, 16 * 4096)
+
+    def test_empty_stream(self):
+        self.assertEqual(list(results.JSONResultsReader(BytesIO(b""))), [])
+
+    def test_malformed_stream(self):
+        reader = results.JSONResultsReader(BytesIO(b'{"results": [{"a": 1}, }'))
+        self.assertEqual(next(reader), {"a": 1})
+        self.assertRaises(ValueError, next, reader)
+
+
+class XMLStreamTestCase(unittest.TestCase):
+    xml_text = b"""<?xml version='1.0' encoding='UTF-8'?>
+<results preview='0'>
+<messages><msg type='DEBUG'>a &lt; b</msg></messages>
+<result offset='0'><field k='series'><value><text>twitter</text></value></field></result>
+</results>
+<?xml version='1.0' encoding='UTF-8'?>
+<results preview='1'>
+<result offset='0'><field k='series'><value><text>splunkd</text></value></field></result>
+</results>"""
+
+    def test_dtd_filter_across_blocks(self):
+        expected = b"<a></a><b>x < y</b><c/>"
+        for size in (1, 2, 3, 7, 4096):
+            stream = _TrickleStream(
+                b"<?xml a><a></a><?pi ?><b>x < y</b><?z?><c/>", size
+            )
+            stream = results._XMLDTDFilter(BufferedReader(stream, 1))
+            stream._BLOCK_SIZE = size
+            chunks = iter(lambda: stream.read(3), b"")
+            self.assertEqual(b"".join(chunks), expected)
+
+    def test_concatenated_stream_short_reads(self):
+        stream = results._ConcatenatedStream(
+            BytesIO(b"<doc>"), _TrickleStream(b"abcdef", 2), BytesIO(b"</doc>")
+        )
+        self.assertEqual(stream.read(8), b"<doc>abc")
+        self.assertEqual(stream.read(100), b"def</doc>")
+
+    def test_results_reader(self):
+        reader = results.ResultsReader(_TrickleStream(self.xml_text, 5))
+        self.assertEqual(
+            list(reader),
+            [
+                results.Message("DEBUG", "a < b"),
+                {"series": "twitter"},
+                {"series": "splunkd"},
+            ],
+        )
+        self.assertTrue(reader.is_preview)
+
+
+class ColumnarReaderTestCase(unittest.TestCase):
+    fields = [{"name": "host"}, {"name": "bytes"}, {"name": "ratio"}]
+    rows = [["a", "10", "0.5"], ["b", "20", None], ["c", "30", "1.5"]]
+
+    def read(self, document, **kwargs):
+        data = json.dumps(document).encode("utf-8")
+        reader = results.ColumnarReader(_TrickleStream(data, 16), **kwargs)
+        return reader, list(reader)
+
+    def test_json_rows(self):
+        document = {
+            "preview": False,
+            "messages": [{"type": "INFO", "text": "hi"}],
+            "fields": self.fields,
+            "rows": self.rows,
+        }
+        reader, batches = self.read(document, batch_size=2)
+        self.assertEqual(
+            batches,
+            [
+                {"host": ["a", "b"], "bytes": ["10", "20"], "ratio": ["0.5", None]},
+                {"host": ["c"], "bytes": ["30"], "ratio": ["1.5"]},
+            ],
+        )
+        self.assertFalse(reader.is_preview)
+        self.assertEqual(reader.fields, ["host", "bytes", "ratio"])
+        self.assertEqual(reader.messages, [results.Message("INFO", "hi")])
+
+    def test_json_cols(self):
+        document = {
+            "fields": ["host", "bytes", "ratio"],
+            "columns": [list(column) for column in zip(*self.rows)],
+        }
+        _, batches = self.read(document, batch_size=2)
+        self.assertEqual(batches[1], {"host": ["c"], "bytes": ["30"], "ratio": ["1.5"]})
+
+    def test_json_results_with_unannounced_field(self):
+        document = {
+            "fields": [{"name": "host"}],
+            "results": [{"host": "a"}, {"host": "b", "extra": "x"}],
+        }
+        reader, batches = self.read(document)
+        self.assertEqual(batches, [{"host": ["a", "b"], "extra": [None, "x"]}])
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_numpy_columns(self):
+        document = {"fields": self.fields, "rows": self.rows}
+        _, (batch,) = self.read(document, numpy=True)
+        self.assertEqual(batch["bytes"].dtype, numpy.int64)
+        self.assertEqual(batch["bytes"].sum(), 60)
+        self.assertEqual(batch["ratio"].dtype, numpy.float64)
+        self.assertTrue(numpy.isnan(batch["ratio"][1]))
+        self.assertEqual(batch["host"].dtype, object)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+#
+# Copyright © 2011-2024 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from splunklib import spool
+
+
+class SpoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def segments(self):
+        return sorted(n for n in os.listdir(self.directory) if n.endswith(".spool"))
+
+    def test_first_in_first_out(self):
+        with spool.Spool(self.directory) as queue:
+            for i in range(3):
+                queue.put(b"record %d" % i)
+            self.assertEqual(len(queue), 3)
+            self.assertEqual(queue.peek(), b"record 0")
+            self.assertEqual(queue.peek(), b"record 0")
+            self.assertEqual(queue.pop(), b"record 0")
+            self.assertEqual(queue.pop(), b"record 1")
+            self.assertEqual(queue.size, 8 + len(b"record 2"))
+            self.assertEqual(queue.pop(), b"record 2")
+            self.assertIsNone(queue.peek(timeout=0.01))
+            self.assertTrue(queue.wait_empty(0))
+
+    def test_reopen_continues_after_last_pop(self):
+        with spool.Spool(self.directory) as queue:
+            for i in range(4):
+                queue.put(b"%d" % i)
+            queue.pop()
+            self.assertEqual(queue.peek(), b"1")
+        with spool.Spool(self.directory) as queue:
+            self.assertEqual(len(queue), 3)
+            self.assertEqual([queue.pop() for _ in range(3)], [b"1", b"2", b"3"])
+
+    def test_segments_roll_and_are_deleted(self):
+        with spool.Spool(self.directory, segment_size=20) as queue:
+            for i in range(6):
+                queue.put(b"0123456789")
+            self.assertEqual(len(self.segments()), 3)
+            for i in range(5):
+                queue.pop()
+            self.assertEqual(len(self.segments()), 1)
+        with spool.Spool(self.directory, segment_size=20) as queue:
+            self.assertEqual(len(queue), 1)
+
+    def test_torn_record_is_dropped(self):
+        with spool.Spool(self.directory) as queue:
+            queue.put(b"whole")
+            queue.put(b"torn record")
+        path = os.path.join(self.directory, self.segments()[-1])
+        os.truncate(path, os.path.getsize(path) - 3)
+        with spool.Spool(self.directory) as queue:
+            self.assertEqual(len(queue), 1)
+            queue.put(b"after")
+            self.assertEqual([queue.pop(), queue.pop()], [b"whole", b"after"])
+
+    def test_full(self):
+        with spool.Spool(self.directory, max_size=30) as queue:
+            queue.put(b"x" * 20)
+            self.assertRaises(spool.SpoolFullError, queue.put, b"y")
+            queue.pop()
+            queue.put(b"y")
+
+    def test_peek_waits_for_put(self):
+        with spool.Spool(self.directory) as queue:
+            timer = threading.Timer(0.05, queue.put, (b"late",))
+            timer.start()
+            self.assertEqual(queue.peek(timeout=5), b"late")
+            timer.join()
+
+
+if __name__ == "__main__":
+    unittest.main()